@@ -1,15 +1,16 @@
 import sys
 from typing import List, Optional
 from models import Student, Teacher, Evaluation
-from services import GradeCalculator
+from services import GradeCalculator, ReportRenderer, RosterIndex
 from policies import AttendancePolicy, ExtraPointsPolicy
 from utils.exceptions import GradeCalculationError
 class GradeCalculatorApp:
     
+    PAGE_SIZE = 20
     def __init__(self):
         
         self.calculator: Optional[GradeCalculator] = None
-        self.students: dict = {}
+        self.roster = RosterIndex()
         self.current_teacher: Optional[Teacher] = None
     def display_header(self) -> None:
         
@@ -55,7 +56,7 @@ class GradeCalculatorApp:
         student_name = input("Ingrese nombre del estudiante: ").strip()
         try:
             student = Student(student_id, student_name)
-            self.students[student_id] = student
+            self.roster.track(student)
             print(f"\n Estudiante registrado correctamente")
             print(f"  {student_name} (ID: {student_id})")
         except Exception as e:
@@ -65,16 +66,13 @@ class GradeCalculatorApp:
         if not self.calculator:
             print("\n Error: Debe inicializar el sistema primero (opción 1)")
             return
-        if not self.students:
+        if not self.roster:
             print("\n Error: No hay estudiantes registrados")
             return
         print("\n--- REGISTRAR EVALUACIONES (RF01) ---")
-        self._list_students()
-        student_id = input("\nIngrese ID del estudiante: ").strip()
-        if student_id not in self.students:
-            print(f"\n Error: Estudiante {student_id} no encontrado")
+        student = self._select_student()
+        if student is None:
             return
-        student = self.students[student_id]
         try:
             num_evaluations = int(input("¿Cuántas evaluaciones desea registrar? (máx. 10): "))
             if num_evaluations <= 0:
@@ -116,16 +114,13 @@ class GradeCalculatorApp:
         if not self.calculator:
             print("\n Error: Debe inicializar el sistema primero")
             return
-        if not self.students:
+        if not self.roster:
             print("\n Error: No hay estudiantes registrados")
             return
         print("\n--- REGISTRAR ASISTENCIA (RF02) ---")
-        self._list_students()
-        student_id = input("\nIngrese ID del estudiante: ").strip()
-        if student_id not in self.students:
-            print(f"\n Error: Estudiante {student_id} no encontrado")
+        student = self._select_student()
+        if student is None:
             return
-        student = self.students[student_id]
         print("\n¿El estudiante cumplió con la asistencia mínima requerida?")
         response = input("(S/N): ").strip().upper()
         has_attendance = response == 'S'
@@ -167,16 +162,13 @@ class GradeCalculatorApp:
         if not self.calculator:
             print("\n Error: Debe inicializar el sistema primero")
             return
-        if not self.students:
+        if not self.roster:
             print("\n Error: No hay estudiantes registrados")
             return
         print("\n--- CALCULAR NOTA FINAL (RF04) ---")
-        self._list_students()
-        student_id = input("\nIngrese ID del estudiante: ").strip()
-        if student_id not in self.students:
-            print(f"\n Error: Estudiante {student_id} no encontrado")
+        student = self._select_student()
+        if student is None:
             return
-        student = self.students[student_id]
         if student.get_evaluation_count() == 0:
             print(f"\n Error: El estudiante no tiene evaluaciones registradas")
             return
@@ -205,75 +197,82 @@ class GradeCalculatorApp:
         if not self.calculator:
             print("\n Error: Debe inicializar el sistema primero")
             return
-        if not self.students:
+        if not self.roster:
             print("\n Error: No hay estudiantes registrados")
             return
         print("\n--- DETALLE DEL CÁLCULO (RF05) ---")
-        self._list_students()
-        student_id = input("\nIngrese ID del estudiante: ").strip()
-        if student_id not in self.students:
-            print(f"\n Error: Estudiante {student_id} no encontrado")
+        student = self._select_student()
+        if student is None:
             return
-        student = self.students[student_id]
         if student.get_evaluation_count() == 0:
             print(f"\n Error: El estudiante no tiene evaluaciones registradas")
             return
         try:
             extra_points = float(input("Puntos extra a considerar (0 si no aplica): "))
             detail = self.calculator.get_calculation_detail(student, extra_points)
-            print("\n" + "=" * 70)
-            print("DETALLE COMPLETO DEL CÁLCULO")
-            print("=" * 70)
-            print("\n1. INFORMACIÓN DEL ESTUDIANTE:")
-            print(f"   ID: {detail['student_info']['id']}")
-            print(f"   Nombre: {detail['student_info']['name']}")
-            print(f"   Evaluaciones registradas: {detail['student_info']['evaluations_count']}")
-            print("\n2. EVALUACIONES:")
-            for eval_detail in detail['evaluations_detail']:
-                print(f"\n   Evaluación {eval_detail['number']}: {eval_detail['name']}")
-                print(f"   - Nota: {eval_detail['score']}/20")
-                print(f"   - Peso: {eval_detail['weight']}%")
-                print(f"   - Contribución: {eval_detail['contribution']}")
-            print("\n3. CÁLCULO BASE:")
-            print(f"   Fórmula: {detail['base_calculation']['formula']}")
-            print(f"   Peso total: {detail['base_calculation']['total_weight']}%")
-            print(f"   Nota base: {detail['base_calculation']['base_grade']}")
-            print("\n4. ASISTENCIA:")
-            print(f"   Cumple requisito: {' SÍ' if detail['attendance']['meets_requirement'] else ' NO'}")
-            print(f"   Estado: {detail['attendance']['message']}")
-            print(f"   Impacto: {detail['attendance']['impact']}")
-            print("\n5. PUNTOS EXTRA:")
-            print(f"   Solicitados: {detail['extra_points']['requested']}")
-            print(f"   Aplicados: {detail['extra_points']['applied']}")
-            print(f"   Docentes aprueban: {' SÍ' if detail['extra_points']['teachers_agree'] else ' NO'}")
-            print(f"   Detalle: {detail['extra_points']['message']}")
-            print("\n6. RESULTADO FINAL:")
-            print(f"   NOTA FINAL: {detail['final_result']['final_grade']}")
-            print(f"   Umbral de aprobación: {detail['final_result']['approval_threshold']}")
-            print(f"   Estado: {' APROBADO' if detail['final_result']['passes_course'] else ' DESAPROBADO'}")
-            if detail['final_result']['grade_capped']:
-                print(f"   NOTA: Nota limitada a 20 (máximo permitido)")
-            print("\n7. METADATA:")
-            print(f"   Calculado por: {detail['metadata']['calculated_by']}")
-            print(f"   ID Docente: {detail['metadata']['teacher_id']}")
-            print(f"   Tiempo de cálculo: {detail['metadata']['calculation_time_ms']} ms")
-            print(f"   Fecha/Hora: {detail['metadata']['timestamp']}")
-            print("\n" + "=" * 70)
+            body, row, _ = ReportRenderer.compile_templates(ReportRenderer.FORMAT_TEXT)
+            print(ReportRenderer.render_detail(detail, body, row), end='')
         except GradeCalculationError as e:
             print(f"\n Error en el cálculo: {e}")
         except Exception as e:
             print(f"\n Error: {e}")
     def list_students(self) -> None:
         
-        if not self.students:
+        if not self.roster:
             print("\n No hay estudiantes registrados")
             return
         print("\n--- ESTUDIANTES REGISTRADOS ---")
-        self._list_students()
-    def _list_students(self) -> None:
+        query = input("Buscar por ID o nombre (Enter para todos): ").strip() or None
+        print("Filtro: 1) Todos  2) Sin evaluaciones  3) Sin asistencia mínima")
+        filters = {
+            '2': RosterIndex.FILTER_MISSING_EVALUATIONS,
+            '3': RosterIndex.FILTER_NO_ATTENDANCE
+        }
+        filter_name = filters.get(input("Seleccione un filtro (Enter para todos): ").strip())
+        page = 1
+        while True:
+            listing = self.roster.page(page, self.PAGE_SIZE, query=query, filter_name=filter_name)
+            self._print_page(listing)
+            if not listing['has_next'] or input("\nEnter para la siguiente página, otra tecla para salir: ").strip():
+                return
+            page += 1
+    def _select_student(self) -> Optional[Student]:
+        
+        # Se muestra una página a la vez; un texto que no es un ID exacto se usa como búsqueda por prefijo
+        query = None
+        page = 1
+        while True:
+            listing = self.roster.page(page, self.PAGE_SIZE, query=query)
+            self._print_page(listing)
+            hint = ", Enter para la siguiente página" if listing['has_next'] else ""
+            entry = input(f"\nIngrese ID del estudiante (o parte del ID/nombre para buscar{hint}): ").strip()
+            if not entry:
+                if listing['has_next']:
+                    page += 1
+                    continue
+                print("\n Error: No se seleccionó ningún estudiante")
+                return None
+            student = self.roster.get(entry)
+            if student is not None:
+                return student
+            matches = self.roster.search(entry, limit=2)
+            if len(matches) == 1:
+                return matches[0]
+            if not matches:
+                print(f"\n Error: Estudiante {entry} no encontrado")
+                return None
+            query, page = entry, 1
+    def _print_page(self, listing: dict) -> None:
         
-        for student_id, student in self.students.items():
-            print(f"  - {student.name} (ID: {student_id}) - "
+        if not listing['total']:
+            print("  (sin resultados)")
+            return
+        first = (listing['page'] - 1) * listing['page_size'] + 1
+        last = first + len(listing['students']) - 1
+        print(f"  Mostrando {first}-{last} de {listing['total']} "
+              f"(página {listing['page']}/{listing['pages']})")
+        for student in listing['students']:
+            print(f"  - {student.name} (ID: {student.student_id}) - "
                   f"Evaluaciones: {student.get_evaluation_count()}, "
                   f"Asistencia: {'' if student.has_minimum_attendance else ''}")
     def run_complete_demo(self) -> None:
@@ -288,7 +287,7 @@ class GradeCalculatorApp:
             print(f"    Docente registrado: {self.current_teacher.name}")
             print("\n2. Registrando estudiante...")
             student = Student("202110001", "María González")
-            self.students[student.student_id] = student
+            self.roster.track(student)
             print(f"    Estudiante: {student.name}")
             print("\n3. RF01: Registrando evaluaciones...")
             evaluations = [
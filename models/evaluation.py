@@ -1,5 +1,7 @@
 from typing import Optional
 
+from utils.fixed_point import score_to_hundredths, weight_to_basis_points
+
 class Evaluation:
     
     def __init__(self, name: str, score: float, weight: float):
@@ -38,6 +40,16 @@ class Evaluation:
         
         return self._weight
     
+    @property
+    def score_hundredths(self) -> int:
+        
+        return score_to_hundredths(self._score)
+    
+    @property
+    def weight_basis_points(self) -> int:
+        
+        return weight_to_basis_points(self._weight)
+    
     def calculate_weighted_score(self) -> float:
         
         return (self._score * self._weight) / 100.0
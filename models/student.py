@@ -1,4 +1,5 @@
-from typing import List, Optional
+import hashlib
+from typing import Callable, Dict, List, Optional
 from .evaluation import Evaluation
 
 class Student:
@@ -14,6 +15,9 @@ class Student:
         self._name = name.strip()
         self._evaluations: List[Evaluation] = []
         self._has_minimum_attendance: bool = False
+        self._listeners: Optional[List[Callable[['Student'], None]]] = None
+        self._evaluation_index: Optional[Dict[str, int]] = None
+        self._fingerprint: Optional[str] = None
         
     @property
     def student_id(self) -> str:
@@ -30,6 +34,20 @@ class Student:
         
         return self._evaluations.copy()
     
+    @property
+    def fingerprint(self) -> str:
+        
+        # Huella estable entre reinicios (hash() de strings usa semilla aleatoria); se invalida en cada cambio
+        if self._fingerprint is None:
+            state = (
+                self._student_id,
+                self._name,
+                self._has_minimum_attendance,
+                [(e.name, e.score, e.weight) for e in self._evaluations]
+            )
+            self._fingerprint = hashlib.blake2b(repr(state).encode('utf-8'), digest_size=16).hexdigest()
+        return self._fingerprint
+    
     @property
     def has_minimum_attendance(self) -> bool:
         
@@ -41,6 +59,7 @@ class Student:
         if not isinstance(value, bool):
             raise ValueError("El valor de asistencia mínima debe ser booleano")
         self._has_minimum_attendance = value
+        self._notify_change()
     
     def add_evaluation(self, evaluation: Evaluation) -> None:
         
@@ -52,7 +71,94 @@ class Student:
                 f"El estudiante {self._student_id} ya tiene el máximo de 10 evaluaciones (RNF01)"
             )
         
+        if self._evaluation_index is not None:
+            self._evaluation_index.setdefault(evaluation.name, len(self._evaluations))
         self._evaluations.append(evaluation)
+        self._notify_change()
+    
+    def add_evaluations(self, evaluations: List[Evaluation]) -> None:
+        
+        if not all(isinstance(evaluation, Evaluation) for evaluation in evaluations):
+            raise TypeError("Debe proporcionar instancias de Evaluation")
+        
+        if len(self._evaluations) + len(evaluations) > 10:
+            raise ValueError(
+                f"El estudiante {self._student_id} superaría el máximo de 10 evaluaciones (RNF01)"
+            )
+        
+        # Se agregan todas o ninguna, con una sola notificación a los suscriptores
+        if self._evaluation_index is not None:
+            for position, evaluation in enumerate(evaluations, len(self._evaluations)):
+                self._evaluation_index.setdefault(evaluation.name, position)
+        self._evaluations.extend(evaluations)
+        self._notify_change()
+    
+    def _name_index(self) -> Dict[str, int]:
+        
+        # El índice por nombre se construye al primer uso y luego se mantiene en cada cambio
+        if self._evaluation_index is None:
+            index: Dict[str, int] = {}
+            for position, evaluation in enumerate(self._evaluations):
+                index.setdefault(evaluation.name, position)
+            self._evaluation_index = index
+        return self._evaluation_index
+    
+    def get_evaluation(self, name: str) -> Optional[Evaluation]:
+        
+        position = self._name_index().get(name.strip() if isinstance(name, str) else name)
+        return self._evaluations[position] if position is not None else None
+    
+    def upsert_evaluation(self, evaluation: Evaluation) -> bool:
+        
+        if not isinstance(evaluation, Evaluation):
+            raise TypeError("Debe proporcionar una instancia de Evaluation")
+        
+        position = self._name_index().get(evaluation.name)
+        if position is None:
+            self.add_evaluation(evaluation)
+            return True
+        
+        self._evaluations[position] = evaluation
+        self._notify_change()
+        return False
+    
+    def delete_evaluation(self, name: str) -> bool:
+        
+        if not name or not isinstance(name, str):
+            raise ValueError("El nombre de la evaluación debe ser un string no vacío")
+        
+        index = self._name_index()
+        position = index.get(name.strip())
+        if position is None:
+            return False
+        
+        del self._evaluations[position]
+        # Como máximo 10 evaluaciones: reindexar es de costo acotado
+        self._evaluation_index = None
+        self._name_index()
+        self._notify_change()
+        return True
+    
+    def subscribe(self, listener: Callable[['Student'], None]) -> None:
+        
+        if not callable(listener):
+            raise TypeError("El suscriptor debe ser invocable")
+        
+        if self._listeners is None:
+            self._listeners = []
+        self._listeners.append(listener)
+    
+    def unsubscribe(self, listener: Callable[['Student'], None]) -> None:
+        
+        if self._listeners and listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    def _notify_change(self) -> None:
+        
+        self._fingerprint = None
+        if self._listeners:
+            for listener in tuple(self._listeners):
+                listener(self)
     
     def get_evaluation_count(self) -> int:
         
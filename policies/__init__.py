@@ -1,4 +1,13 @@
 from .attendance_policy import AttendancePolicy
 from .extra_points_policy import ExtraPointsPolicy
+from .compiled_policy import CompiledPolicy
+from .grading_rules import GradingRules, CompiledRules, DEFAULT_RULES
 
-__all__ = ['AttendancePolicy', 'ExtraPointsPolicy']
+__all__ = [
+    'AttendancePolicy',
+    'ExtraPointsPolicy',
+    'CompiledPolicy',
+    'GradingRules',
+    'CompiledRules',
+    'DEFAULT_RULES'
+]
@@ -1,14 +1,32 @@
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Dict, Mapping, Any
 
 class AttendancePolicy:
     
+    MINIMUM_ATTENDANCE_PERCENTAGE = 70.0
+    
     _all_years_teachers_agree: bool = True
+    _policy_version: int = 0
+    
+    # Resultados constantes de solo lectura, compartidos por la ruta compilada; check_minimum_attendance entrega copias
+    MEETS_REQUIREMENT: Mapping[str, Any] = MappingProxyType({
+        'meets_requirement': True,
+        'penalty': 0.0,
+        'message': 'Cumple con asistencia mínima requerida'
+    })
+    FAILS_REQUIREMENT: Mapping[str, Any] = MappingProxyType({
+        'meets_requirement': False,
+        'penalty': 0.0,  # La penalización se aplica en la lógica de negocio
+        'message': 'NO cumple con asistencia mínima requerida (factor determinante para aprobación)'
+    })
     
     @classmethod
     def set_teachers_agreement(cls, agreement: bool) -> None:
         
         if not isinstance(agreement, bool):
             raise ValueError("El acuerdo de docentes debe ser un valor booleano")
+        if agreement != cls._all_years_teachers_agree:
+            cls._policy_version += 1
         cls._all_years_teachers_agree = agreement
     
     @classmethod
@@ -16,24 +34,22 @@ class AttendancePolicy:
         
         return cls._all_years_teachers_agree
     
+    @classmethod
+    def get_policy_version(cls) -> int:
+        
+        return cls._policy_version
+    
     @staticmethod
     def check_minimum_attendance(has_minimum_attendance: bool) -> Dict[str, Any]:
         
         if not isinstance(has_minimum_attendance, bool):
             raise ValueError("El parámetro de asistencia debe ser booleano")
         
+        # dict nuevo en cada llamada: quien lo recibe puede modificarlo o serializarlo
         if has_minimum_attendance:
-            return {
-                'meets_requirement': True,
-                'penalty': 0.0,
-                'message': 'Cumple con asistencia mínima requerida'
-            }
+            return dict(AttendancePolicy.MEETS_REQUIREMENT)
         else:
-            return {
-                'meets_requirement': False,
-                'penalty': 0.0,  # La penalización se aplica en la lógica de negocio
-                'message': 'NO cumple con asistencia mínima requerida (factor determinante para aprobación)'
-            }
+            return dict(AttendancePolicy.FAILS_REQUIREMENT)
     
     @staticmethod
     def validate_attendance_record(attendance_percentage: float) -> bool:
@@ -44,5 +60,4 @@ class AttendancePolicy:
         if attendance_percentage < 0 or attendance_percentage > 100:
             raise ValueError("El porcentaje de asistencia debe estar entre 0 y 100")
         
-        MINIMUM_ATTENDANCE_PERCENTAGE = 70.0
-        return attendance_percentage >= MINIMUM_ATTENDANCE_PERCENTAGE
+        return attendance_percentage >= AttendancePolicy.MINIMUM_ATTENDANCE_PERCENTAGE
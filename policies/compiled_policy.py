@@ -0,0 +1,89 @@
+from typing import Callable, Mapping, Any, Optional, Tuple
+
+from utils.fixed_point import MAX_SCORE
+from .attendance_policy import AttendancePolicy
+
+def _apply_extra_points(base_grade: float, extra_points: float) -> Tuple[float, float, bool]:
+    
+    final_grade = base_grade + extra_points
+    if final_grade > 20:
+        return extra_points, 20.0, True
+    return extra_points, round(final_grade, 2), False
+
+def _reject_extra_points(base_grade: float, extra_points: float) -> Tuple[float, float, bool]:
+    
+    return 0.0, base_grade, False
+
+def _apply_extra_points_fixed(base_grade: int, extra_points: int) -> Tuple[int, int, bool]:
+    
+    final_grade = base_grade + extra_points
+    if final_grade > MAX_SCORE:
+        return extra_points, MAX_SCORE, True
+    return extra_points, final_grade, False
+
+def _reject_extra_points_fixed(base_grade: int, extra_points: int) -> Tuple[int, int, bool]:
+    
+    return 0, base_grade, False
+
+class CompiledPolicy:
+    
+    # Tabla de decisión indexada por el acuerdo docente: (escala flotante, punto fijo)
+    _EXTRA_POINTS_TABLE = {
+        True: (_apply_extra_points, _apply_extra_points_fixed),
+        False: (_reject_extra_points, _reject_extra_points_fixed)
+    }
+    
+    # Indexada por el cumplimiento de asistencia: no depende del acuerdo docente
+    _ATTENDANCE_TABLE = (AttendancePolicy.FAILS_REQUIREMENT, AttendancePolicy.MEETS_REQUIREMENT)
+    
+    _current: Optional['CompiledPolicy'] = None
+    
+    def __init__(self, version: int, teachers_agree: bool):
+        
+        if not isinstance(teachers_agree, bool):
+            raise ValueError("El acuerdo de docentes debe ser booleano")
+        
+        self._version = version
+        self._teachers_agree = teachers_agree
+        self._extra_points, self._extra_points_fixed = self._EXTRA_POINTS_TABLE[teachers_agree]
+    
+    @classmethod
+    def current(cls) -> 'CompiledPolicy':
+        
+        version = AttendancePolicy.get_policy_version()
+        compiled = cls._current
+        # Se reutiliza mientras la política no cambie de versión
+        if compiled is None or compiled._version != version:
+            compiled = cls(version, AttendancePolicy.get_teachers_agreement())
+            cls._current = compiled
+        return compiled
+    
+    @property
+    def version(self) -> int:
+        
+        return self._version
+    
+    @property
+    def teachers_agree(self) -> bool:
+        
+        return self._teachers_agree
+    
+    @property
+    def apply_extra_points(self) -> Callable[[float, float], Tuple[float, float, bool]]:
+        
+        return self._extra_points
+    
+    @property
+    def apply_extra_points_fixed(self) -> Callable[[int, int], Tuple[int, int, bool]]:
+        
+        return self._extra_points_fixed
+    
+    def attendance_check(self, has_minimum_attendance: bool) -> Mapping[str, Any]:
+        
+        return self._ATTENDANCE_TABLE[has_minimum_attendance]
+    
+    def __str__(self) -> str:
+        return f"CompiledPolicy(Version: {self._version}, Teachers agree: {self._teachers_agree})"
+    
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -1,5 +1,7 @@
 from typing import Dict, Any, List
 
+from utils.fixed_point import MAX_SCORE, hundredths_to_float
+
 class ExtraPointsPolicy:
     
     _all_years_teachers: List[str] = []
@@ -66,6 +68,52 @@ class ExtraPointsPolicy:
             'message': message
         }
     
+    @staticmethod
+    def calculate_extra_points_fixed(
+        base_hundredths: int,
+        extra_hundredths: int,
+        teachers_agree: bool
+    ) -> Dict[str, Any]:
+        
+        if not isinstance(base_hundredths, int) or isinstance(base_hundredths, bool):
+            raise ValueError("La nota base en centésimas debe ser un entero")
+        
+        if not isinstance(extra_hundredths, int) or isinstance(extra_hundredths, bool):
+            raise ValueError("Los puntos extra en centésimas deben ser un entero")
+        
+        if not isinstance(teachers_agree, bool):
+            raise ValueError("El acuerdo de docentes debe ser booleano")
+        
+        if base_hundredths < 0 or base_hundredths > MAX_SCORE:
+            raise ValueError("La nota base debe estar entre 0 y 20")
+        
+        if extra_hundredths < 0:
+            raise ValueError("Los puntos extra no pueden ser negativos")
+        
+        if not teachers_agree:
+            return {
+                'extra_points_applied': 0,
+                'final_grade': base_hundredths,
+                'capped': False,
+                'message': 'Puntos extra NO aplicados: docentes no están de acuerdo'
+            }
+        
+        final_grade = base_hundredths + extra_hundredths
+        capped = final_grade > MAX_SCORE
+        if capped:
+            final_grade = MAX_SCORE
+        
+        message = f'Puntos extra aplicados: +{hundredths_to_float(extra_hundredths):.2f}'
+        if capped:
+            message += ' (nota limitada a 20)'
+        
+        return {
+            'extra_points_applied': extra_hundredths,
+            'final_grade': final_grade,
+            'capped': capped,
+            'message': message
+        }
+    
     @staticmethod
     def validate_extra_points(extra_points: float, max_allowed: float = 2.0) -> bool:
         
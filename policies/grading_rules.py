@@ -0,0 +1,449 @@
+import shlex
+from array import array
+from typing import Callable, Dict, Any, List, Optional, Sequence, Tuple
+
+from utils.exceptions import InvalidGradingRuleError, InvalidWeightError
+from .attendance_policy import AttendancePolicy
+
+# Reglas vigentes de CS-GradeCalculator expresadas en el lenguaje de reglas
+DEFAULT_RULES = """
+threshold 10.5
+cap 20
+require attendance
+extra_points when teachers_agree and attendance
+"""
+
+class GradingRules:
+    
+    EXTRA_CONDITIONS = ('teachers_agree', 'attendance')
+    
+    _course_rules: Dict[str, 'CompiledRules'] = {}
+    _default_compiled: Optional['CompiledRules'] = None
+    
+    def __init__(
+        self,
+        threshold: float = 10.5,
+        cap: float = 20.0,
+        require_attendance: bool = False,
+        extra_points_mode: str = 'never',
+        extra_points_conditions: Tuple[str, ...] = (),
+        drop_lowest: int = 0,
+        minimums: Tuple[Tuple[Optional[str], float], ...] = ()
+    ):
+        
+        if cap <= 0:
+            raise InvalidGradingRuleError("El tope de la nota debe ser positivo")
+        if threshold < 0 or threshold > cap:
+            raise InvalidGradingRuleError("El umbral de aprobación debe estar entre 0 y el tope")
+        if drop_lowest < 0:
+            raise InvalidGradingRuleError("drop_lowest no puede ser negativo")
+        
+        self._threshold = float(threshold)
+        self._cap = float(cap)
+        self._require_attendance = require_attendance
+        self._extra_points_mode = extra_points_mode
+        self._extra_points_conditions = tuple(extra_points_conditions)
+        self._drop_lowest = drop_lowest
+        self._minimums = tuple(minimums)
+    
+    @property
+    def threshold(self) -> float:
+        
+        return self._threshold
+    
+    @property
+    def cap(self) -> float:
+        
+        return self._cap
+    
+    @property
+    def require_attendance(self) -> bool:
+        
+        return self._require_attendance
+    
+    @property
+    def extra_points_mode(self) -> str:
+        
+        return self._extra_points_mode
+    
+    @property
+    def extra_points_conditions(self) -> Tuple[str, ...]:
+        
+        return self._extra_points_conditions
+    
+    @property
+    def drop_lowest(self) -> int:
+        
+        return self._drop_lowest
+    
+    @property
+    def minimums(self) -> Tuple[Tuple[Optional[str], float], ...]:
+        
+        return self._minimums
+    
+    @classmethod
+    def parse(cls, text: str) -> 'GradingRules':
+        
+        if not isinstance(text, str):
+            raise InvalidGradingRuleError("Las reglas deben ser un texto")
+        
+        options: Dict[str, Any] = {}
+        minimums: List[Tuple[Optional[str], float]] = []
+        
+        for line_number, line in enumerate(text.splitlines(), 1):
+            try:
+                tokens = shlex.split(line, comments=True)
+            except ValueError as e:
+                raise InvalidGradingRuleError(f"Línea {line_number}: {e}") from e
+            
+            if not tokens:
+                continue
+            
+            directive, args = tokens[0], tokens[1:]
+            if directive != 'minimum' and directive in options:
+                raise InvalidGradingRuleError(
+                    f"Línea {line_number}: la directiva '{directive}' está repetida"
+                )
+            
+            if directive in ('threshold', 'cap'):
+                options[directive] = cls._parse_number(args, line_number, directive)
+            elif directive == 'require':
+                if args != ['attendance']:
+                    raise InvalidGradingRuleError(
+                        f"Línea {line_number}: solo se admite 'require attendance'"
+                    )
+                options[directive] = True
+            elif directive == 'extra_points':
+                options[directive] = cls._parse_extra_points(args, line_number)
+            elif directive == 'drop_lowest':
+                value = cls._parse_number(args, line_number, directive)
+                if value != int(value) or value < 0:
+                    raise InvalidGradingRuleError(
+                        f"Línea {line_number}: drop_lowest requiere un entero no negativo"
+                    )
+                options[directive] = int(value)
+            elif directive == 'minimum':
+                if len(args) != 2:
+                    raise InvalidGradingRuleError(
+                        f"Línea {line_number}: uso 'minimum <evaluación|*> <nota>'"
+                    )
+                name = None if args[0] == '*' else args[0]
+                minimums.append((name, cls._parse_number(args[1:], line_number, directive)))
+            else:
+                raise InvalidGradingRuleError(
+                    f"Línea {line_number}: directiva desconocida '{directive}'"
+                )
+        
+        mode, conditions = options.get('extra_points', ('never', ()))
+        return cls(
+            threshold=options.get('threshold', 10.5),
+            cap=options.get('cap', 20.0),
+            require_attendance=options.get('require', False),
+            extra_points_mode=mode,
+            extra_points_conditions=conditions,
+            drop_lowest=options.get('drop_lowest', 0),
+            minimums=tuple(minimums)
+        )
+    
+    @staticmethod
+    def _parse_number(args: List[str], line_number: int, directive: str) -> float:
+        
+        if len(args) != 1:
+            raise InvalidGradingRuleError(
+                f"Línea {line_number}: '{directive}' requiere un único valor numérico"
+            )
+        try:
+            return float(args[0])
+        except ValueError as e:
+            raise InvalidGradingRuleError(
+                f"Línea {line_number}: '{args[0]}' no es un número válido"
+            ) from e
+    
+    @classmethod
+    def _parse_extra_points(cls, args: List[str], line_number: int) -> Tuple[str, Tuple[str, ...]]:
+        
+        if args in (['always'], ['never']):
+            return args[0], ()
+        
+        if len(args) < 2 or args[0] != 'when':
+            raise InvalidGradingRuleError(
+                f"Línea {line_number}: uso 'extra_points always|never|when <condición> [and <condición>]'"
+            )
+        
+        conditions = args[1::2]
+        connectors = args[2::2]
+        if any(connector != 'and' for connector in connectors) or len(connectors) != len(conditions) - 1:
+            raise InvalidGradingRuleError(
+                f"Línea {line_number}: las condiciones se combinan con 'and'"
+            )
+        for condition in conditions:
+            if condition not in cls.EXTRA_CONDITIONS:
+                raise InvalidGradingRuleError(
+                    f"Línea {line_number}: condición desconocida '{condition}'"
+                )
+        
+        return 'when', tuple(conditions)
+    
+    def compile(self) -> 'CompiledRules':
+        
+        return CompiledRules(self)
+    
+    @classmethod
+    def register_course(cls, course_id: str, rules: 'GradingRules') -> 'CompiledRules':
+        
+        if not course_id or not isinstance(course_id, str):
+            raise ValueError("El ID del curso debe ser un string no vacío")
+        
+        if isinstance(rules, str):
+            rules = cls.parse(rules)
+        if not isinstance(rules, GradingRules):
+            raise ValueError("Debe proporcionar reglas válidas")
+        
+        compiled = rules.compile()
+        cls._course_rules[course_id.strip()] = compiled
+        return compiled
+    
+    @classmethod
+    def for_course(cls, course_id: str) -> 'CompiledRules':
+        
+        compiled = cls._course_rules.get(course_id)
+        if compiled is not None:
+            return compiled
+        
+        if cls._default_compiled is None:
+            cls._default_compiled = cls.parse(DEFAULT_RULES).compile()
+        return cls._default_compiled
+    
+    def __str__(self) -> str:
+        return (
+            f"GradingRules(Threshold: {self._threshold}, Cap: {self._cap}, "
+            f"Attendance: {self._require_attendance}, Extra: {self._extra_points_mode}, "
+            f"Drop lowest: {self._drop_lowest}, Minimums: {len(self._minimums)})"
+        )
+    
+    def __repr__(self) -> str:
+        return self.__str__()
+
+class CompiledRules:
+    
+    def __init__(self, rules: GradingRules):
+        
+        self._rules = rules
+        self._simple = not rules.drop_lowest and not rules.minimums
+        self._needs_names = bool(rules.minimums)
+        self._base = self._build_base_step(rules)
+        self._finish = self._build_finish_step(rules)
+        self._eligible = self._build_eligibility(rules)
+    
+    @property
+    def rules(self) -> GradingRules:
+        
+        return self._rules
+    
+    @staticmethod
+    def _build_base_step(rules: GradingRules) -> Callable[..., Tuple[float, List[str]]]:
+        
+        # Cada decisión se resuelve aquí una sola vez; el paso compilado solo contiene lo activo
+        drop_lowest = rules.drop_lowest
+        named_minimums = {name: value for name, value in rules.minimums if name is not None}
+        global_minimum = max(
+            (value for name, value in rules.minimums if name is None),
+            default=None
+        )
+        has_minimums = bool(named_minimums) or global_minimum is not None
+        
+        def base_step(
+            scores: Sequence[float],
+            weights: Sequence[float],
+            names: Optional[Sequence[str]]
+        ) -> Tuple[float, List[str]]:
+            
+            total_weight = sum(weights)
+            if abs(total_weight - 100.0) > 0.01:
+                raise InvalidWeightError(
+                    f"Los pesos de las evaluaciones deben sumar 100%, actualmente suman {total_weight}%"
+                )
+            
+            if drop_lowest:
+                if len(scores) <= drop_lowest:
+                    raise InvalidGradingRuleError(
+                        f"Se requieren más de {drop_lowest} evaluaciones para descartar las más bajas"
+                    )
+                kept = sorted(range(len(scores)), key=scores.__getitem__)[drop_lowest:]
+                kept_weight = sum(weights[i] for i in kept)
+                base_grade = sum(scores[i] * weights[i] for i in kept) / kept_weight if kept_weight else 0.0
+            else:
+                base_grade = sum(s * w / 100.0 for s, w in zip(scores, weights))
+            
+            failed: List[str] = []
+            if has_minimums:
+                for i, score in enumerate(scores):
+                    minimum = named_minimums.get(names[i]) if names is not None else None
+                    if global_minimum is not None and (minimum is None or global_minimum > minimum):
+                        minimum = global_minimum
+                    if minimum is not None and score < minimum:
+                        label = names[i] if names is not None else f"#{i + 1}"
+                        failed.append(f"minimum {label} {minimum}")
+            
+            return base_grade, failed
+        
+        return base_step
+    
+    @staticmethod
+    def _build_eligibility(rules: GradingRules) -> Callable[[bool, bool], bool]:
+        
+        mode = rules.extra_points_mode
+        needs_agreement = 'teachers_agree' in rules.extra_points_conditions
+        needs_attendance = 'attendance' in rules.extra_points_conditions
+        
+        def eligible(has_attendance: bool, teachers_agree: bool) -> bool:
+            
+            if mode == 'always':
+                return True
+            if mode != 'when':
+                return False
+            return (teachers_agree or not needs_agreement) and (has_attendance or not needs_attendance)
+        
+        return eligible
+    
+    @staticmethod
+    def _build_finish_step(rules: GradingRules) -> Callable[..., Tuple[float, float, bool, bool]]:
+        
+        threshold = rules.threshold
+        cap = rules.cap
+        require_attendance = rules.require_attendance
+        eligible = CompiledRules._build_eligibility(rules)
+        
+        def finish_step(
+            base_grade: float,
+            failed: List[str],
+            has_attendance: bool,
+            extra_points: float,
+            teachers_agree: bool
+        ) -> Tuple[float, float, bool, bool]:
+            
+            extra_applied = extra_points if eligible(has_attendance, teachers_agree) else 0.0
+            
+            # El tope y el redondeo se aplican en toda rama, haya o no puntos extra
+            final_grade = base_grade + extra_applied
+            capped = final_grade > cap
+            final_grade = cap if capped else round(final_grade, 2)
+            
+            if require_attendance and not has_attendance:
+                failed.append('require attendance')
+            
+            passes_course = not failed and final_grade >= threshold
+            return extra_applied, final_grade, capped, passes_course
+        
+        return finish_step
+    
+    def extra_points_eligible(self, has_attendance: bool, teachers_agree: Optional[bool] = None) -> bool:
+        
+        if teachers_agree is None:
+            teachers_agree = AttendancePolicy.get_teachers_agreement()
+        return self._eligible(has_attendance, teachers_agree)
+    
+    def evaluate(
+        self,
+        evaluations: Sequence,
+        has_attendance: bool,
+        extra_points: float = 0.0,
+        teachers_agree: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        
+        if teachers_agree is None:
+            teachers_agree = AttendancePolicy.get_teachers_agreement()
+        
+        if self._simple:
+            total_weight = sum(e.weight for e in evaluations)
+            if abs(total_weight - 100.0) > 0.01:
+                raise InvalidWeightError(
+                    f"Los pesos de las evaluaciones deben sumar 100%, actualmente suman {total_weight}%"
+                )
+            base_grade = sum(e.calculate_weighted_score() for e in evaluations)
+            failed: List[str] = []
+        else:
+            base_grade, failed = self._base(
+                [e.score for e in evaluations],
+                [e.weight for e in evaluations],
+                [e.name for e in evaluations] if self._needs_names else None
+            )
+        
+        applied, final_grade, capped, passes_course = self._finish(
+            base_grade,
+            failed,
+            has_attendance,
+            extra_points,
+            teachers_agree
+        )
+        
+        return {
+            'base_grade': round(base_grade, 2),
+            'extra_points_applied': applied,
+            'final_grade': final_grade,
+            'passes_course': passes_course,
+            'grade_capped': capped,
+            'failed_rules': failed
+        }
+    
+    def evaluate_columns(
+        self,
+        scores: Sequence[float],
+        weights: Sequence[float],
+        offsets: Sequence[int],
+        has_attendance: Sequence[bool],
+        extra_points: Sequence[float],
+        names: Optional[Sequence[str]] = None,
+        teachers_agree: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        
+        if len(offsets) != len(has_attendance) + 1 or len(has_attendance) != len(extra_points):
+            raise ValueError("Las columnas no tienen longitudes consistentes")
+        
+        if teachers_agree is None:
+            teachers_agree = AttendancePolicy.get_teachers_agreement()
+        
+        base_step = self._base
+        finish_step = self._finish
+        base_grades = array('d')
+        final_grades = array('d')
+        passes_course = []
+        errors: Dict[int, str] = {}
+        
+        for i, (start, end) in enumerate(zip(offsets, offsets[1:])):
+            try:
+                base_grade, failed = base_step(
+                    scores[start:end],
+                    weights[start:end],
+                    names[start:end] if names is not None else None
+                )
+            except (InvalidWeightError, InvalidGradingRuleError) as e:
+                errors[i] = str(e)
+                base_grades.append(-1.0)
+                final_grades.append(-1.0)
+                passes_course.append(False)
+                continue
+            
+            _, final_grade, _, passes = finish_step(
+                base_grade,
+                failed,
+                has_attendance[i],
+                extra_points[i],
+                teachers_agree
+            )
+            base_grades.append(round(base_grade, 2))
+            final_grades.append(final_grade)
+            passes_course.append(passes)
+        
+        return {
+            'base_grade': base_grades,
+            'final_grade': final_grades,
+            'passes_course': passes_course,
+            'errors': errors
+        }
+    
+    def __str__(self) -> str:
+        return f"CompiledRules({self._rules})"
+    
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -1,3 +1,48 @@
 from .grade_calculator import GradeCalculator
+from .cohort_statistics import CohortStatistics
+from .ranking_index import RankingIndex
+from .projection_engine import ProjectionEngine
+from .pass_simulator import PassSimulator
+from .attendance_tracker import AttendanceTracker
+from .gradebook_journal import GradebookJournal
+from .grade_feed import GradeChangeFeed, FeedSubscription
+from .delta_export import DeltaExporter
+from .gradebook import Gradebook, GradebookSnapshot
+from .sharded_gradebook import ShardedGradebook, ConsistentHashRing
+from .job_queue import JobQueue, WorkerPool
+from .report_renderer import ReportRenderer, ReportTemplate
+from .columnar_export import ColumnarWriter, ColumnarReader
+from .history_archive import HistoryArchive
+from .section_views import SectionViews
+from .grade_cache import GradeCache
+from .cohort_generator import CohortGenerator, CohortRecord
+from .roster_index import RosterIndex
 
-__all__ = ['GradeCalculator']
+__all__ = [
+    'GradeCalculator',
+    'CohortStatistics',
+    'RankingIndex',
+    'ProjectionEngine',
+    'PassSimulator',
+    'AttendanceTracker',
+    'GradebookJournal',
+    'GradeChangeFeed',
+    'FeedSubscription',
+    'DeltaExporter',
+    'Gradebook',
+    'GradebookSnapshot',
+    'ShardedGradebook',
+    'ConsistentHashRing',
+    'JobQueue',
+    'WorkerPool',
+    'ReportRenderer',
+    'ReportTemplate',
+    'ColumnarWriter',
+    'ColumnarReader',
+    'HistoryArchive',
+    'SectionViews',
+    'GradeCache',
+    'CohortGenerator',
+    'CohortRecord',
+    'RosterIndex'
+]
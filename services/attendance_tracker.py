@@ -0,0 +1,191 @@
+import csv
+import math
+from typing import Dict, Any, Iterable, Mapping, Optional, TextIO, Tuple
+
+from models import Student
+from policies import AttendancePolicy
+from .grade_calculator import GradeCalculator
+
+# Python 3.10+ expone el conteo de bits nativo; antes se cuenta sobre la representación binaria
+if hasattr(int, 'bit_count'):
+    _popcount = int.bit_count
+else:
+    def _popcount(value: int) -> int:
+        
+        return bin(value).count('1')
+
+class AttendanceTracker:
+    
+    def __init__(self, session_count: int):
+        
+        if not isinstance(session_count, int) or session_count <= 0:
+            raise ValueError("El número de sesiones debe ser un entero positivo")
+        
+        self._session_count = session_count
+        # Un bit por sesión; todas las filas viven en un único bytearray contiguo
+        self._stride = (session_count + 7) // 8
+        self._bits = bytearray()
+        self._rows: Dict[str, int] = {}
+    
+    @property
+    def session_count(self) -> int:
+        
+        return self._session_count
+    
+    @property
+    def bytes_per_student(self) -> int:
+        
+        return self._stride
+    
+    def _row_offset(self, student_id: str) -> int:
+        
+        row = self._rows.get(student_id)
+        if row is None:
+            row = len(self._rows)
+            self._rows[student_id] = row
+            self._bits.extend(bytes(self._stride))
+        return row * self._stride
+    
+    def record(self, student_id: str, session: int) -> None:
+        
+        if not student_id or not isinstance(student_id, str):
+            raise ValueError("El ID del estudiante debe ser un string no vacío")
+        
+        if not isinstance(session, int) or session < 0 or session >= self._session_count:
+            raise ValueError(
+                f"La sesión debe estar entre 0 y {self._session_count - 1}"
+            )
+        
+        self._bits[self._row_offset(student_id) + (session >> 3)] |= 1 << (session & 7)
+    
+    def ingest(self, check_ins: Iterable[Tuple[str, int]]) -> int:
+        
+        bits = self._bits
+        rows = self._rows
+        stride = self._stride
+        session_count = self._session_count
+        ingested = 0
+        
+        for student_id, session in check_ins:
+            if not student_id or not isinstance(student_id, str):
+                raise ValueError(
+                    f"El ID del estudiante debe ser un string no vacío (registro {ingested + 1})"
+                )
+            if not isinstance(session, int) or session < 0 or session >= session_count:
+                raise ValueError(
+                    f"La sesión debe estar entre 0 y {session_count - 1} "
+                    f"(registro {ingested + 1})"
+                )
+            row = rows.get(student_id)
+            offset = row * stride if row is not None else self._row_offset(student_id)
+            # Marcar la misma sesión dos veces es idempotente
+            bits[offset + (session >> 3)] |= 1 << (session & 7)
+            ingested += 1
+        
+        return ingested
+    
+    def ingest_csv(
+        self,
+        stream: TextIO,
+        student_column: str = 'student_id',
+        session_column: str = 'session'
+    ) -> int:
+        
+        reader = csv.DictReader(stream)
+        if not reader.fieldnames or student_column not in reader.fieldnames \
+                or session_column not in reader.fieldnames:
+            raise ValueError(
+                f"El archivo debe tener las columnas '{student_column}' y '{session_column}'"
+            )
+        
+        return self.ingest(
+            (row[student_column].strip(), int(row[session_column]))
+            for row in reader
+        )
+    
+    def attended_sessions(self, student_id: str) -> int:
+        
+        row = self._rows.get(student_id)
+        if row is None:
+            return 0
+        
+        start = row * self._stride
+        return _popcount(int.from_bytes(self._bits[start:start + self._stride], 'little'))
+    
+    def percentage(self, student_id: str) -> float:
+        
+        return round(self.attended_sessions(student_id) * 100.0 / self._session_count, 2)
+    
+    def minimum_sessions(
+        self,
+        minimum_percentage: Optional[float] = None
+    ) -> int:
+        
+        if minimum_percentage is None:
+            minimum_percentage = AttendancePolicy.MINIMUM_ATTENDANCE_PERCENTAGE
+        
+        # Umbral entero: comparar conteos evita divisiones por estudiante
+        return math.ceil(round(self._session_count * minimum_percentage / 100.0, 9))
+    
+    def compliance(
+        self,
+        minimum_percentage: Optional[float] = None
+    ) -> Dict[str, bool]:
+        
+        minimum = self.minimum_sessions(minimum_percentage)
+        view = memoryview(self._bits)
+        stride = self._stride
+        
+        return {
+            student_id: _popcount(
+                int.from_bytes(view[row * stride:(row + 1) * stride], 'little')
+            ) >= minimum
+            for student_id, row in self._rows.items()
+        }
+    
+    def apply_to(
+        self,
+        students: Mapping[str, Student],
+        minimum_percentage: Optional[float] = None,
+        calculator: Optional[GradeCalculator] = None
+    ) -> Dict[str, Any]:
+        
+        if calculator is not None and not isinstance(calculator, GradeCalculator):
+            raise ValueError("Debe proporcionar una calculadora válida")
+        
+        compliance = self.compliance(minimum_percentage)
+        updated = 0
+        compliant = 0
+        
+        for student_id, student in students.items():
+            meets = compliance.get(student_id, False)
+            compliant += meets
+            # Solo se notifica a los suscriptores cuando el estado cambia
+            if student.has_minimum_attendance != meets:
+                # Con calculadora el cambio pasa por register_attendance y queda en su registro de eventos
+                if calculator is not None:
+                    calculator.register_attendance(student, meets)
+                else:
+                    student.has_minimum_attendance = meets
+                updated += 1
+        
+        return {
+            'success': True,
+            'students_evaluated': len(students),
+            'students_updated': updated,
+            'students_compliant': compliant,
+            'minimum_sessions': self.minimum_sessions(minimum_percentage)
+        }
+    
+    def __len__(self) -> int:
+        
+        return len(self._rows)
+    
+    def __str__(self) -> str:
+        return (
+            f"AttendanceTracker(Sessions: {self._session_count}, Students: {len(self._rows)}, "
+            f"Bytes: {len(self._bits)})"
+        )
+    
+    def __repr__(self) -> str:
+        return self.__str__()
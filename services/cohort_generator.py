@@ -0,0 +1,302 @@
+import csv
+import random
+from array import array
+from itertools import accumulate, chain, islice
+from statistics import NormalDist
+from typing import Dict, Any, Iterator, List, NamedTuple, Optional, Sequence, TextIO, Tuple
+
+from models import Student, Evaluation
+from utils import fixed_point
+
+class CohortRecord(NamedTuple):
+    
+    student_id: str
+    name: str
+    evaluations: Tuple[Tuple[str, float, float], ...]
+    has_minimum_attendance: bool
+    extra_points: float
+
+class CohortGenerator:
+    
+    # Esquemas de evaluación (nombre, peso en puntos básicos): todos cumplen RNF01 y suman 100%
+    DEFAULT_SCHEMES = (
+        (('Parcial', 3000), ('Final', 4000), ('Prácticas', 3000)),
+        (('PC1', 1500), ('PC2', 1500), ('PC3', 1500), ('PC4', 1500), ('Parcial', 2000), ('Final', 2000)),
+        (('Lab1', 800), ('Lab2', 800), ('Lab3', 800), ('Lab4', 800), ('Lab5', 800),
+         ('Parcial', 2500), ('Final', 3500)),
+        tuple((f'Tarea{i}', 1000) for i in range(1, 11)),
+        (('Proyecto', 5000), ('Final', 5000)),
+        (('Final', 10000),)
+    )
+    
+    FIRST_NAMES = (
+        'Ana', 'Luis', 'María', 'Carlos', 'Lucía', 'Jorge', 'Sofía', 'Diego',
+        'Valeria', 'Miguel', 'Camila', 'José', 'Daniela', 'Andrés', 'Paula', 'Pedro'
+    )
+    LAST_NAMES = (
+        'García', 'Rodríguez', 'Quispe', 'Flores', 'Sánchez', 'Ramírez', 'Torres', 'Mamani',
+        'Vargas', 'Castillo', 'Rojas', 'Mendoza', 'Huamán', 'Chávez', 'Díaz', 'Vega'
+    )
+    
+    EXTRA_POINTS_OPTIONS = (50, 100, 150, 200)
+    CSV_FIELDS = (
+        'student_id',
+        'student_name',
+        'evaluation_name',
+        'score',
+        'weight',
+        'has_minimum_attendance',
+        'extra_points'
+    )
+    
+    # Cada bloque usa su propia semilla derivada: cualquier rango se reproduce sin generar los anteriores
+    BLOCK_SIZE = 4096
+    _TABLE_BITS = 12
+    
+    def __init__(
+        self,
+        seed: int = 0,
+        mean_ability: float = 12.5,
+        ability_spread: float = 3.0,
+        evaluation_noise: float = 2.0,
+        attendance_rate: float = 0.88,
+        extra_points_rate: float = 0.2,
+        absence_rate: float = 0.03,
+        schemes: Optional[Sequence[Sequence[Tuple[str, int]]]] = None,
+        id_prefix: str = '2021'
+    ):
+        
+        if not isinstance(seed, int):
+            raise ValueError("La semilla debe ser un entero")
+        
+        if not 0 <= mean_ability <= 20:
+            raise ValueError("La habilidad media debe estar entre 0 y 20")
+        
+        if ability_spread < 0 or evaluation_noise < 0:
+            raise ValueError("Las dispersiones no pueden ser negativas")
+        
+        for rate in (attendance_rate, extra_points_rate, absence_rate):
+            if not 0 <= rate <= 1:
+                raise ValueError("Las tasas deben estar entre 0 y 1")
+        
+        schemes = tuple(tuple(scheme) for scheme in (schemes or self.DEFAULT_SCHEMES))
+        for scheme in schemes:
+            if not 0 < len(scheme) <= 10:
+                raise ValueError("Cada esquema debe tener entre 1 y 10 evaluaciones (RNF01)")
+            if sum(weight for _, weight in scheme) != fixed_point.FULL_WEIGHT:
+                raise ValueError("Los pesos de cada esquema deben sumar 100%")
+        
+        self._seed = seed
+        self._schemes = schemes
+        self._id_prefix = id_prefix
+        self._mean = fixed_point.score_to_hundredths(mean_ability)
+        self._attendance_threshold = int(attendance_rate * 65536)
+        self._extra_threshold = int(extra_points_rate * 65536)
+        self._absence_threshold = int(absence_rate * 65536)
+        
+        # Tablas de cuantiles de la normal en centésimas: un getrandbits reemplaza a gauss() por nota
+        size = 1 << self._TABLE_BITS
+        normal = NormalDist()
+        quantiles = [normal.inv_cdf((i + 0.5) / size) for i in range(size)]
+        self._ability_table = [round(z * ability_spread * fixed_point.SCORE_SCALE) for z in quantiles]
+        self._noise_table = [round(z * evaluation_noise * fixed_point.SCORE_SCALE) for z in quantiles]
+        self._names = [
+            f"{first} {last} {second}"
+            for first in self.FIRST_NAMES
+            for last in self.LAST_NAMES
+            for second in self.LAST_NAMES
+        ]
+    
+    @property
+    def seed(self) -> int:
+        
+        return self._seed
+    
+    @property
+    def schemes(self) -> Tuple[Tuple[Tuple[str, int], ...], ...]:
+        
+        return self._schemes
+    
+    def _student_id(self, position: int) -> str:
+        
+        return f"{self._id_prefix}{position:07d}"
+    
+    def _generate_block(self, block: int) -> Tuple[List[int], List[int], List[int], List[bool], List[int]]:
+        
+        # Devuelve por estudiante: esquema, nombre, notas en centésimas (planas), asistencia y extra
+        rng = random.Random(f"{self._seed}:{block}")
+        getrandbits = rng.getrandbits
+        bits = self._TABLE_BITS
+        ability_table = self._ability_table
+        noise_table = self._noise_table
+        schemes = self._schemes
+        scheme_count = len(schemes)
+        name_count = len(self._names)
+        mean = self._mean
+        max_score = fixed_point.MAX_SCORE
+        absence_threshold = self._absence_threshold
+        attendance_threshold = self._attendance_threshold
+        extra_threshold = self._extra_threshold
+        extra_options = self.EXTRA_POINTS_OPTIONS
+        
+        scheme_ids: List[int] = []
+        name_ids: List[int] = []
+        scores: List[int] = []
+        attendance: List[bool] = []
+        extra_points: List[int] = []
+        
+        # Un solo getrandbits por estudiante y otro por evaluación; los campos se extraen por bits
+        table_mask = (1 << bits) - 1
+        for _ in range(self.BLOCK_SIZE):
+            header = getrandbits(78)
+            scheme = (header & 0xFFFF) % scheme_count
+            scheme_ids.append(scheme)
+            name_ids.append((header >> 16 & 0xFFFF) % name_count)
+            attendance.append((header >> 32 & 0xFFFF) < attendance_threshold)
+            extra_points.append(
+                extra_options[header >> 48 & 0x3] if (header >> 50 & 0xFFFF) < extra_threshold else 0
+            )
+            ability = mean + ability_table[header >> 66 & table_mask]
+            for _ in schemes[scheme]:
+                draw = getrandbits(16 + bits)
+                if draw >> bits < absence_threshold:
+                    # Evaluación no rendida: se registra con cero
+                    scores.append(0)
+                    continue
+                score = ability + noise_table[draw & table_mask]
+                scores.append(0 if score < 0 else max_score if score > max_score else score)
+        
+        return scheme_ids, name_ids, scores, attendance, extra_points
+    
+    def iter_records(self, count: int, start: int = 0) -> Iterator[CohortRecord]:
+        
+        if not isinstance(count, int) or count < 0:
+            raise ValueError("La cantidad de estudiantes debe ser un entero no negativo")
+        
+        if not isinstance(start, int) or start < 0:
+            raise ValueError("La posición inicial debe ser un entero no negativo")
+        
+        schemes = [
+            tuple((name, weight / fixed_point.WEIGHT_SCALE) for name, weight in scheme)
+            for scheme in self._schemes
+        ]
+        names = self._names
+        scale = fixed_point.SCORE_SCALE
+        end = start + count
+        position = start
+        
+        while position < end:
+            block, offset = divmod(position, self.BLOCK_SIZE)
+            scheme_ids, name_ids, scores, attendance, extra_points = self._generate_block(block)
+            
+            cursor = 0
+            for index in range(offset):
+                cursor += len(schemes[scheme_ids[index]])
+            
+            for index in range(offset, min(self.BLOCK_SIZE, offset + end - position)):
+                scheme = schemes[scheme_ids[index]]
+                evaluations = tuple(
+                    (name, scores[cursor + i] / scale, weight)
+                    for i, (name, weight) in enumerate(scheme)
+                )
+                cursor += len(scheme)
+                yield CohortRecord(
+                    self._student_id(block * self.BLOCK_SIZE + index + 1),
+                    names[name_ids[index]],
+                    evaluations,
+                    attendance[index],
+                    extra_points[index] / scale
+                )
+            position = (block + 1) * self.BLOCK_SIZE
+    
+    def iter_students(self, count: int, start: int = 0) -> Iterator[Tuple[Student, float]]:
+        
+        for record in self.iter_records(count, start):
+            student = Student(record.student_id, record.name)
+            student.add_evaluations([
+                Evaluation(name, score, weight) for name, score, weight in record.evaluations
+            ])
+            student.has_minimum_attendance = record.has_minimum_attendance
+            yield student, record.extra_points
+    
+    def students(self, count: int, start: int = 0) -> Tuple[List[Student], Dict[str, float]]:
+        
+        students: List[Student] = []
+        extra_points: Dict[str, float] = {}
+        for student, requested in self.iter_students(count, start):
+            students.append(student)
+            if requested:
+                extra_points[student.student_id] = requested
+        return students, extra_points
+    
+    def write_csv(self, stream: TextIO, count: int, start: int = 0) -> int:
+        
+        # Formato largo: una fila por evaluación, con los datos del estudiante repetidos
+        writer = csv.writer(stream)
+        writer.writerow(self.CSV_FIELDS)
+        written = 0
+        for record in self.iter_records(count, start):
+            attendance = 'true' if record.has_minimum_attendance else 'false'
+            writer.writerows(
+                (record.student_id, record.name, name, score, weight, attendance, record.extra_points)
+                for name, score, weight in record.evaluations
+            )
+            written += 1
+        return written
+    
+    def columns(self, count: int, start: int = 0) -> Dict[str, Any]:
+        
+        if not isinstance(count, int) or count < 0:
+            raise ValueError("La cantidad de estudiantes debe ser un entero no negativo")
+        
+        if not isinstance(start, int) or start < 0:
+            raise ValueError("La posición inicial debe ser un entero no negativo")
+        
+        # Mismo formato que fixed_point.pack_evaluations: sirve directo para batch_weighted_sums
+        typecode = fixed_point.ARRAY_TYPECODE
+        scheme_weights = [[weight for _, weight in scheme] for scheme in self._schemes]
+        scheme_lengths = [len(scheme) for scheme in self._schemes]
+        prefix = self._id_prefix
+        student_ids: List[str] = []
+        scores = array(typecode)
+        weights = array(typecode)
+        offsets = array(typecode, [0])
+        attendance = array('B')
+        extra_points = array(typecode)
+        
+        end = start + count
+        position = start
+        while position < end:
+            block, offset = divmod(position, self.BLOCK_SIZE)
+            scheme_ids, _, block_scores, block_attendance, block_extra = self._generate_block(block)
+            stop = min(self.BLOCK_SIZE, offset + end - position)
+            
+            lengths = [scheme_lengths[scheme] for scheme in scheme_ids]
+            cursor = sum(lengths[:offset])
+            selected = lengths[offset:stop]
+            offsets.extend(islice(accumulate(selected, initial=len(scores)), 1, None))
+            weights.extend(chain.from_iterable(scheme_weights[scheme] for scheme in scheme_ids[offset:stop]))
+            scores.extend(block_scores[cursor:cursor + sum(selected)])
+            
+            first = block * self.BLOCK_SIZE + 1
+            student_ids.extend([f"{prefix}{first + index:07d}" for index in range(offset, stop)])
+            attendance.extend(block_attendance[offset:stop])
+            extra_points.extend(block_extra[offset:stop])
+            position = (block + 1) * self.BLOCK_SIZE
+        
+        return {
+            'student_id': student_ids,
+            'scores': scores,
+            'weights': weights,
+            'offsets': offsets,
+            'has_minimum_attendance': attendance,
+            'extra_points': extra_points,
+            'scale': fixed_point.SCORE_SCALE,
+            'weight_scale': fixed_point.WEIGHT_SCALE
+        }
+    
+    def __str__(self) -> str:
+        return f"CohortGenerator(Seed: {self._seed}, Schemes: {len(self._schemes)})"
+    
+    def __repr__(self) -> str:
+        return self.__str__()
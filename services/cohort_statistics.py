@@ -0,0 +1,192 @@
+import math
+from array import array
+from typing import Dict, Any, List, Iterable, Optional
+
+class CohortStatistics:
+    
+    GRADE_RESOLUTION = 100
+    MAX_GRADE = 20.0
+    APPROVAL_THRESHOLD = 10.5
+    
+    def __init__(self, course_id: str = ''):
+        
+        if not isinstance(course_id, str):
+            raise ValueError("El ID del curso debe ser un string")
+        
+        self._course_id = course_id.strip()
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._passed = 0
+        # Un contador por centésima de nota: percentiles exactos con memoria constante
+        self._grade_counts = array('Q', bytes(8 * self._slots()))
+    
+    @classmethod
+    def _slots(cls) -> int:
+        
+        return int(cls.MAX_GRADE * cls.GRADE_RESOLUTION) + 1
+    
+    @property
+    def course_id(self) -> str:
+        
+        return self._course_id
+    
+    @property
+    def count(self) -> int:
+        
+        return self._count
+    
+    @property
+    def mean(self) -> float:
+        
+        return self._mean
+    
+    @property
+    def variance(self) -> float:
+        
+        if self._count < 2:
+            return 0.0
+        return self._m2 / (self._count - 1)
+    
+    @property
+    def standard_deviation(self) -> float:
+        
+        return math.sqrt(self.variance)
+    
+    @property
+    def pass_rate(self) -> float:
+        
+        if self._count == 0:
+            return 0.0
+        return self._passed / self._count
+    
+    def add(self, result: Dict[str, Any]) -> None:
+        
+        if not isinstance(result, dict) or 'final_grade' not in result:
+            raise ValueError("Debe proporcionar un resultado de calculate_final_grade")
+        
+        self.add_grade(result['final_grade'], result.get('passes_course', False))
+    
+    def add_all(self, results: Iterable[Dict[str, Any]]) -> None:
+        
+        for result in results:
+            self.add(result)
+    
+    def add_grade(self, final_grade: float, passes_course: bool) -> None:
+        
+        if not isinstance(final_grade, (int, float)):
+            raise ValueError("La nota final debe ser un número")
+        
+        if final_grade < 0 or final_grade > self.MAX_GRADE:
+            raise ValueError("La nota final debe estar entre 0 y 20")
+        
+        self._count += 1
+        delta = final_grade - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (final_grade - self._mean)
+        
+        if passes_course:
+            self._passed += 1
+        
+        self._grade_counts[round(final_grade * self.GRADE_RESOLUTION)] += 1
+    
+    def merge(self, other: 'CohortStatistics') -> 'CohortStatistics':
+        
+        if not isinstance(other, CohortStatistics):
+            raise ValueError("Solo se pueden combinar instancias de CohortStatistics")
+        
+        if other._count == 0:
+            return self
+        
+        total = self._count + other._count
+        delta = other._mean - self._mean
+        self._mean += delta * other._count / total
+        self._m2 += other._m2 + delta * delta * self._count * other._count / total
+        self._count = total
+        self._passed += other._passed
+        
+        counts = self._grade_counts
+        for slot, value in enumerate(other._grade_counts):
+            if value:
+                counts[slot] += value
+        
+        return self
+    
+    @classmethod
+    def combine(
+        cls,
+        partials: Iterable['CohortStatistics'],
+        course_id: str = ''
+    ) -> 'CohortStatistics':
+        
+        combined = cls(course_id)
+        for partial in partials:
+            combined.merge(partial)
+        return combined
+    
+    def percentile(self, percentage: float) -> Optional[float]:
+        
+        if not isinstance(percentage, (int, float)):
+            raise ValueError("El percentil debe ser un número")
+        
+        if percentage < 0 or percentage > 100:
+            raise ValueError("El percentil debe estar entre 0 y 100")
+        
+        if self._count == 0:
+            return None
+        
+        # Método de rango más cercano sobre los contadores por centésima
+        rank = max(1, math.ceil(percentage / 100.0 * self._count))
+        cumulative = 0
+        for slot, value in enumerate(self._grade_counts):
+            cumulative += value
+            if cumulative >= rank:
+                return slot / self.GRADE_RESOLUTION
+        
+        return self.MAX_GRADE
+    
+    def histogram(self, bin_width: float = 1.0) -> List[Dict[str, Any]]:
+        
+        if not isinstance(bin_width, (int, float)) or bin_width <= 0:
+            raise ValueError("El ancho de los intervalos debe ser un número positivo")
+        
+        slots_per_bin = max(1, round(bin_width * self.GRADE_RESOLUTION))
+        last_slot = self._slots() - 1
+        bins = []
+        for start in range(0, last_slot, slots_per_bin):
+            end = min(start + slots_per_bin, last_slot)
+            # El último intervalo es cerrado para incluir la nota 20
+            stop = end + 1 if end == last_slot else end
+            bins.append({
+                'from': start / self.GRADE_RESOLUTION,
+                'to': end / self.GRADE_RESOLUTION,
+                'count': sum(self._grade_counts[start:stop])
+            })
+        
+        return bins
+    
+    def summary(
+        self,
+        percentiles: Iterable[float] = (25, 50, 75, 90),
+        bin_width: float = 1.0
+    ) -> Dict[str, Any]:
+        
+        return {
+            'course_id': self._course_id,
+            'count': self._count,
+            'mean': round(self._mean, 2),
+            'variance': round(self.variance, 4),
+            'standard_deviation': round(self.standard_deviation, 4),
+            'pass_rate': round(self.pass_rate, 4),
+            'percentiles': {p: self.percentile(p) for p in percentiles},
+            'histogram': self.histogram(bin_width)
+        }
+    
+    def __str__(self) -> str:
+        return (
+            f"CohortStatistics(Course: {self._course_id}, Count: {self._count}, "
+            f"Mean: {self._mean:.2f}, Pass rate: {self.pass_rate:.2%})"
+        )
+    
+    def __repr__(self) -> str:
+        return self.__str__()
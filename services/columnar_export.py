@@ -0,0 +1,338 @@
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+from utils import fixed_point
+
+class ColumnarWriter:
+    
+    MAGIC = b'GRDC'
+    FORMAT_VERSION = 1
+    ALIGNMENT = 8
+    
+    COMPRESSION_NONE = None
+    COMPRESSION_ZLIB = 'zlib'
+    
+    # (nombre, código de tipo de array, escala): las notas se guardan en centésimas enteras
+    COLUMNS = (
+        ('student_id', 'I', None),
+        ('base_grade', 'i', fixed_point.SCORE_SCALE),
+        ('extra_points_applied', 'i', fixed_point.SCORE_SCALE),
+        ('final_grade', 'i', fixed_point.SCORE_SCALE),
+        ('passes_course', 'B', None),
+        ('has_minimum_attendance', 'B', None),
+        ('grade_capped', 'B', None)
+    )
+    
+    def __init__(
+        self,
+        path: str,
+        block_rows: int = 65536,
+        compression: Optional[str] = COMPRESSION_NONE
+    ):
+        
+        if not path or not isinstance(path, str):
+            raise ValueError("Debe proporcionar una ruta válida para la exportación")
+        
+        if not isinstance(block_rows, int) or block_rows <= 0:
+            raise ValueError("El tamaño de bloque debe ser un entero positivo")
+        
+        if compression not in (self.COMPRESSION_NONE, self.COMPRESSION_ZLIB):
+            raise ValueError(f"Compresión no soportada: {compression}")
+        
+        self._path = path
+        self._block_rows = block_rows
+        self._compression = compression
+        self._rows = 0
+        self._dictionary: Dict[str, int] = {}
+        self._buffers = {name: array(typecode) for name, typecode, _ in self.COLUMNS}
+        # Cada columna se acumula en su propio archivo temporal y se copia contigua al cerrar
+        self._spools = {name: tempfile.TemporaryFile() for name, _, _ in self.COLUMNS}
+        self._blocks: Dict[str, List[List[int]]] = {name: [] for name, _, _ in self.COLUMNS}
+        self._closed = False
+    
+    @property
+    def rows(self) -> int:
+        
+        return self._rows
+    
+    def append(self, result: Dict[str, Any]) -> None:
+        
+        self.extend((result,))
+    
+    def extend(self, results: Iterable[Dict[str, Any]]) -> int:
+        
+        if self._closed:
+            raise ValueError("La exportación ya fue cerrada")
+        
+        # Referencias locales: el bucle por fila es el costo dominante en exportaciones grandes
+        dictionary = self._dictionary
+        to_hundredths = fixed_point.score_to_hundredths
+        buffers = self._buffers
+        student_ids = buffers['student_id']
+        base_grades = buffers['base_grade']
+        extra_points = buffers['extra_points_applied']
+        final_grades = buffers['final_grade']
+        passes_course = buffers['passes_course']
+        attendance = buffers['has_minimum_attendance']
+        capped = buffers['grade_capped']
+        block_rows = self._block_rows
+        
+        count = 0
+        for result in results:
+            student_id = result['student_id']
+            code = dictionary.get(student_id)
+            if code is None:
+                code = dictionary[student_id] = len(dictionary)
+            
+            student_ids.append(code)
+            base_grades.append(to_hundredths(result['base_grade']))
+            extra_points.append(to_hundredths(result['extra_points_applied']))
+            final_grades.append(to_hundredths(result['final_grade']))
+            passes_course.append(bool(result['passes_course']))
+            attendance.append(bool(result.get('has_minimum_attendance', False)))
+            capped.append(bool(result.get('grade_capped', False)))
+            count += 1
+            
+            if len(student_ids) >= block_rows:
+                self._flush_block()
+        
+        self._rows += count
+        return count
+    
+    def _flush_block(self) -> None:
+        
+        for name, buffer in self._buffers.items():
+            if not buffer:
+                continue
+            if sys.byteorder == 'big':
+                buffer.byteswap()
+            raw = buffer.tobytes()
+            data = zlib.compress(raw, 6) if self._compression == self.COMPRESSION_ZLIB else raw
+            self._spools[name].write(data)
+            self._blocks[name].append([len(data), len(buffer), len(raw)])
+            # Se vacía en sitio para que las referencias locales de extend sigan siendo válidas
+            del buffer[:]
+    
+    def close(self) -> None:
+        
+        if self._closed:
+            return
+        
+        self._flush_block()
+        footer: Dict[str, Any] = {
+            'format_version': self.FORMAT_VERSION,
+            'rows': self._rows,
+            'compression': self._compression,
+            'byteorder': 'little',
+            'columns': []
+        }
+        
+        temporary = self._path + '.tmp'
+        with open(temporary, 'wb') as output:
+            output.write(self.MAGIC + struct.pack('<HH', self.FORMAT_VERSION, 0))
+            
+            for name, typecode, scale in self.COLUMNS:
+                self._pad(output)
+                offset = output.tell()
+                spool = self._spools[name]
+                spool.seek(0)
+                shutil.copyfileobj(spool, output)
+                spool.close()
+                footer['columns'].append({
+                    'name': name,
+                    'typecode': typecode,
+                    'scale': scale,
+                    'encoding': 'dictionary' if name == 'student_id' else 'plain',
+                    'offset': offset,
+                    'blocks': self._blocks[name]
+                })
+            
+            # Tabla de strings: desplazamientos acumulados + bytes UTF-8 concatenados
+            encoded = [value.encode('utf-8') for value in self._dictionary]
+            offsets = array('I', [0])
+            for value in encoded:
+                offsets.append(offsets[-1] + len(value))
+            if sys.byteorder == 'big':
+                offsets.byteswap()
+            self._pad(output)
+            footer['dictionary'] = {
+                'offset': output.tell(),
+                'count': len(encoded),
+                'blob_offset': output.tell() + len(offsets) * offsets.itemsize
+            }
+            output.write(offsets.tobytes())
+            output.write(b''.join(encoded))
+            
+            footer_bytes = json.dumps(footer, separators=(',', ':')).encode('utf-8')
+            output.write(footer_bytes)
+            output.write(struct.pack('<Q', len(footer_bytes)) + self.MAGIC)
+        
+        os.replace(temporary, self._path)
+        self._closed = True
+    
+    def _pad(self, output) -> None:
+        
+        remainder = output.tell() % self.ALIGNMENT
+        if remainder:
+            output.write(bytes(self.ALIGNMENT - remainder))
+    
+    def __enter__(self) -> 'ColumnarWriter':
+        
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        
+        if exc_type is None:
+            self.close()
+        else:
+            for spool in self._spools.values():
+                spool.close()
+            self._closed = True
+    
+    def __str__(self) -> str:
+        return f"ColumnarWriter(Path: {self._path}, Rows: {self._rows}, Compression: {self._compression})"
+    
+    def __repr__(self) -> str:
+        return self.__str__()
+
+class ColumnarReader:
+    
+    def __init__(self, path: str):
+        
+        with open(path, 'rb') as source:
+            self._mmap = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        view = memoryview(self._mmap)
+        try:
+            if bytes(view[:4]) != ColumnarWriter.MAGIC or bytes(view[-4:]) != ColumnarWriter.MAGIC:
+                raise ValueError("El archivo no es una exportación columnar de notas")
+            
+            footer_length = struct.unpack('<Q', view[-12:-4])[0]
+            footer = json.loads(bytes(view[-12 - footer_length:-12]))
+        finally:
+            view.release()
+        
+        if footer['format_version'] != ColumnarWriter.FORMAT_VERSION:
+            raise ValueError("Versión de exportación columnar no soportada")
+        
+        self._path = path
+        self._footer = footer
+        self._columns = {column['name']: column for column in footer['columns']}
+        self._dictionary: Optional[List[str]] = None
+    
+    @property
+    def rows(self) -> int:
+        
+        return self._footer['rows']
+    
+    @property
+    def compression(self) -> Optional[str]:
+        
+        return self._footer['compression']
+    
+    @property
+    def columns(self) -> List[str]:
+        
+        return list(self._columns)
+    
+    def column_info(self, name: str) -> Dict[str, Any]:
+        
+        if name not in self._columns:
+            raise ValueError(f"Columna desconocida: {name}")
+        return dict(self._columns[name])
+    
+    def column(self, name: str) -> memoryview:
+        
+        info = self.column_info(name)
+        typecode = info['typecode']
+        length = sum(block[0] for block in info['blocks'])
+        start = info['offset']
+        
+        if self.compression is None and sys.byteorder == 'little':
+            # Sin compresión la columna es contigua en el archivo: vista directa sobre el mmap
+            return memoryview(self._mmap)[start:start + length].cast(typecode)
+        
+        values = array(typecode)
+        view = memoryview(self._mmap)
+        try:
+            position = start
+            for stored, _, _ in info['blocks']:
+                chunk = view[position:position + stored]
+                values.frombytes(zlib.decompress(chunk) if self.compression else chunk)
+                position += stored
+        finally:
+            view.release()
+        if sys.byteorder == 'big':
+            values.byteswap()
+        return memoryview(values)
+    
+    def column_values(self, name: str) -> List[Any]:
+        
+        info = self.column_info(name)
+        values = self.column(name)
+        try:
+            if name == 'student_id':
+                dictionary = self.dictionary()
+                return [dictionary[code] for code in values]
+            if info['scale']:
+                return [value / info['scale'] for value in values]
+            if info['typecode'] == 'B':
+                return [bool(value) for value in values]
+            return values.tolist()
+        finally:
+            values.release()
+    
+    def dictionary(self) -> List[str]:
+        
+        if self._dictionary is None:
+            info = self._footer['dictionary']
+            view = memoryview(self._mmap)
+            try:
+                offsets = array('I')
+                offsets.frombytes(view[info['offset']:info['blob_offset']])
+                if sys.byteorder == 'big':
+                    offsets.byteswap()
+                blob = view[info['blob_offset']:info['blob_offset'] + offsets[-1]]
+                self._dictionary = [
+                    str(blob[offsets[i]:offsets[i + 1]], 'utf-8') for i in range(info['count'])
+                ]
+                blob.release()
+            finally:
+                view.release()
+        return self._dictionary
+    
+    def iter_rows(self) -> Iterator[Dict[str, Any]]:
+        
+        columns = {name: self.column_values(name) for name in self._columns}
+        for position in range(self.rows):
+            yield {name: values[position] for name, values in columns.items()}
+    
+    def close(self) -> None:
+        
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Aún hay vistas de columnas en uso: el mapeo se libera cuando se suelten
+            pass
+    
+    def __enter__(self) -> 'ColumnarReader':
+        
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        
+        self.close()
+    
+    def __str__(self) -> str:
+        return f"ColumnarReader(Path: {self._path}, Rows: {self.rows}, Columns: {len(self._columns)})"
+    
+    def __repr__(self) -> str:
+        return self.__str__()
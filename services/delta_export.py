@@ -0,0 +1,278 @@
+import csv
+import json
+import os
+import uuid
+from typing import Dict, Any, Iterator, List, Optional, TextIO, Tuple
+
+from models import Student
+from policies import AttendancePolicy
+from utils.exceptions import GradeCalculationError
+from .grade_calculator import GradeCalculator
+
+class DeltaExporter:
+    
+    STATE_FORMAT_VERSION = 1
+    
+    FORMAT_JSONL = 'jsonl'
+    FORMAT_CSV = 'csv'
+    
+    FIELDS = (
+        'student_id',
+        'student_name',
+        'final_grade',
+        'passes_course',
+        'has_minimum_attendance',
+        'extra_points',
+        'version'
+    )
+    
+    def __init__(self, calculator: GradeCalculator, state_path: Optional[str] = None):
+        
+        if not isinstance(calculator, GradeCalculator):
+            raise ValueError("Debe proporcionar una calculadora válida")
+        
+        self._calculator = calculator
+        # El epoch identifica el estado: un token de otro estado fuerza exportación completa
+        self._epoch = uuid.uuid4().hex[:12]
+        self._clock = 0
+        self._students: Dict[str, Student] = {}
+        self._extra_points: Dict[str, float] = {}
+        # Orden de inserción = orden de versión: el último cambio siempre queda al final
+        self._versions: Dict[str, int] = {}
+        # Estado guardado de estudiantes aún no reinscritos tras un reinicio: (huella, puntos extra)
+        self._restored: Dict[str, Tuple[str, float]] = {}
+        self._restored_agreement: Optional[bool] = None
+        self._policy_version = AttendancePolicy.get_policy_version()
+        self._state_path = state_path
+        
+        if state_path is not None:
+            self._load_state(state_path)
+    
+    def _load_state(self, path: str) -> None:
+        
+        if not os.path.exists(path):
+            return
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as source:
+                state = json.load(source)
+        except (ValueError, OSError):
+            # Estado ilegible: se empieza un epoch nuevo y los clientes reciben una exportación completa
+            return
+        
+        if (state.get('format_version') != self.STATE_FORMAT_VERSION
+                or state.get('configuration') != self._calculator.configuration_fingerprint):
+            return
+        
+        self._epoch = state['epoch']
+        self._clock = state['clock']
+        self._restored_agreement = state['teachers_agree']
+        for student_id, version, fingerprint, extra_points in state['entries']:
+            self._versions[student_id] = version
+            self._restored[student_id] = (fingerprint, extra_points)
+    
+    def save(self, path: Optional[str] = None) -> int:
+        
+        path = path or self._state_path
+        if path is None:
+            raise ValueError("Debe proporcionar una ruta para guardar el estado de exportación")
+        
+        entries = []
+        for student_id, version in self._versions.items():
+            student = self._students.get(student_id)
+            if student is not None:
+                entries.append([student_id, version, student.fingerprint, self._extra_points[student_id]])
+            elif student_id in self._restored:
+                entries.append([student_id, version, *self._restored[student_id]])
+        
+        state = {
+            'format_version': self.STATE_FORMAT_VERSION,
+            'epoch': self._epoch,
+            'clock': self._clock,
+            'configuration': self._calculator.configuration_fingerprint,
+            'teachers_agree': AttendancePolicy.get_teachers_agreement(),
+            'entries': entries
+        }
+        
+        temporary = path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as output:
+            json.dump(state, output, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temporary, path)
+        return len(entries)
+    
+    @property
+    def token(self) -> str:
+        
+        self._sync_policy()
+        return self._make_token(self._clock)
+    
+    def checkpoint(self) -> str:
+        
+        # Guarda el estado antes de entregar el token: así sigue siendo válido tras un reinicio
+        self._sync_policy()
+        if self._state_path is not None:
+            self.save()
+        return self._make_token(self._clock)
+    
+    def _make_token(self, clock: int) -> str:
+        
+        return f"{self._epoch}:{clock}"
+    
+    def _bump(self, student_id: str) -> None:
+        
+        self._clock += 1
+        self._versions.pop(student_id, None)
+        self._versions[student_id] = self._clock
+    
+    def track(self, student: Student, extra_points: float = 0.0) -> None:
+        
+        if not isinstance(student, Student):
+            raise ValueError("Debe proporcionar un estudiante válido")
+        
+        student_id = student.student_id
+        if student_id not in self._students:
+            student.subscribe(self._on_change)
+            self._students[student_id] = student
+        
+        self._extra_points[student_id] = extra_points
+        restored = self._restored.pop(student_id, None)
+        if restored is not None and self._matches_restored(student, extra_points, restored):
+            # Sin cambios desde el último token emitido: conserva su versión y no se vuelve a exportar
+            return
+        self._bump(student_id)
+    
+    def _matches_restored(self, student: Student, extra_points: float, restored: Tuple[str, float]) -> bool:
+        
+        fingerprint, saved_extra_points = restored
+        if fingerprint != student.fingerprint or saved_extra_points != extra_points:
+            return False
+        # Un cambio de acuerdo docente entre reinicios solo afecta a quienes reciben puntos extra
+        affected = extra_points > 0 and student.has_minimum_attendance
+        return not affected or self._restored_agreement == AttendancePolicy.get_teachers_agreement()
+    
+    def untrack(self, student: Student) -> None:
+        
+        if self._students.pop(student.student_id, None) is None:
+            return
+        
+        student.unsubscribe(self._on_change)
+        self._extra_points.pop(student.student_id, None)
+        self._versions.pop(student.student_id, None)
+        self._restored.pop(student.student_id, None)
+    
+    def set_extra_points(self, student_id: str, extra_points: float) -> None:
+        
+        if student_id not in self._students:
+            raise ValueError(f"Estudiante {student_id} no registrado en la exportación")
+        
+        if not isinstance(extra_points, (int, float)) or extra_points < 0:
+            raise ValueError("Los puntos extra deben ser un número no negativo")
+        
+        if self._extra_points.get(student_id) != extra_points:
+            self._extra_points[student_id] = extra_points
+            self._bump(student_id)
+    
+    def _on_change(self, student: Student) -> None:
+        
+        self._bump(student.student_id)
+    
+    def _sync_policy(self) -> None:
+        
+        policy_version = AttendancePolicy.get_policy_version()
+        if policy_version == self._policy_version:
+            return
+        
+        self._policy_version = policy_version
+        for student_id, extra_points in list(self._extra_points.items()):
+            if extra_points > 0 and self._students[student_id].has_minimum_attendance:
+                self._bump(student_id)
+    
+    def _parse_token(self, token: Optional[str]) -> int:
+        
+        if token is None:
+            return 0
+        
+        try:
+            epoch, clock = token.split(':')
+            clock = int(clock)
+        except (AttributeError, ValueError) as e:
+            raise ValueError(f"Token de exportación inválido: {token!r}") from e
+        
+        if epoch != self._epoch or clock > self._clock:
+            return 0
+        return clock
+    
+    def changed_since(self, token: Optional[str] = None) -> Tuple[List[str], str]:
+        
+        self._sync_policy()
+        since = self._parse_token(token)
+        changed = []
+        for student_id in reversed(self._versions):
+            if self._versions[student_id] <= since:
+                break
+            if student_id in self._students:
+                changed.append(student_id)
+        changed.reverse()
+        
+        # El token solo se entrega una vez que el reloj que representa quedó guardado
+        return changed, self.checkpoint()
+    
+    def iter_changes(self, token: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        
+        changed, _ = self.changed_since(token)
+        for student_id in changed:
+            yield self._row(student_id)
+    
+    def _row(self, student_id: str) -> Dict[str, Any]:
+        
+        student = self._students[student_id]
+        extra_points = self._extra_points.get(student_id, 0.0)
+        try:
+            grade = self._calculator.compute_grade(student, extra_points)
+            final_grade, passes_course = grade['final_grade'], grade['passes_course']
+        except GradeCalculationError:
+            final_grade, passes_course = None, None
+        
+        return {
+            'student_id': student_id,
+            'student_name': student.name,
+            'final_grade': final_grade,
+            'passes_course': passes_course,
+            'has_minimum_attendance': student.has_minimum_attendance,
+            'extra_points': extra_points,
+            'version': self._versions[student_id]
+        }
+    
+    def export(
+        self,
+        stream: TextIO,
+        token: Optional[str] = None,
+        output_format: str = FORMAT_JSONL
+    ) -> Dict[str, Any]:
+        
+        if output_format not in (self.FORMAT_JSONL, self.FORMAT_CSV):
+            raise ValueError(f"Formato no soportado: {output_format}")
+        
+        changed, new_token = self.changed_since(token)
+        
+        if output_format == self.FORMAT_CSV:
+            writer = csv.DictWriter(stream, fieldnames=self.FIELDS)
+            writer.writeheader()
+            for student_id in changed:
+                writer.writerow(self._row(student_id))
+        else:
+            for student_id in changed:
+                stream.write(json.dumps(self._row(student_id), ensure_ascii=False) + '\n')
+        
+        return {
+            'success': True,
+            'exported': len(changed),
+            'tracked': len(self._students),
+            'token': new_token
+        }
+    
+    def __str__(self) -> str:
+        return f"DeltaExporter(Tracked: {len(self._students)}, Clock: {self._clock})"
+    
+    def __repr__(self) -> str:
+        return self.__str__()
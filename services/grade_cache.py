@@ -0,0 +1,230 @@
+import atexit
+import hashlib
+import json
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+# Cachés con archivo que deben guardarse al salir; referencias débiles para no mantenerlos vivos
+_persistent_caches: 'weakref.WeakSet[GradeCache]' = weakref.WeakSet()
+
+def _save_caches_on_exit() -> None:
+    
+    for cache in list(_persistent_caches):
+        cache._save_on_exit()
+
+atexit.register(_save_caches_on_exit)
+
+class GradeCache:
+    
+    FORMAT_VERSION = 1
+    # Versión de la lógica de cálculo: se incrementa al cambiar cómo se obtiene una nota, para que
+    # los resultados guardados por una versión anterior del código no se sirvan como vigentes
+    LOGIC_VERSION = 1
+    
+    KIND_GRADE = 'grade'
+    KIND_DETAIL = 'detail'
+    
+    _shared: Optional['GradeCache'] = None
+    _shared_lock = threading.Lock()
+    
+    def __init__(
+        self,
+        max_entries: int = 100000,
+        path: Optional[str] = None,
+        save_interval: Optional[float] = None
+    ):
+        
+        if not isinstance(max_entries, int) or max_entries <= 0:
+            raise ValueError("El tamaño del caché debe ser un entero positivo")
+        
+        if save_interval is not None and (not isinstance(save_interval, (int, float)) or save_interval <= 0):
+            raise ValueError("El intervalo de guardado debe ser un número positivo")
+        
+        self._max_entries = max_entries
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._path = path
+        self._save_interval = save_interval
+        self._save_timer: Optional[threading.Timer] = None
+        self._dirty = False
+        
+        if path is not None:
+            self.load(path)
+            # Se guarda al terminar el proceso para que el próximo arranque empiece con el caché caliente
+            _persistent_caches.add(self)
+    
+    @classmethod
+    def shared(
+        cls,
+        max_entries: int = 100000,
+        path: Optional[str] = None,
+        save_interval: Optional[float] = None
+    ) -> 'GradeCache':
+        
+        # Una sola instancia por proceso: todas las calculadoras comparten los resultados
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(max_entries, path, save_interval)
+            return cls._shared
+    
+    @classmethod
+    def reset_shared(cls) -> None:
+        
+        with cls._shared_lock:
+            cls._shared = None
+    
+    @classmethod
+    def make_key(
+        cls,
+        kind: str,
+        calculator_fingerprint: str,
+        student_fingerprint: str,
+        teachers_agree: bool,
+        extra_points: float
+    ) -> str:
+        
+        # La política entra como estado y no como versión: el contador de versiones no sobrevive a un reinicio
+        return (
+            f"{kind}|v{cls.LOGIC_VERSION}|{calculator_fingerprint}|{student_fingerprint}"
+            f"|{int(teachers_agree)}|{float(extra_points)!r}"
+        )
+    
+    @property
+    def path(self) -> Optional[str]:
+        
+        return self._path
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+    
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+            self._dirty = True
+            # El guardado periódico corre en un temporizador: put nunca escribe a disco
+            if self._save_interval is not None and self._path is not None and self._save_timer is None:
+                self._save_timer = threading.Timer(self._save_interval, self._save_on_timer)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+    
+    def clear(self) -> None:
+        
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+    
+    def _save_on_timer(self) -> None:
+        
+        with self._lock:
+            self._save_timer = None
+        self._save_on_exit()
+    
+    def _save_on_exit(self) -> None:
+        
+        if self._dirty:
+            self.save()
+    
+    @staticmethod
+    def _checksum(entries_json: str) -> str:
+        
+        return hashlib.sha256(entries_json.encode('utf-8')).hexdigest()
+    
+    def save(self, path: Optional[str] = None) -> int:
+        
+        path = path or self._path
+        if path is None:
+            raise ValueError("Debe proporcionar una ruta para guardar el caché")
+        
+        with self._lock:
+            entries_json = json.dumps(list(self._entries.items()), ensure_ascii=False, separators=(',', ':'))
+            count = len(self._entries)
+            self._dirty = False
+        
+        payload = json.dumps({
+            'format_version': self.FORMAT_VERSION,
+            'logic_version': self.LOGIC_VERSION,
+            'checksum': self._checksum(entries_json),
+            'count': count
+        }, separators=(',', ':'))
+        
+        # Cabecera en la primera línea y entradas en la segunda; reemplazo atómico del archivo
+        temporary = path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as output:
+            output.write(payload + '\n' + entries_json + '\n')
+        os.replace(temporary, path)
+        return count
+    
+    def load(self, path: Optional[str] = None) -> int:
+        
+        path = path or self._path
+        if path is None or not os.path.exists(path):
+            return 0
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as source:
+                header = json.loads(source.readline())
+                entries_json = source.readline().rstrip('\n')
+            if (header.get('format_version') != self.FORMAT_VERSION
+                    or header.get('logic_version') != self.LOGIC_VERSION):
+                # Resultados de otra versión del código: podrían no coincidir con el cálculo actual
+                return 0
+            if header.get('checksum') != self._checksum(entries_json):
+                # Archivo dañado o incompleto: se descarta y el caché se vuelve a llenar en uso
+                return 0
+            entries = json.loads(entries_json)
+        except (ValueError, OSError):
+            return 0
+        
+        with self._lock:
+            for key, value in entries:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return len(entries)
+    
+    def stats(self) -> Dict[str, Any]:
+        
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self._max_entries,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0
+            }
+    
+    def __len__(self) -> int:
+        
+        return len(self._entries)
+    
+    def __contains__(self, key: object) -> bool:
+        
+        return key in self._entries
+    
+    def __str__(self) -> str:
+        return f"GradeCache(Entries: {len(self._entries)}, Max: {self._max_entries}, Path: {self._path})"
+    
+    def __repr__(self) -> str:
+        return self.__str__()
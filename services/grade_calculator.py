@@ -1,9 +1,17 @@
+import copy
+import hashlib
 import time
-from typing import Dict, Any, List
+from array import array
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
 from datetime import datetime
 
 from models import Student, Teacher, Evaluation
-from policies import AttendancePolicy, ExtraPointsPolicy
+from policies import AttendancePolicy, ExtraPointsPolicy, CompiledPolicy, CompiledRules
+from .regrade_index import RegradeIndex
+from .gradebook_journal import GradebookJournal
+from .history_archive import HistoryArchive
+from .grade_cache import GradeCache
+from utils import fixed_point
 from utils.exceptions import (
     GradeCalculationError,
     InvalidWeightError,
@@ -15,19 +23,97 @@ class GradeCalculator:
     
     MAX_CALCULATION_TIME = 0.3
     
-    def __init__(self, teacher: Teacher):
+    def __init__(
+        self,
+        teacher: Teacher,
+        fixed_point_mode: bool = False,
+        rules: Optional[CompiledRules] = None,
+        journal: Optional[GradebookJournal] = None,
+        history_archive: Optional[HistoryArchive] = None,
+        history_limit: int = 10000,
+        cache: Optional[GradeCache] = None
+    ):
         
         if not isinstance(teacher, Teacher):
             raise ValueError("Debe proporcionar un docente válido")
         
+        if not isinstance(fixed_point_mode, bool):
+            raise ValueError("El modo de punto fijo debe ser booleano")
+        
+        if rules is not None and not isinstance(rules, CompiledRules):
+            raise ValueError("Las reglas deben estar compiladas (GradingRules.compile)")
+        
+        if rules is not None and fixed_point_mode:
+            raise ValueError("Las reglas personalizadas no admiten el modo de punto fijo")
+        
+        if journal is not None and not isinstance(journal, GradebookJournal):
+            raise ValueError("Debe proporcionar un registro de eventos válido")
+        
+        if history_archive is not None and not isinstance(history_archive, HistoryArchive):
+            raise ValueError("Debe proporcionar un archivo histórico válido")
+        
+        if not isinstance(history_limit, int) or history_limit <= 0:
+            raise ValueError("El límite del historial debe ser un entero positivo")
+        
+        if cache is not None and not isinstance(cache, GradeCache):
+            raise ValueError("Debe proporcionar un caché de notas válido")
+        
         self._teacher = teacher
+        self._journal = journal
+        self._fixed_point_mode = fixed_point_mode
+        self._rules = rules
         self._calculation_history: List[Dict[str, Any]] = []
+        self._history_archive = history_archive
+        self._history_limit = history_limit
+        self._regrade_index = RegradeIndex()
+        self._cache = cache
+        self._cache_namespace = self.configuration_fingerprint if cache is not None else None
     
     @property
     def teacher(self) -> Teacher:
         
         return self._teacher
     
+    @property
+    def fixed_point_mode(self) -> bool:
+        
+        return self._fixed_point_mode
+    
+    @property
+    def rules(self) -> Optional[CompiledRules]:
+        
+        return self._rules
+    
+    @property
+    def cache(self) -> Optional[GradeCache]:
+        
+        return self._cache
+    
+    @property
+    def configuration_fingerprint(self) -> str:
+        
+        # Dos calculadoras con la misma configuración comparten entradas del caché
+        rules = self._rules.rules if self._rules is not None else None
+        configuration = (
+            self._fixed_point_mode,
+            None if rules is None else (
+                rules.threshold,
+                rules.cap,
+                rules.require_attendance,
+                rules.extra_points_mode,
+                rules.extra_points_conditions,
+                rules.drop_lowest,
+                rules.minimums
+            )
+        )
+        return hashlib.blake2b(repr(configuration).encode('utf-8'), digest_size=8).hexdigest()
+    
+    def _ensure_journal_ready(self) -> None:
+        
+        # Se verifica antes de modificar nada: un cambio aplicado sin su evento no se recuperaría
+        if self._journal is not None:
+            self._journal.ensure_recovered()
+    
     def register_evaluations(
         self,
         student: Student,
@@ -40,6 +126,8 @@ class GradeCalculator:
         if not isinstance(evaluations, list):
             raise ValueError("Las evaluaciones deben ser una lista")
         
+        self._ensure_journal_ready()
+        
         result = {
             'success': True,
             'student_id': student.student_id,
@@ -48,9 +136,11 @@ class GradeCalculator:
             'errors': []
         }
         
+        added = []
         for evaluation in evaluations:
             try:
                 student.add_evaluation(evaluation)
+                added.append(evaluation)
                 result['evaluations_added'] += 1
             except Exception as e:
                 result['success'] = False
@@ -58,6 +148,202 @@ class GradeCalculator:
         
         result['total_evaluations'] = student.get_evaluation_count()
         
+        if self._journal is not None and added:
+            self._journal.record_evaluations(
+                GradebookJournal.EVENT_EVALUATIONS_REGISTERED, student, added
+            )
+        
+        return result
+    
+    def register_evaluations_bulk(
+        self,
+        registrations: Iterable[Tuple[Student, List[Union[Evaluation, Tuple[str, float, float]]]]]
+    ) -> Dict[str, Any]:
+        
+        if isinstance(registrations, dict):
+            registrations = registrations.items()
+        
+        self._ensure_journal_ready()
+        
+        prepared: List[Tuple[Student, List[Evaluation]]] = []
+        errors: Dict[str, List[str]] = {}
+        seen = set()
+        
+        # Primera pasada: se valida el conjunto completo de cada estudiante sin modificar nada
+        for position, registration in enumerate(registrations):
+            try:
+                student, evaluations = registration
+            except (TypeError, ValueError):
+                errors[f"#{position}"] = ["Cada registro debe ser un par (estudiante, evaluaciones)"]
+                continue
+            
+            if not isinstance(student, Student):
+                errors[f"#{position}"] = ["Debe proporcionar un estudiante válido"]
+                continue
+            
+            student_errors = self._validate_evaluation_set(student, evaluations, seen, prepared)
+            if student_errors:
+                errors[student.student_id] = student_errors
+        
+        if errors:
+            return {
+                'success': False,
+                'students_processed': 0,
+                'evaluations_added': 0,
+                'errors': errors
+            }
+        
+        for student, evaluations in prepared:
+            student.add_evaluations(evaluations)
+            if self._journal is not None and evaluations:
+                self._journal.record_evaluations(
+                    GradebookJournal.EVENT_EVALUATIONS_REGISTERED, student, evaluations
+                )
+        
+        return {
+            'success': True,
+            'students_processed': len(prepared),
+            'evaluations_added': sum(len(evaluations) for _, evaluations in prepared),
+            'errors': {}
+        }
+    
+    def _validate_evaluation_set(
+        self,
+        student: Student,
+        evaluations: Any,
+        seen: set,
+        prepared: List[Tuple[Student, List[Evaluation]]]
+    ) -> List[str]:
+        
+        if student.student_id in seen:
+            return ["El estudiante aparece más de una vez en el lote"]
+        seen.add(student.student_id)
+        
+        if not isinstance(evaluations, list):
+            return ["Las evaluaciones deben ser una lista"]
+        
+        errors = []
+        built: List[Evaluation] = []
+        for evaluation in evaluations:
+            if isinstance(evaluation, Evaluation):
+                built.append(evaluation)
+                continue
+            try:
+                built.append(Evaluation(*evaluation))
+            except (TypeError, ValueError) as e:
+                errors.append(f"Evaluación {evaluation!r}: {e}")
+        
+        existing = student.evaluations
+        total_count = len(existing) + len(evaluations)
+        if total_count > 10:
+            errors.append(
+                f"El estudiante {student.student_id} tendría {total_count} evaluaciones, "
+                f"el máximo es 10 (RNF01)"
+            )
+        
+        if not errors:
+            full_set = existing + built
+            if self._fixed_point_mode:
+                total_weight = sum(e.weight_basis_points for e in full_set)
+                weights_ok = total_weight == fixed_point.FULL_WEIGHT
+                total_weight = total_weight / fixed_point.WEIGHT_SCALE
+            else:
+                total_weight = sum(e.weight for e in full_set)
+                weights_ok = abs(total_weight - 100.0) <= 0.01
+            if not weights_ok:
+                errors.append(
+                    f"Los pesos de las evaluaciones deben sumar 100%, sumarían {total_weight}%"
+                )
+        
+        if not errors:
+            prepared.append((student, built))
+        
+        return errors
+    
+    def upsert_evaluations(
+        self,
+        student: Student,
+        evaluations: List[Evaluation]
+    ) -> Dict[str, Any]:
+        
+        if not isinstance(student, Student):
+            raise ValueError("Debe proporcionar un estudiante válido")
+        
+        if not isinstance(evaluations, list):
+            raise ValueError("Las evaluaciones deben ser una lista")
+        
+        self._ensure_journal_ready()
+        
+        result = {
+            'success': True,
+            'student_id': student.student_id,
+            'evaluations_inserted': 0,
+            'evaluations_updated': 0,
+            'total_evaluations': student.get_evaluation_count(),
+            'errors': []
+        }
+        
+        applied = []
+        for evaluation in evaluations:
+            try:
+                if student.upsert_evaluation(evaluation):
+                    result['evaluations_inserted'] += 1
+                else:
+                    result['evaluations_updated'] += 1
+                applied.append(evaluation)
+            except Exception as e:
+                result['success'] = False
+                result['errors'].append(str(e))
+        
+        result['total_evaluations'] = student.get_evaluation_count()
+        
+        if self._journal is not None and applied:
+            self._journal.record_evaluations(
+                GradebookJournal.EVENT_EVALUATIONS_UPSERTED, student, applied
+            )
+        
+        return result
+    
+    def delete_evaluations(
+        self,
+        student: Student,
+        names: List[str]
+    ) -> Dict[str, Any]:
+        
+        if not isinstance(student, Student):
+            raise ValueError("Debe proporcionar un estudiante válido")
+        
+        if not isinstance(names, list):
+            raise ValueError("Los nombres deben ser una lista")
+        
+        self._ensure_journal_ready()
+        
+        result = {
+            'success': True,
+            'student_id': student.student_id,
+            'evaluations_deleted': 0,
+            'total_evaluations': student.get_evaluation_count(),
+            'errors': []
+        }
+        
+        deleted = []
+        for name in names:
+            try:
+                if student.delete_evaluation(name):
+                    result['evaluations_deleted'] += 1
+                    deleted.append(name)
+                else:
+                    result['success'] = False
+                    result['errors'].append(f"La evaluación '{name}' no existe")
+            except Exception as e:
+                result['success'] = False
+                result['errors'].append(str(e))
+        
+        result['total_evaluations'] = student.get_evaluation_count()
+        
+        if self._journal is not None and deleted:
+            self._journal.record_deletions(student, deleted)
+        
         return result
     
     def register_attendance(
@@ -72,11 +358,14 @@ class GradeCalculator:
         if not isinstance(has_minimum_attendance, bool):
             raise ValueError("El estado de asistencia debe ser booleano")
         
+        self._ensure_journal_ready()
         student.has_minimum_attendance = has_minimum_attendance
         
-        attendance_check = AttendancePolicy.check_minimum_attendance(
-            has_minimum_attendance
-        )
+        if self._journal is not None:
+            self._journal.record_attendance(student)
+        
+        # Resultado compartido de la tabla compilada: solo se lee, no se asigna un dict por llamada
+        attendance_check = CompiledPolicy.current().attendance_check(has_minimum_attendance)
         
         return {
             'success': True,
@@ -94,67 +383,306 @@ class GradeCalculator:
         if not isinstance(teachers_agree, bool):
             raise ValueError("El acuerdo de docentes debe ser booleano")
         
+        self._ensure_journal_ready()
+        previous_policy = CompiledPolicy.current()
         AttendancePolicy.set_teachers_agreement(teachers_agree)
         
         if teachers_list:
             ExtraPointsPolicy.set_all_years_teachers(teachers_list)
         
+        if self._journal is not None:
+            self._journal.record_policy(teachers_agree, teachers_list)
+        
+        changes = []
+        if previous_policy.teachers_agree != teachers_agree:
+            changes = self._regrade_policy_dependents(previous_policy, CompiledPolicy.current())
+        
         return {
             'success': True,
             'teachers_agree': teachers_agree,
             'teachers_count': len(teachers_list) if teachers_list else 0,
+            'regraded_changes': changes,
             'message': f'Política de puntos extra configurada: {"APROBADA" if teachers_agree else "RECHAZADA"}'
         }
     
-    def calculate_final_grade(
+    def _regrade_policy_dependents(
+        self,
+        previous_policy: CompiledPolicy,
+        new_policy: CompiledPolicy
+    ) -> List[Dict[str, Any]]:
+        
+        # Ambas notas se calculan ahora sobre las mismas evaluaciones: la diferencia es solo de la
+        # política, y compute_grade no agrega entradas al historial
+        changes = []
+        for student, extra_points in self._regrade_index.dependents():
+            try:
+                previous = self.compute_grade(student, extra_points, previous_policy)
+                current = self.compute_grade(student, extra_points, new_policy)
+            except GradeCalculationError:
+                self._regrade_index.untrack(student.student_id)
+                continue
+            
+            if (current['final_grade'] != previous['final_grade']
+                    or current['passes_course'] != previous['passes_course']):
+                changes.append({
+                    'student_id': student.student_id,
+                    'old_final_grade': previous['final_grade'],
+                    'new_final_grade': current['final_grade'],
+                    'old_passes_course': previous['passes_course'],
+                    'new_passes_course': current['passes_course']
+                })
+        
+        return changes
+    
+    def compute_grade(
         self,
         student: Student,
-        extra_points: float = 0.0
+        extra_points: float = 0.0,
+        policy: Optional[CompiledPolicy] = None
     ) -> Dict[str, Any]:
         
-        start_time = time.time()
+        if not isinstance(student, Student):
+            raise ValueError("Debe proporcionar un estudiante válido")
         
-        try:
-            if not isinstance(student, Student):
-                raise ValueError("Debe proporcionar un estudiante válido")
-            
-            if not isinstance(extra_points, (int, float)):
-                raise ValueError("Los puntos extra deben ser un número")
-            
-            if extra_points < 0:
-                raise ValueError("Los puntos extra no pueden ser negativos")
-            
-            if student.get_evaluation_count() == 0:
-                raise GradeCalculationError(
-                    f"El estudiante {student.student_id} no tiene evaluaciones registradas"
-                )
-            
-            total_weight = sum(eval.weight for eval in student.evaluations)
-            if abs(total_weight - 100.0) > 0.01:
-                raise InvalidWeightError(
-                    f"Los pesos de las evaluaciones deben sumar 100%, actualmente suman {total_weight}%"
-                )
-            
-            base_grade = sum(
-                eval.calculate_weighted_score() 
-                for eval in student.evaluations
+        if not isinstance(extra_points, (int, float)):
+            raise ValueError("Los puntos extra deben ser un número")
+        
+        if extra_points < 0:
+            raise ValueError("Los puntos extra no pueden ser negativos")
+        
+        if student.get_evaluation_count() == 0:
+            raise GradeCalculationError(
+                f"El estudiante {student.student_id} no tiene evaluaciones registradas"
             )
-            
-            attendance_check = AttendancePolicy.check_minimum_attendance(
-                student.has_minimum_attendance
+        
+        # Sin política explícita se usa la vigente; una instantánea fija la suya
+        if policy is None:
+            policy = CompiledPolicy.current()
+        
+        if self._cache is None:
+            return self._evaluate_grade(student, extra_points, policy)
+        
+        key = self._cache.make_key(
+            GradeCache.KIND_GRADE,
+            self._cache_namespace,
+            student.fingerprint,
+            policy.teachers_agree,
+            extra_points
+        )
+        cached = self._cache.get(key)
+        if cached is None:
+            # Solo se guardan cálculos válidos: un error se vuelve a evaluar en cada llamada
+            cached = self._evaluate_grade(student, extra_points, policy)
+            self._cache.put(key, cached)
+        return copy.deepcopy(cached)
+    
+    def _evaluate_grade(
+        self,
+        student: Student,
+        extra_points: float,
+        policy: CompiledPolicy
+    ) -> Dict[str, Any]:
+        
+        if self._rules is not None:
+            return self._rules.evaluate(
+                student.evaluations,
+                student.has_minimum_attendance,
+                extra_points,
+                teachers_agree=policy.teachers_agree
             )
-            
-            teachers_agree = AttendancePolicy.get_teachers_agreement()
-            
-            extra_points_result = ExtraPointsPolicy.calculate_extra_points(
-                base_grade=base_grade,
-                extra_points=extra_points if student.has_minimum_attendance else 0,
-                teachers_agree=teachers_agree
+        
+        if self._fixed_point_mode:
+            return self._compute_grade_fixed(student, extra_points, policy)
+        
+        evaluations = student.evaluations
+        total_weight = sum(eval.weight for eval in evaluations)
+        if abs(total_weight - 100.0) > 0.01:
+            raise InvalidWeightError(
+                f"Los pesos de las evaluaciones deben sumar 100%, actualmente suman {total_weight}%"
+            )
+        
+        base_grade = sum(
+            eval.calculate_weighted_score() 
+            for eval in evaluations
+        )
+        
+        # La política compilada ya resolvió la rama del acuerdo docente
+        extra_points_applied, final_grade, capped = policy.apply_extra_points(
+            base_grade,
+            extra_points if student.has_minimum_attendance else 0
+        )
+        
+        return {
+            'base_grade': round(base_grade, 2),
+            'extra_points_applied': extra_points_applied,
+            'final_grade': final_grade,
+            'passes_course': student.has_minimum_attendance and final_grade >= 10.5,
+            'grade_capped': capped
+        }
+    
+    def _compute_grade_fixed(
+        self,
+        student: Student,
+        extra_points: float,
+        policy: CompiledPolicy
+    ) -> Dict[str, Any]:
+        
+        evaluations = student.evaluations
+        weights = [eval.weight_basis_points for eval in evaluations]
+        total_weight = sum(weights)
+        # En punto fijo la validación de pesos es una comparación entera exacta
+        if total_weight != fixed_point.FULL_WEIGHT:
+            raise InvalidWeightError(
+                f"Los pesos de las evaluaciones deben sumar 100%, actualmente suman "
+                f"{total_weight / fixed_point.WEIGHT_SCALE}%"
             )
+        
+        base_grade = fixed_point.weighted_sum_hundredths(
+            (eval.score_hundredths for eval in evaluations),
+            weights
+        )
+        
+        extra_points_applied, final_grade, capped = policy.apply_extra_points_fixed(
+            base_grade,
+            fixed_point.score_to_hundredths(extra_points) if student.has_minimum_attendance else 0
+        )
+        
+        return {
+            'base_grade': fixed_point.hundredths_to_float(base_grade),
+            'extra_points_applied': fixed_point.hundredths_to_float(extra_points_applied),
+            'final_grade': fixed_point.hundredths_to_float(final_grade),
+            'passes_course': (
+                student.has_minimum_attendance
+                and final_grade >= fixed_point.APPROVAL_THRESHOLD
+            ),
+            'grade_capped': capped
+        }
+    
+    def compute_grades_batch(
+        self,
+        students: Iterable[Student],
+        extra_points: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Any]:
+        
+        students = list(students)
+        extra_points = extra_points or {}
+        if not all(isinstance(student, Student) for student in students):
+            raise ValueError("Debe proporcionar estudiantes válidos")
+        
+        # El núcleo entero solo reproduce el cálculo escalar en modo punto fijo sin reglas;
+        # en otro caso se delega estudiante por estudiante para que lote y escalar coincidan
+        if not self._fixed_point_mode or self._rules is not None:
+            return self._compute_grades_scalar(students, extra_points)
+        
+        # El lote siempre opera con arreglos de enteros en punto fijo
+        scores, weights, offsets = fixed_point.pack_evaluations(
+            student.evaluations for student in students
+        )
+        base_grades, total_weights = fixed_point.batch_weighted_sums(scores, weights, offsets)
+        
+        apply_extra_points = CompiledPolicy.current().apply_extra_points_fixed
+        threshold = fixed_point.APPROVAL_THRESHOLD
+        final_grades = array(fixed_point.ARRAY_TYPECODE)
+        passes_course = []
+        errors: Dict[str, str] = {}
+        
+        for student, base_grade, total_weight in zip(students, base_grades, total_weights):
+            attends = student.has_minimum_attendance
+            if total_weight != fixed_point.FULL_WEIGHT:
+                errors[student.student_id] = (
+                    f"Los pesos de las evaluaciones deben sumar 100%, actualmente suman "
+                    f"{total_weight / fixed_point.WEIGHT_SCALE}%"
+                )
+                final_grades.append(-1)
+                passes_course.append(False)
+                continue
             
-            final_grade = extra_points_result['final_grade']
+            requested = extra_points.get(student.student_id, 0.0) if attends else 0
+            if requested < 0:
+                raise ValueError("Los puntos extra no pueden ser negativos")
+            final_grade = apply_extra_points(
+                base_grade,
+                fixed_point.score_to_hundredths(requested) if requested else 0
+            )[1]
             
-            passes_course = student.has_minimum_attendance and final_grade >= 10.5
+            final_grades.append(final_grade)
+            passes_course.append(attends and final_grade >= threshold)
+        
+        return {
+            'student_id': [student.student_id for student in students],
+            'base_grade': base_grades,
+            'final_grade': final_grades,
+            'passes_course': passes_course,
+            'scale': fixed_point.SCORE_SCALE,
+            'errors': errors
+        }
+    
+    def _compute_grades_scalar(
+        self,
+        students: List[Student],
+        extra_points: Dict[str, float]
+    ) -> Dict[str, Any]:
+        
+        policy = CompiledPolicy.current()
+        base_grades = array(fixed_point.ARRAY_TYPECODE)
+        final_grades = array(fixed_point.ARRAY_TYPECODE)
+        passes_course = []
+        errors: Dict[str, str] = {}
+        
+        for student in students:
+            requested = extra_points.get(student.student_id, 0.0)
+            if requested < 0:
+                raise ValueError("Los puntos extra no pueden ser negativos")
+            try:
+                grade = self.compute_grade(student, requested, policy)
+            except GradeCalculationError as e:
+                errors[student.student_id] = str(e)
+                base_grades.append(-1)
+                final_grades.append(-1)
+                passes_course.append(False)
+                continue
+            base_grades.append(fixed_point.score_to_hundredths(grade['base_grade']))
+            final_grades.append(fixed_point.score_to_hundredths(grade['final_grade']))
+            passes_course.append(grade['passes_course'])
+        
+        return {
+            'student_id': [student.student_id for student in students],
+            'base_grade': base_grades,
+            'final_grade': final_grades,
+            'passes_course': passes_course,
+            'scale': fixed_point.SCORE_SCALE,
+            'errors': errors
+        }
+    
+    def calculate_final_grade(
+        self,
+        student: Student,
+        extra_points: float = 0.0
+    ) -> Dict[str, Any]:
+        
+        result = self._timed_grade(student, extra_points)
+        
+        self._calculation_history.append(result.copy())
+        self._regrade_index.track(student, extra_points)
+        
+        # Con archivo histórico configurado, el historial en memoria se vuelca al llegar al límite
+        if (self._history_archive is not None
+                and len(self._calculation_history) >= self._history_limit):
+            self.archive_history()
+        
+        return result
+    
+    def _timed_grade(
+        self,
+        student: Student,
+        extra_points: float,
+        policy: Optional[CompiledPolicy] = None
+    ) -> Dict[str, Any]:
+        
+        start_time = time.time()
+        
+        try:
+            grade = self.compute_grade(student, extra_points, policy)
             
             calculation_time = time.time() - start_time
             if calculation_time > self.MAX_CALCULATION_TIME:
@@ -167,20 +695,18 @@ class GradeCalculator:
                 'success': True,
                 'student_id': student.student_id,
                 'student_name': student.name,
-                'base_grade': round(base_grade, 2),
-                'extra_points_applied': extra_points_result['extra_points_applied'],
-                'final_grade': final_grade,
+                'base_grade': grade['base_grade'],
+                'extra_points_applied': grade['extra_points_applied'],
+                'final_grade': grade['final_grade'],
                 'has_minimum_attendance': student.has_minimum_attendance,
-                'passes_course': passes_course,
-                'grade_capped': extra_points_result['capped'],
+                'passes_course': grade['passes_course'],
+                'grade_capped': grade['grade_capped'],
                 'calculation_time_ms': round(calculation_time * 1000, 2),
                 'timestamp': datetime.now().isoformat()
             }
             
-            self._calculation_history.append(result.copy())
-            
             return result
-            
+        
         except Exception as e:
             calculation_time = time.time() - start_time
             raise GradeCalculationError(
@@ -191,13 +717,56 @@ class GradeCalculator:
     def get_calculation_detail(
         self,
         student: Student,
-        extra_points: float = 0.0
+        extra_points: float = 0.0,
+        policy: Optional[CompiledPolicy] = None
     ) -> Dict[str, Any]:
         
         if not isinstance(student, Student):
             raise ValueError("Debe proporcionar un estudiante válido")
         
-        calculation_result = self.calculate_final_grade(student, extra_points)
+        if policy is None:
+            calculation_result = self.calculate_final_grade(student, extra_points)
+            teachers_agree = AttendancePolicy.get_teachers_agreement()
+        else:
+            # Lectura sobre una instantánea: no altera el historial ni el índice de recálculo
+            calculation_result = self._timed_grade(student, extra_points, policy)
+            teachers_agree = policy.teachers_agree
+        
+        metadata = {
+            'calculated_by': self._teacher.name,
+            'teacher_id': self._teacher.teacher_id,
+            'calculation_time_ms': calculation_result['calculation_time_ms'],
+            'timestamp': calculation_result['timestamp']
+        }
+        
+        if self._cache is None:
+            detail = self._build_detail(student, extra_points, calculation_result, teachers_agree)
+            detail['metadata'] = metadata
+            return detail
+        
+        # El detalle se guarda sin metadatos: docente, tiempo y fecha son de cada llamada
+        key = self._cache.make_key(
+            GradeCache.KIND_DETAIL,
+            self._cache_namespace,
+            student.fingerprint,
+            teachers_agree,
+            extra_points
+        )
+        cached = self._cache.get(key)
+        if cached is None:
+            cached = self._build_detail(student, extra_points, calculation_result, teachers_agree)
+            self._cache.put(key, cached)
+        detail = copy.deepcopy(cached)
+        detail['metadata'] = metadata
+        return detail
+    
+    def _build_detail(
+        self,
+        student: Student,
+        extra_points: float,
+        calculation_result: Dict[str, Any],
+        teachers_agree: bool
+    ) -> Dict[str, Any]:
         
         evaluations_detail = []
         for i, evaluation in enumerate(student.evaluations, 1):
@@ -210,18 +779,36 @@ class GradeCalculator:
                 'contribution': f"{evaluation.weight}% de {evaluation.score} = {evaluation.calculate_weighted_score():.2f} puntos"
             })
         
-        attendance_detail = AttendancePolicy.check_minimum_attendance(
-            student.has_minimum_attendance
-        )
+        attendance_detail = CompiledPolicy.current().attendance_check(student.has_minimum_attendance)
         
-        teachers_agree = AttendancePolicy.get_teachers_agreement()
-        extra_points_detail = ExtraPointsPolicy.calculate_extra_points(
-            base_grade=calculation_result['base_grade'],
-            extra_points=extra_points if student.has_minimum_attendance else 0,
-            teachers_agree=teachers_agree
-        )
+        if self._rules is None:
+            extra_points_detail = ExtraPointsPolicy.calculate_extra_points(
+                base_grade=calculation_result['base_grade'],
+                extra_points=extra_points if student.has_minimum_attendance else 0,
+                teachers_agree=teachers_agree
+            )
+            approval_threshold = 10.5
+            grade_cap = 20.0
+            attendance_impact = 'Requisito obligatorio para aprobar el curso'
+        else:
+            # Con reglas del curso el detalle sale del mismo cálculo que produjo la nota final
+            rules = self._rules.rules
+            applied = calculation_result['extra_points_applied']
+            if self._rules.extra_points_eligible(student.has_minimum_attendance, teachers_agree):
+                message = f'Puntos extra aplicados: +{applied:.2f}'
+                if calculation_result['grade_capped']:
+                    message += f' (nota limitada a {rules.cap:g})'
+            else:
+                message = 'Puntos extra NO aplicados: las reglas del curso no los permiten'
+            extra_points_detail = {'extra_points_applied': applied, 'message': message}
+            approval_threshold = rules.threshold
+            grade_cap = rules.cap
+            attendance_impact = (
+                'Requisito obligatorio para aprobar el curso' if rules.require_attendance
+                else 'No es requisito para aprobar según las reglas del curso'
+            )
         
-        detail = {
+        return {
             'student_info': {
                 'id': student.student_id,
                 'name': student.name,
@@ -236,7 +823,7 @@ class GradeCalculator:
             'attendance': {
                 'meets_requirement': attendance_detail['meets_requirement'],
                 'message': attendance_detail['message'],
-                'impact': 'Requisito obligatorio para aprobar el curso'
+                'impact': attendance_impact
             },
             'extra_points': {
                 'requested': extra_points,
@@ -248,17 +835,10 @@ class GradeCalculator:
                 'final_grade': calculation_result['final_grade'],
                 'passes_course': calculation_result['passes_course'],
                 'grade_capped': calculation_result['grade_capped'],
-                'approval_threshold': 10.5
-            },
-            'metadata': {
-                'calculated_by': self._teacher.name,
-                'teacher_id': self._teacher.teacher_id,
-                'calculation_time_ms': calculation_result['calculation_time_ms'],
-                'timestamp': calculation_result['timestamp']
+                'grade_cap': grade_cap,
+                'approval_threshold': approval_threshold
             }
         }
-        
-        return detail
     
     def get_calculation_history(self) -> List[Dict[str, Any]]:
         
@@ -267,3 +847,16 @@ class GradeCalculator:
     def clear_history(self) -> None:
         
         self._calculation_history.clear()
+    
+    def archive_history(self, archive: Optional[HistoryArchive] = None) -> int:
+        
+        # Un archivo vacío tiene len() == 0: se compara con None para no descartarlo
+        if archive is None:
+            archive = self._history_archive
+        if archive is None:
+            raise ValueError("Debe proporcionar un archivo histórico")
+        
+        archived = archive.extend(self._calculation_history)
+        archive.flush()
+        self._calculation_history.clear()
+        return archived
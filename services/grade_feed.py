@@ -0,0 +1,231 @@
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, Any, List, Optional, Tuple
+
+from models import Student
+from policies import AttendancePolicy
+from utils.exceptions import GradeCalculationError
+from .grade_calculator import GradeCalculator
+
+class FeedSubscription:
+    
+    def __init__(self, feed: 'GradeChangeFeed', max_queue: int, checkpoint: int):
+        
+        self._feed = feed
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._max_queue = max_queue
+        self._checkpoint = checkpoint
+        self._lagged = False
+        self._closed = False
+    
+    @property
+    def checkpoint(self) -> int:
+        
+        return self._checkpoint
+    
+    @property
+    def lagged(self) -> bool:
+        
+        return self._lagged
+    
+    @property
+    def closed(self) -> bool:
+        
+        return self._closed
+    
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        
+        if len(self._queue) >= self._max_queue:
+            # Cola acotada: se descarta lo más antiguo y el consumidor puede reanudar desde su checkpoint
+            self._queue.popleft()
+            self._lagged = True
+        self._queue.append(event)
+    
+    def get(self, max_items: Optional[int] = None) -> List[Dict[str, Any]]:
+        
+        self._feed.flush()
+        events = []
+        while self._queue and (max_items is None or len(events) < max_items):
+            events.append(self._queue.popleft())
+        
+        if events:
+            self._checkpoint = events[-1]['seq']
+        return events
+    
+    def pending(self) -> int:
+        
+        return len(self._queue)
+    
+    def close(self) -> None:
+        
+        self._closed = True
+        self._queue.clear()
+        self._feed._unsubscribe(self)
+    
+    def __len__(self) -> int:
+        
+        return len(self._queue)
+
+class GradeChangeFeed:
+    
+    def __init__(
+        self,
+        calculator: GradeCalculator,
+        debounce_seconds: float = 0.5,
+        retention: int = 10000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        
+        if not isinstance(calculator, GradeCalculator):
+            raise ValueError("Debe proporcionar una calculadora válida")
+        
+        if not isinstance(debounce_seconds, (int, float)) or debounce_seconds < 0:
+            raise ValueError("El tiempo de agrupación no puede ser negativo")
+        
+        if not isinstance(retention, int) or retention <= 0:
+            raise ValueError("La retención debe ser un entero positivo")
+        
+        self._calculator = calculator
+        self._debounce = debounce_seconds
+        self._clock = clock
+        self._sequence = 0
+        self._retained: Deque[Dict[str, Any]] = deque(maxlen=retention)
+        self._subscriptions: List[FeedSubscription] = []
+        self._students: Dict[str, Student] = {}
+        self._extra_points: Dict[str, float] = {}
+        self._last_values: Dict[str, Tuple[Optional[float], Optional[bool]]] = {}
+        self._dirty: Dict[str, float] = {}
+        self._policy_version = AttendancePolicy.get_policy_version()
+    
+    @property
+    def sequence(self) -> int:
+        
+        return self._sequence
+    
+    def track(self, student: Student, extra_points: float = 0.0) -> None:
+        
+        if not isinstance(student, Student):
+            raise ValueError("Debe proporcionar un estudiante válido")
+        
+        student_id = student.student_id
+        if student_id not in self._students:
+            student.subscribe(self._on_change)
+            self._students[student_id] = student
+            self._last_values[student_id] = self._grade(student, extra_points)
+        
+        if self._extra_points.get(student_id, 0.0) != extra_points:
+            self._extra_points[student_id] = extra_points
+            self._on_change(student)
+    
+    def untrack(self, student: Student) -> None:
+        
+        if self._students.pop(student.student_id, None) is None:
+            return
+        
+        student.unsubscribe(self._on_change)
+        self._extra_points.pop(student.student_id, None)
+        self._last_values.pop(student.student_id, None)
+        self._dirty.pop(student.student_id, None)
+    
+    def _on_change(self, student: Student) -> None:
+        
+        # Se guarda el último cambio: ráfagas del mismo estudiante se fusionan en un evento
+        self._dirty[student.student_id] = self._clock()
+    
+    def _grade(self, student: Student, extra_points: float) -> Tuple[Optional[float], Optional[bool]]:
+        
+        try:
+            grade = self._calculator.compute_grade(student, extra_points)
+        except GradeCalculationError:
+            return None, None
+        return grade['final_grade'], grade['passes_course']
+    
+    def flush(self, force: bool = False) -> int:
+        
+        policy_version = AttendancePolicy.get_policy_version()
+        if policy_version != self._policy_version:
+            self._policy_version = policy_version
+            now = self._clock()
+            for student_id, extra_points in self._extra_points.items():
+                if extra_points > 0:
+                    self._dirty[student_id] = now
+        
+        if not self._dirty:
+            return 0
+        
+        deadline = self._clock() - self._debounce
+        ready = [
+            student_id for student_id, changed_at in self._dirty.items()
+            if force or changed_at <= deadline
+        ]
+        
+        emitted = 0
+        for student_id in ready:
+            del self._dirty[student_id]
+            student = self._students[student_id]
+            old_grade, old_passes = self._last_values[student_id]
+            new_grade, new_passes = self._grade(student, self._extra_points.get(student_id, 0.0))
+            if (new_grade, new_passes) == (old_grade, old_passes):
+                continue
+            
+            self._last_values[student_id] = (new_grade, new_passes)
+            self._sequence += 1
+            event = {
+                'seq': self._sequence,
+                'student_id': student_id,
+                'old_final_grade': old_grade,
+                'new_final_grade': new_grade,
+                'old_passes_course': old_passes,
+                'new_passes_course': new_passes,
+                'timestamp': datetime.now().isoformat()
+            }
+            self._retained.append(event)
+            for subscription in self._subscriptions:
+                subscription._deliver(event)
+            emitted += 1
+        
+        return emitted
+    
+    def subscribe(
+        self,
+        max_queue: int = 1000,
+        checkpoint: Optional[int] = None
+    ) -> FeedSubscription:
+        
+        if not isinstance(max_queue, int) or max_queue <= 0:
+            raise ValueError("El tamaño de la cola debe ser un entero positivo")
+        
+        if checkpoint is None:
+            checkpoint = self._sequence
+        
+        if not isinstance(checkpoint, int) or checkpoint < 0 or checkpoint > self._sequence:
+            raise ValueError("El checkpoint no corresponde a este feed")
+        
+        oldest = self._retained[0]['seq'] if self._retained else self._sequence + 1
+        if checkpoint + 1 < oldest:
+            raise GradeCalculationError(
+                f"El checkpoint {checkpoint} ya no está retenido (evento más antiguo: {oldest})"
+            )
+        
+        subscription = FeedSubscription(self, max_queue, checkpoint)
+        for event in self._retained:
+            if event['seq'] > checkpoint:
+                subscription._deliver(event)
+        
+        self._subscriptions.append(subscription)
+        return subscription
+    
+    def _unsubscribe(self, subscription: FeedSubscription) -> None:
+        
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+    
+    def __str__(self) -> str:
+        return (
+            f"GradeChangeFeed(Tracked: {len(self._students)}, Seq: {self._sequence}, "
+            f"Subscribers: {len(self._subscriptions)})"
+        )
+    
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -0,0 +1,307 @@
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Any, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+from models import Student, Evaluation
+from policies import AttendancePolicy, ExtraPointsPolicy, CompiledPolicy
+from utils.exceptions import GradeCalculationError
+from .grade_calculator import GradeCalculator
+from .cohort_statistics import CohortStatistics
+
+class StudentRecord(NamedTuple):
+    
+    student_id: str
+    name: str
+    # Evaluation es inmutable: las instantáneas comparten las instancias sin copiarlas
+    evaluations: Tuple[Evaluation, ...]
+    has_minimum_attendance: bool
+    
+    @classmethod
+    def capture(cls, student: Student) -> 'StudentRecord':
+        
+        return cls(
+            student.student_id,
+            student.name,
+            tuple(student.evaluations),
+            student.has_minimum_attendance
+        )
+    
+    def materialize(self) -> Student:
+        
+        student = Student(self.student_id, self.name)
+        student.add_evaluations(list(self.evaluations))
+        student.has_minimum_attendance = self.has_minimum_attendance
+        return student
+
+class GradebookSnapshot:
+    
+    def __init__(
+        self,
+        calculator: GradeCalculator,
+        version: int,
+        records: Dict[str, StudentRecord],
+        policy: CompiledPolicy,
+        teachers_list: Tuple[str, ...]
+    ):
+        
+        self._calculator = calculator
+        self._version = version
+        self._records = records
+        self._policy = policy
+        self._teachers_list = teachers_list
+        self._created_at = datetime.now().isoformat()
+        # Copias de trabajo privadas para calcular; nunca se entregan al llamador
+        self._materialized: Dict[str, Student] = {}
+    
+    @property
+    def version(self) -> int:
+        
+        return self._version
+    
+    @property
+    def created_at(self) -> str:
+        
+        return self._created_at
+    
+    @property
+    def policy(self) -> CompiledPolicy:
+        
+        return self._policy
+    
+    @property
+    def teachers_agree(self) -> bool:
+        
+        return self._policy.teachers_agree
+    
+    @property
+    def teachers_list(self) -> Tuple[str, ...]:
+        
+        return self._teachers_list
+    
+    @property
+    def records(self) -> Mapping[str, StudentRecord]:
+        
+        return MappingProxyType(self._records)
+    
+    def student_ids(self) -> List[str]:
+        
+        return list(self._records)
+    
+    def get_student(self, student_id: str) -> Student:
+        
+        return self._record(student_id).materialize()
+    
+    def _record(self, student_id: str) -> StudentRecord:
+        
+        record = self._records.get(student_id)
+        if record is None:
+            raise ValueError(
+                f"Estudiante {student_id} no existe en la instantánea v{self._version}"
+            )
+        return record
+    
+    def _working_copy(self, student_id: str) -> Student:
+        
+        student = self._materialized.get(student_id)
+        if student is None:
+            student = self._record(student_id).materialize()
+            self._materialized[student_id] = student
+        return student
+    
+    def compute_grade(self, student_id: str, extra_points: float = 0.0) -> Dict[str, Any]:
+        
+        return self._calculator.compute_grade(
+            self._working_copy(student_id),
+            extra_points,
+            self._policy
+        )
+    
+    def get_calculation_detail(
+        self,
+        student_id: str,
+        extra_points: float = 0.0
+    ) -> Dict[str, Any]:
+        
+        detail = self._calculator.get_calculation_detail(
+            self._working_copy(student_id),
+            extra_points,
+            self._policy
+        )
+        detail['metadata']['snapshot_version'] = self._version
+        return detail
+    
+    def iter_grades(
+        self,
+        extra_points: Optional[Dict[str, float]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        
+        extra_points = extra_points or {}
+        for student_id, record in self._records.items():
+            try:
+                grade = self.compute_grade(student_id, extra_points.get(student_id, 0.0))
+                final_grade, passes_course = grade['final_grade'], grade['passes_course']
+            except GradeCalculationError:
+                final_grade, passes_course = None, None
+            
+            yield {
+                'student_id': student_id,
+                'student_name': record.name,
+                'final_grade': final_grade,
+                'passes_course': passes_course,
+                'has_minimum_attendance': record.has_minimum_attendance,
+                'snapshot_version': self._version
+            }
+    
+    def statistics(
+        self,
+        extra_points: Optional[Dict[str, float]] = None,
+        course_id: str = ''
+    ) -> CohortStatistics:
+        
+        statistics = CohortStatistics(course_id)
+        for row in self.iter_grades(extra_points):
+            if row['final_grade'] is not None:
+                statistics.add_grade(row['final_grade'], row['passes_course'])
+        return statistics
+    
+    def __len__(self) -> int:
+        
+        return len(self._records)
+    
+    def __contains__(self, student_id: object) -> bool:
+        
+        return student_id in self._records
+    
+    def __str__(self) -> str:
+        return (
+            f"GradebookSnapshot(Version: {self._version}, Students: {len(self._records)}, "
+            f"Teachers agree: {self.teachers_agree})"
+        )
+    
+    def __repr__(self) -> str:
+        return self.__str__()
+
+class Gradebook:
+    
+    def __init__(self, calculator: GradeCalculator):
+        
+        if not isinstance(calculator, GradeCalculator):
+            raise ValueError("Debe proporcionar una calculadora válida")
+        
+        self._calculator = calculator
+        self._students: Dict[str, Student] = {}
+        self._dirty: Dict[str, Optional[Student]] = {}
+        # Solo los escritores se coordinan; los lectores toman la instantánea publicada sin bloquear
+        self._write_lock = threading.RLock()
+        self._transaction_depth = 0
+        self._current = self._build_snapshot(0, {})
+    
+    @property
+    def version(self) -> int:
+        
+        return self._current.version
+    
+    def _build_snapshot(self, version: int, records: Dict[str, StudentRecord]) -> GradebookSnapshot:
+        
+        return GradebookSnapshot(
+            self._calculator,
+            version,
+            records,
+            CompiledPolicy.current(),
+            tuple(ExtraPointsPolicy.get_all_years_teachers())
+        )
+    
+    def track(self, student: Student) -> None:
+        
+        if not isinstance(student, Student):
+            raise ValueError("Debe proporcionar un estudiante válido")
+        
+        with self._write_lock:
+            if student.student_id not in self._students:
+                student.subscribe(self._on_change)
+                self._students[student.student_id] = student
+            self._dirty[student.student_id] = student
+    
+    def track_all(self, students: List[Student]) -> None:
+        
+        with self.transaction():
+            for student in students:
+                self.track(student)
+    
+    def untrack(self, student: Student) -> None:
+        
+        with self._write_lock:
+            if self._students.pop(student.student_id, None) is None:
+                return
+            student.unsubscribe(self._on_change)
+            self._dirty[student.student_id] = None
+    
+    def _on_change(self, student: Student) -> None:
+        
+        # Con el candado: un escritor fuera de transaction() espera a que termine una publicación en curso.
+        # Un cambio de varios pasos debe hacerse dentro de transaction() para publicarse completo
+        with self._write_lock:
+            self._dirty[student.student_id] = student
+    
+    @contextmanager
+    def transaction(self) -> Iterator[GradeCalculator]:
+        
+        with self._write_lock:
+            self._transaction_depth += 1
+            try:
+                yield self._calculator
+            finally:
+                self._transaction_depth -= 1
+                # Los objetos vivos ya reflejan lo aplicado: se publica al cerrar la transacción externa
+                if self._transaction_depth == 0:
+                    self.publish()
+    
+    def _has_changes(self) -> bool:
+        
+        return bool(self._dirty) or (
+            self._current.policy.version != AttendancePolicy.get_policy_version()
+        )
+    
+    def publish(self) -> int:
+        
+        with self._write_lock:
+            if not self._has_changes():
+                return self._current.version
+            
+            current = self._current
+            # Copia superficial del diccionario: los registros no modificados se comparten
+            records = dict(current._records)
+            dirty, self._dirty = self._dirty, {}
+            for student_id, student in dirty.items():
+                if student is None:
+                    records.pop(student_id, None)
+                else:
+                    records[student_id] = StudentRecord.capture(student)
+            
+            self._current = self._build_snapshot(current.version + 1, records)
+            return self._current.version
+    
+    def snapshot(self) -> GradebookSnapshot:
+        
+        # Cambios hechos fuera de una transacción se publican si ningún escritor está activo;
+        # si lo está, el lector no espera y recibe la última versión publicada
+        if self._has_changes() and self._write_lock.acquire(blocking=False):
+            try:
+                if self._transaction_depth == 0:
+                    self.publish()
+            finally:
+                self._write_lock.release()
+        
+        return self._current
+    
+    def __len__(self) -> int:
+        
+        return len(self._students)
+    
+    def __str__(self) -> str:
+        return f"Gradebook(Students: {len(self._students)}, Version: {self._current.version})"
+    
+    def __repr__(self) -> str:
+        return self.__str__()
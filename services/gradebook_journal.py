@@ -0,0 +1,347 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from models import Student, Evaluation
+from policies import AttendancePolicy, ExtraPointsPolicy
+from utils.exceptions import GradeCalculationError
+
+class GradebookJournal:
+    
+    EVENTS_FILE = 'events.jsonl'
+    SNAPSHOT_FILE = 'snapshot.json'
+    FORMAT_VERSION = 1
+    
+    EVENT_EVALUATIONS_REGISTERED = 'evaluations_registered'
+    EVENT_EVALUATIONS_UPSERTED = 'evaluations_upserted'
+    EVENT_EVALUATIONS_DELETED = 'evaluations_deleted'
+    EVENT_ATTENDANCE_REGISTERED = 'attendance_registered'
+    EVENT_POLICY_REGISTERED = 'extra_points_policy_registered'
+    
+    def __init__(
+        self,
+        directory: str,
+        group_size: int = 64,
+        flush_interval: float = 1.0,
+        snapshot_interval: int = 10000,
+        durable: bool = True
+    ):
+        
+        if not directory or not isinstance(directory, str):
+            raise ValueError("Debe proporcionar un directorio válido para el registro de eventos")
+        
+        if not isinstance(group_size, int) or group_size <= 0:
+            raise ValueError("El tamaño del grupo de escritura debe ser un entero positivo")
+        
+        if not isinstance(flush_interval, (int, float)) or flush_interval <= 0:
+            raise ValueError("El intervalo de escritura debe ser un número positivo")
+        
+        if not isinstance(snapshot_interval, int) or snapshot_interval <= 0:
+            raise ValueError("El intervalo de snapshots debe ser un entero positivo")
+        
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._group_size = group_size
+        self._flush_interval = flush_interval
+        self._snapshot_interval = snapshot_interval
+        self._durable = durable
+        self._pending: List[str] = []
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._last_flush = time.monotonic()
+        self._sequence = 0
+        self._snapshot_sequence = 0
+        self._students: Dict[str, Student] = {}
+        self._recovered = False
+    
+    @property
+    def directory(self) -> str:
+        
+        return self._directory
+    
+    @property
+    def sequence(self) -> int:
+        
+        return self._sequence
+    
+    @property
+    def pending_events(self) -> int:
+        
+        return len(self._pending)
+    
+    @property
+    def recovered(self) -> bool:
+        
+        return self._recovered
+    
+    def ensure_recovered(self) -> None:
+        
+        if not self._recovered:
+            # Sin recuperar antes, la secuencia y el estado del snapshot quedarían incompletos
+            raise GradeCalculationError(
+                "Debe recuperar el registro de eventos (recover) antes de registrar cambios"
+            )
+    
+    def _path(self, name: str) -> str:
+        
+        return os.path.join(self._directory, name)
+    
+    def record(
+        self,
+        event_type: str,
+        data: Dict[str, Any],
+        student: Optional[Student] = None,
+        sync: bool = False
+    ) -> int:
+        
+        # La durabilidad es diferida: un evento queda en disco al completar el grupo o, a más
+        # tardar, flush_interval segundos después. Con sync=True se escribe antes de retornar
+        self.ensure_recovered()
+        
+        with self._lock:
+            if student is not None:
+                self._students[student.student_id] = student
+            
+            self._sequence += 1
+            sequence = self._sequence
+            self._pending.append(json.dumps(
+                {'seq': sequence, 'type': event_type, 'data': data},
+                ensure_ascii=False,
+                separators=(',', ':')
+            ))
+            
+            # Confirmación en grupo: un solo write + fsync por lote de eventos
+            if (sync or len(self._pending) >= self._group_size
+                    or time.monotonic() - self._last_flush >= self._flush_interval):
+                self.flush()
+            elif self._timer is None:
+                # Un registro inactivo también escribe: el temporizador vence aunque no lleguen más eventos
+                self._timer = threading.Timer(self._flush_interval, self._flush_on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        
+        return sequence
+    
+    def record_evaluations(
+        self,
+        event_type: str,
+        student: Student,
+        evaluations: List[Evaluation],
+        sync: bool = False
+    ) -> int:
+        
+        return self.record(event_type, {
+            'student_id': student.student_id,
+            'name': student.name,
+            'evaluations': [[e.name, e.score, e.weight] for e in evaluations]
+        }, student, sync)
+    
+    def record_deletions(self, student: Student, names: List[str], sync: bool = False) -> int:
+        
+        return self.record(self.EVENT_EVALUATIONS_DELETED, {
+            'student_id': student.student_id,
+            'name': student.name,
+            'evaluations': list(names)
+        }, student, sync)
+    
+    def record_attendance(self, student: Student, sync: bool = False) -> int:
+        
+        return self.record(self.EVENT_ATTENDANCE_REGISTERED, {
+            'student_id': student.student_id,
+            'name': student.name,
+            'has_minimum_attendance': student.has_minimum_attendance
+        }, student, sync)
+    
+    def record_policy(
+        self,
+        teachers_agree: bool,
+        teachers_list: Optional[List[str]],
+        sync: bool = False
+    ) -> int:
+        
+        return self.record(self.EVENT_POLICY_REGISTERED, {
+            'teachers_agree': teachers_agree,
+            'teachers_list': list(teachers_list) if teachers_list else None
+        }, sync=sync)
+    
+    def _flush_on_timer(self) -> None:
+        
+        # El temporizador solo agrega al log: otro hilo puede haber cambiado un estudiante sin
+        # registrar aún el evento, y un snapshot tomado aquí lo incluiría dos veces al recuperar
+        with self._lock:
+            self._timer = None
+            self._write_pending()
+    
+    def _cancel_timer(self) -> None:
+        
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+    
+    def _write_pending(self) -> None:
+        
+        self._cancel_timer()
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        
+        with open(self._path(self.EVENTS_FILE), 'a', encoding='utf-8') as log:
+            log.write('\n'.join(self._pending) + '\n')
+            log.flush()
+            if self._durable:
+                os.fsync(log.fileno())
+        self._pending.clear()
+    
+    def flush(self) -> None:
+        
+        with self._lock:
+            self._write_pending()
+            if self._sequence - self._snapshot_sequence >= self._snapshot_interval:
+                self.snapshot()
+    
+    def snapshot(self) -> int:
+        
+        with self._lock:
+            return self._snapshot()
+    
+    def _snapshot(self) -> int:
+        
+        self._write_pending()
+        
+        state = {
+            'format_version': self.FORMAT_VERSION,
+            'seq': self._sequence,
+            # El log se compacta tras el snapshot: los eventos nuevos empiezan al inicio del archivo
+            'log_offset': 0,
+            'policy': {
+                'teachers_agree': AttendancePolicy.get_teachers_agreement(),
+                'teachers_list': ExtraPointsPolicy.get_all_years_teachers()
+            },
+            'students': [
+                {
+                    'student_id': student.student_id,
+                    'name': student.name,
+                    'has_minimum_attendance': student.has_minimum_attendance,
+                    'evaluations': [[e.name, e.score, e.weight] for e in student.evaluations]
+                }
+                for student in self._students.values()
+            ]
+        }
+        
+        temporary = self._path(self.SNAPSHOT_FILE + '.tmp')
+        with open(temporary, 'w', encoding='utf-8') as snapshot:
+            json.dump(state, snapshot, ensure_ascii=False, separators=(',', ':'))
+            snapshot.flush()
+            if self._durable:
+                os.fsync(snapshot.fileno())
+        os.replace(temporary, self._path(self.SNAPSHOT_FILE))
+        
+        # Compactación: todo lo escrito ya está en el snapshot. Si el proceso cae antes de truncar,
+        # la recuperación relee el log y descarta los eventos con seq <= seq del snapshot
+        with open(self._path(self.EVENTS_FILE), 'w', encoding='utf-8') as log:
+            if self._durable:
+                os.fsync(log.fileno())
+        
+        self._snapshot_sequence = self._sequence
+        return self._sequence
+    
+    def recover(self) -> Dict[str, Student]:
+        
+        students: Dict[str, Student] = {}
+        sequence = 0
+        offset = 0
+        
+        snapshot_path = self._path(self.SNAPSHOT_FILE)
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, 'r', encoding='utf-8') as snapshot:
+                state = json.load(snapshot)
+            if state.get('format_version') != self.FORMAT_VERSION:
+                raise ValueError("Versión de snapshot no soportada")
+            
+            sequence = state['seq']
+            offset = state['log_offset']
+            self._apply_policy(state['policy'])
+            for record in state['students']:
+                student = Student(record['student_id'], record['name'])
+                student.add_evaluations([Evaluation(*e) for e in record['evaluations']])
+                student.has_minimum_attendance = record['has_minimum_attendance']
+                students[student.student_id] = student
+        
+        self._snapshot_sequence = sequence
+        
+        log_path = self._path(self.EVENTS_FILE)
+        if os.path.exists(log_path):
+            with open(log_path, 'rb+') as log:
+                log.seek(offset)
+                position = offset
+                for line in log:
+                    if not line.endswith(b'\n'):
+                        # Escritura interrumpida al final del log: el evento no se confirmó
+                        # y se descarta para que los nuevos eventos no queden pegados a él
+                        log.truncate(position)
+                        break
+                    position += len(line)
+                    event = json.loads(line)
+                    if event['seq'] <= sequence:
+                        continue
+                    self._apply_event(students, event)
+                    sequence = event['seq']
+        
+        self._sequence = sequence
+        self._students = students
+        self._recovered = True
+        return dict(students)
+    
+    def _apply_event(self, students: Dict[str, Student], event: Dict[str, Any]) -> None:
+        
+        event_type = event['type']
+        data = event['data']
+        
+        if event_type == self.EVENT_POLICY_REGISTERED:
+            self._apply_policy(data)
+            return
+        
+        student = students.get(data['student_id'])
+        if student is None:
+            student = Student(data['student_id'], data['name'])
+            students[student.student_id] = student
+        
+        if event_type == self.EVENT_EVALUATIONS_REGISTERED:
+            student.add_evaluations([Evaluation(*e) for e in data['evaluations']])
+        elif event_type == self.EVENT_EVALUATIONS_UPSERTED:
+            for e in data['evaluations']:
+                student.upsert_evaluation(Evaluation(*e))
+        elif event_type == self.EVENT_EVALUATIONS_DELETED:
+            for name in data['evaluations']:
+                student.delete_evaluation(name)
+        elif event_type == self.EVENT_ATTENDANCE_REGISTERED:
+            student.has_minimum_attendance = data['has_minimum_attendance']
+        else:
+            raise ValueError(f"Tipo de evento desconocido: {event_type}")
+    
+    @staticmethod
+    def _apply_policy(data: Dict[str, Any]) -> None:
+        
+        AttendancePolicy.set_teachers_agreement(data['teachers_agree'])
+        if data.get('teachers_list'):
+            ExtraPointsPolicy.set_all_years_teachers(data['teachers_list'])
+    
+    def close(self) -> None:
+        
+        self.flush()
+    
+    def __enter__(self) -> 'GradebookJournal':
+        
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        
+        self.close()
+    
+    def __str__(self) -> str:
+        return f"GradebookJournal(Directory: {self._directory}, Seq: {self._sequence})"
+    
+    def __repr__(self) -> str:
+        return self.__str__()
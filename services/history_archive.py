@@ -0,0 +1,290 @@
+import json
+import lzma
+import os
+import zlib
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, List, Optional, Set
+
+class HistoryArchive:
+    
+    DATA_FILE = 'history.dat'
+    INDEX_FILE = 'index.jsonl'
+    COMPRESSION_ZLIB = 'zlib'
+    COMPRESSION_LZMA = 'lzma'
+    
+    _CODECS = {
+        COMPRESSION_ZLIB: (lambda data: zlib.compress(data, 9), zlib.decompress),
+        COMPRESSION_LZMA: (lambda data: lzma.compress(data, preset=6), lzma.decompress)
+    }
+    
+    def __init__(
+        self,
+        directory: str,
+        chunk_records: int = 2048,
+        compression: str = COMPRESSION_ZLIB,
+        cache_chunks: int = 8
+    ):
+        
+        if not directory or not isinstance(directory, str):
+            raise ValueError("Debe proporcionar un directorio válido para el archivo histórico")
+        
+        if not isinstance(chunk_records, int) or chunk_records <= 0:
+            raise ValueError("El tamaño de bloque debe ser un entero positivo")
+        
+        if compression not in self._CODECS:
+            raise ValueError(f"Compresión no soportada: {compression}")
+        
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._chunk_records = chunk_records
+        self._pending: List[Dict[str, Any]] = []
+        self._cache: 'OrderedDict[int, List[Dict[str, Any]]]' = OrderedDict()
+        self._cache_chunks = cache_chunks
+        self._compression = compression
+        self._chunks: List[Dict[str, Any]] = []
+        self._students: Dict[str, List[int]] = {}
+        self._data_length = 0
+        self._load_index()
+    
+    @property
+    def directory(self) -> str:
+        
+        return self._directory
+    
+    @property
+    def compression(self) -> str:
+        
+        return self._compression
+    
+    @property
+    def chunk_count(self) -> int:
+        
+        return len(self._chunks)
+    
+    def _path(self, name: str) -> str:
+        
+        return os.path.join(self._directory, name)
+    
+    def _load_index(self) -> None:
+        
+        # El índice es un log de una línea por bloque: agregar un bloque nunca reescribe el índice
+        index_path = self._path(self.INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path, 'r+b') as index:
+                position = 0
+                for line in index:
+                    if not line.endswith(b'\n'):
+                        index.truncate(position)
+                        break
+                    position += len(line)
+                    self._register_chunk(json.loads(line))
+        
+        # Un bloque escrito sin su línea de índice (escritura interrumpida) se descarta
+        data_path = self._path(self.DATA_FILE)
+        if os.path.exists(data_path) and os.path.getsize(data_path) > self._data_length:
+            with open(data_path, 'r+b') as data:
+                data.truncate(self._data_length)
+    
+    def _register_chunk(self, chunk: Dict[str, Any]) -> None:
+        
+        chunk_number = len(self._chunks)
+        for student_id in chunk.pop('students'):
+            self._students.setdefault(student_id, []).append(chunk_number)
+        self._chunks.append(chunk)
+        self._data_length = chunk['offset'] + chunk['length']
+    
+    def append(self, record: Dict[str, Any]) -> None:
+        
+        if not isinstance(record, dict) or 'student_id' not in record or 'timestamp' not in record:
+            raise ValueError("Debe proporcionar un registro de historial de cálculo")
+        
+        self._pending.append(record)
+        if len(self._pending) >= self._chunk_records:
+            self._write_chunk()
+    
+    def extend(self, records: Iterable[Dict[str, Any]]) -> int:
+        
+        count = 0
+        for record in records:
+            self.append(record)
+            count += 1
+        return count
+    
+    def flush(self) -> None:
+        
+        if self._pending:
+            self._write_chunk()
+    
+    def _write_chunk(self) -> None:
+        
+        records, self._pending = self._pending, []
+        
+        # Los nombres de campo van una vez en el índice y cada registro es una fila:
+        # sin claves repetidas el bloque comprime mucho mejor
+        fields: List[str] = []
+        known: Set[str] = set()
+        for record in records:
+            for key in record:
+                if key not in known:
+                    fields.append(key)
+                    known.add(key)
+        
+        rows = [[record.get(field) for field in fields] for record in records]
+        raw = json.dumps(rows, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        data = self._CODECS[self._compression][0](raw)
+        
+        offset = self._data_length
+        with open(self._path(self.DATA_FILE), 'ab') as output:
+            output.write(data)
+            output.flush()
+            os.fsync(output.fileno())
+        
+        timestamps = [record['timestamp'] for record in records]
+        chunk = {
+            'offset': offset,
+            'length': len(data),
+            'raw_length': len(raw),
+            'count': len(records),
+            'compression': self._compression,
+            'fields': fields,
+            'min_timestamp': min(timestamps),
+            'max_timestamp': max(timestamps),
+            'students': sorted({record['student_id'] for record in records})
+        }
+        with open(self._path(self.INDEX_FILE), 'a', encoding='utf-8') as index:
+            index.write(json.dumps(chunk, ensure_ascii=False, separators=(',', ':')) + '\n')
+            index.flush()
+            os.fsync(index.fileno())
+        
+        self._register_chunk(chunk)
+    
+    def _read_chunk(self, chunk_number: int) -> List[Dict[str, Any]]:
+        
+        cached = self._cache.get(chunk_number)
+        if cached is not None:
+            self._cache.move_to_end(chunk_number)
+            return cached
+        
+        chunk = self._chunks[chunk_number]
+        decompress = self._CODECS[chunk['compression']][1]
+        with open(self._path(self.DATA_FILE), 'rb') as source:
+            source.seek(chunk['offset'])
+            rows = json.loads(decompress(source.read(chunk['length'])))
+        
+        fields = chunk['fields']
+        records = [dict(zip(fields, row)) for row in rows]
+        
+        self._cache[chunk_number] = records
+        if len(self._cache) > self._cache_chunks:
+            self._cache.popitem(last=False)
+        return records
+    
+    def _candidate_chunks(
+        self,
+        student_id: Optional[str],
+        start: Optional[str],
+        end: Optional[str]
+    ) -> List[int]:
+        
+        chunks = self._chunks
+        if student_id is not None:
+            candidates = self._students.get(student_id, [])
+        else:
+            candidates = range(len(chunks))
+        
+        return [
+            number for number in candidates
+            if (start is None or chunks[number]['max_timestamp'] >= start)
+            and (end is None or chunks[number]['min_timestamp'] <= end)
+        ]
+    
+    def query(
+        self,
+        student_id: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        
+        def matches(record: Dict[str, Any]) -> bool:
+            return (
+                (student_id is None or record['student_id'] == student_id)
+                and (start is None or record['timestamp'] >= start)
+                and (end is None or record['timestamp'] <= end)
+            )
+        
+        # Solo se descomprimen los bloques que el índice señala como candidatos
+        results = []
+        for number in self._candidate_chunks(student_id, start, end):
+            for record in self._read_chunk(number):
+                if matches(record):
+                    results.append(record.copy())
+                    if limit is not None and len(results) >= limit:
+                        return results
+        
+        for record in self._pending:
+            if matches(record):
+                results.append(record.copy())
+                if limit is not None and len(results) >= limit:
+                    break
+        
+        return results
+    
+    def latest(self, student_id: str) -> Optional[Dict[str, Any]]:
+        
+        for record in reversed(self._pending):
+            if record['student_id'] == student_id:
+                return record.copy()
+        
+        for number in reversed(self._students.get(student_id, [])):
+            for record in reversed(self._read_chunk(number)):
+                if record['student_id'] == student_id:
+                    return record.copy()
+        
+        return None
+    
+    def student_ids(self) -> List[str]:
+        
+        students: Set[str] = set(self._students)
+        students.update(record['student_id'] for record in self._pending)
+        return sorted(students)
+    
+    def stats(self) -> Dict[str, Any]:
+        
+        chunks = self._chunks
+        stored = sum(chunk['length'] for chunk in chunks)
+        raw = sum(chunk['raw_length'] for chunk in chunks)
+        return {
+            'records': len(self),
+            'chunks': len(chunks),
+            'students': len(self._students),
+            'compression': self.compression,
+            'stored_bytes': stored,
+            'raw_bytes': raw,
+            'compression_ratio': round(raw / stored, 2) if stored else 0.0
+        }
+    
+    def close(self) -> None:
+        
+        self.flush()
+    
+    def __len__(self) -> int:
+        
+        return sum(chunk['count'] for chunk in self._chunks) + len(self._pending)
+    
+    def __enter__(self) -> 'HistoryArchive':
+        
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        
+        self.close()
+    
+    def __str__(self) -> str:
+        return (
+            f"HistoryArchive(Directory: {self._directory}, Records: {len(self)}, "
+            f"Chunks: {self.chunk_count})"
+        )
+    
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -0,0 +1,500 @@
+import csv
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional
+
+from models import Student, Teacher, Evaluation
+from utils.exceptions import GradeCalculationError
+from .grade_calculator import GradeCalculator
+
+def _students_from_payload(records: Iterable[Dict[str, Any]]) -> List[Student]:
+    
+    students = []
+    for record in records:
+        student = Student(record['student_id'], record['name'])
+        student.add_evaluations([Evaluation(*e) for e in record['evaluations']])
+        student.has_minimum_attendance = record.get('has_minimum_attendance', False)
+        students.append(student)
+    return students
+
+def regrade_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    
+    calculator = GradeCalculator(Teacher(*payload['teacher']))
+    students = _students_from_payload(payload['students'])
+    batch = calculator.compute_grades_batch(students, payload.get('extra_points'))
+    return {
+        'grades': {
+            student_id: final_grade / batch['scale']
+            for student_id, final_grade in zip(batch['student_id'], batch['final_grade'])
+            if student_id not in batch['errors']
+        },
+        'errors': batch['errors']
+    }
+
+def export_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    
+    calculator = GradeCalculator(Teacher(*payload['teacher']))
+    students = _students_from_payload(payload['students'])
+    batch = calculator.compute_grades_batch(students, payload.get('extra_points'))
+    
+    # Se escribe a un temporal y se renombra: un reintento nunca deja un archivo a medias
+    temporary = payload['path'] + '.tmp'
+    with open(temporary, 'w', newline='', encoding='utf-8') as output:
+        writer = csv.writer(output)
+        writer.writerow(['student_id', 'final_grade', 'passes_course'])
+        for student_id, final_grade, passes_course in zip(
+            batch['student_id'], batch['final_grade'], batch['passes_course']
+        ):
+            if student_id not in batch['errors']:
+                writer.writerow([student_id, final_grade / batch['scale'], passes_course])
+    os.replace(temporary, payload['path'])
+    
+    return {'path': payload['path'], 'rows': len(students) - len(batch['errors'])}
+
+DEFAULT_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    'regrade': regrade_job,
+    'export': export_job
+}
+
+class JobQueue:
+    
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    
+    BACKOFF_BASE = 0.5
+    BACKOFF_MAX = 60.0
+    
+    def __init__(
+        self,
+        path: str,
+        concurrency: Optional[Dict[str, int]] = None,
+        lease_seconds: float = 30.0
+    ):
+        
+        if not path or not isinstance(path, str):
+            raise ValueError("Debe proporcionar una ruta válida para la cola de trabajos")
+        
+        if concurrency is not None and not all(
+            isinstance(limit, int) and limit > 0 for limit in concurrency.values()
+        ):
+            raise ValueError("Los límites de concurrencia deben ser enteros positivos")
+        
+        if not isinstance(lease_seconds, (int, float)) or lease_seconds <= 0:
+            raise ValueError("La duración del arriendo debe ser un número positivo")
+        
+        self._path = path
+        self._concurrency = dict(concurrency or {})
+        self._lease_seconds = lease_seconds
+        self._connection = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+        self._connection.row_factory = sqlite3.Row
+        # WAL permite que los lectores de estado no bloqueen a los procesos que reclaman trabajos
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_type TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                available_at REAL NOT NULL,
+                lease_expires REAL,
+                worker TEXT,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        ''')
+        self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at)'
+        )
+    
+    @property
+    def path(self) -> str:
+        
+        return self._path
+    
+    @property
+    def concurrency(self) -> Dict[str, int]:
+        
+        return self._concurrency.copy()
+    
+    def enqueue(
+        self,
+        job_type: str,
+        payload: Dict[str, Any],
+        max_attempts: int = 3,
+        delay: float = 0.0
+    ) -> int:
+        
+        if not job_type or not isinstance(job_type, str):
+            raise ValueError("El tipo de trabajo debe ser un string no vacío")
+        
+        if not isinstance(max_attempts, int) or max_attempts <= 0:
+            raise ValueError("La cantidad de intentos debe ser un entero positivo")
+        
+        now = time.time()
+        cursor = self._connection.execute(
+            'INSERT INTO jobs (job_type, payload, status, max_attempts, available_at, created_at, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (job_type, json.dumps(payload, ensure_ascii=False), self.STATUS_PENDING,
+             max_attempts, now + delay, now, now)
+        )
+        return cursor.lastrowid
+    
+    def claim(
+        self,
+        worker_id: str,
+        job_types: Optional[Iterable[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        
+        now = time.time()
+        allowed = set(job_types) if job_types is not None else None
+        
+        # BEGIN IMMEDIATE toma el candado de escritura: dos procesos nunca reclaman el mismo trabajo
+        self._connection.execute('BEGIN IMMEDIATE')
+        try:
+            running = {
+                row['job_type']: row['active']
+                for row in self._connection.execute(
+                    'SELECT job_type, COUNT(*) AS active FROM jobs '
+                    'WHERE status = ? AND lease_expires > ? GROUP BY job_type',
+                    (self.STATUS_RUNNING, now)
+                )
+            }
+            saturated = {
+                job_type for job_type, limit in self._concurrency.items()
+                if running.get(job_type, 0) >= limit
+            }
+            
+            # Un arriendo vencido vuelve a entregarse: entrega al menos una vez
+            query = (
+                'SELECT * FROM jobs WHERE ((status = ? AND available_at <= ?) '
+                'OR (status = ? AND lease_expires <= ?))'
+            )
+            parameters: List[Any] = [self.STATUS_PENDING, now, self.STATUS_RUNNING, now]
+            if saturated:
+                query += f" AND job_type NOT IN ({', '.join('?' * len(saturated))})"
+                parameters.extend(saturated)
+            if allowed is not None:
+                query += f" AND job_type IN ({', '.join('?' * len(allowed))})"
+                parameters.extend(allowed)
+            query += ' ORDER BY available_at, id LIMIT 1'
+            
+            while True:
+                job = self._connection.execute(query, parameters).fetchone()
+                if job is None or job['attempts'] < job['max_attempts']:
+                    break
+                # El trabajador murió en el último intento: se marca fallido en vez de reintentar
+                self._connection.execute(
+                    'UPDATE jobs SET status = ?, error = ?, lease_expires = NULL, updated_at = ? WHERE id = ?',
+                    (self.STATUS_FAILED, 'Arriendo vencido en el último intento', now, job['id'])
+                )
+            
+            if job is None:
+                self._connection.execute('COMMIT')
+                return None
+            
+            self._connection.execute(
+                'UPDATE jobs SET status = ?, attempts = attempts + 1, lease_expires = ?, '
+                'worker = ?, updated_at = ? WHERE id = ?',
+                (self.STATUS_RUNNING, now + self._lease_seconds, worker_id, now, job['id'])
+            )
+            self._connection.execute('COMMIT')
+        except Exception:
+            self._connection.execute('ROLLBACK')
+            raise
+        
+        return {
+            'id': job['id'],
+            'job_type': job['job_type'],
+            'payload': json.loads(job['payload']),
+            'attempt': job['attempts'] + 1,
+            'max_attempts': job['max_attempts']
+        }
+    
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        
+        return self._renew_lease(self._connection, job_id, worker_id)
+    
+    def _renew_lease(self, connection: sqlite3.Connection, job_id: int, worker_id: str) -> bool:
+        
+        now = time.time()
+        cursor = connection.execute(
+            'UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = ?',
+            (now + self._lease_seconds, now, job_id, worker_id, self.STATUS_RUNNING)
+        )
+        return cursor.rowcount == 1
+    
+    def _lease_keeper(self, job_id: int, worker_id: str, done: threading.Event) -> None:
+        
+        # Conexión propia: sqlite3 no permite usar la conexión de la cola desde otro hilo
+        connection = sqlite3.connect(self._path, timeout=30.0, isolation_level=None)
+        try:
+            while not done.wait(self._lease_seconds / 3):
+                if not self._renew_lease(connection, job_id, worker_id):
+                    break
+        finally:
+            connection.close()
+    
+    @contextmanager
+    def _lease_renewal(self, job_id: int, worker_id: str) -> Iterator[None]:
+        
+        # Renueva el arriendo mientras corre el manejador: un trabajo largo no se entrega a otro trabajador
+        done = threading.Event()
+        keeper = threading.Thread(
+            target=self._lease_keeper,
+            args=(job_id, worker_id, done),
+            name=f"lease-{job_id}",
+            daemon=True
+        )
+        keeper.start()
+        try:
+            yield
+        finally:
+            done.set()
+            keeper.join()
+    
+    def complete(self, job_id: int, worker_id: str, result: Any = None) -> bool:
+        
+        return self._store_result(job_id, worker_id, json.dumps(result, ensure_ascii=False))
+    
+    def _store_result(self, job_id: int, worker_id: str, serialized: str) -> bool:
+        
+        # Solo el dueño vigente del arriendo confirma; un trabajador tardío no pisa el reintento
+        cursor = self._connection.execute(
+            'UPDATE jobs SET status = ?, result = ?, error = NULL, lease_expires = NULL, updated_at = ? '
+            'WHERE id = ? AND worker = ? AND status = ?',
+            (self.STATUS_SUCCEEDED, serialized, time.time(), job_id, worker_id, self.STATUS_RUNNING)
+        )
+        return cursor.rowcount == 1
+    
+    def fail(self, job_id: int, worker_id: str, error: str) -> bool:
+        
+        row = self._connection.execute(
+            'SELECT attempts, max_attempts FROM jobs WHERE id = ? AND worker = ? AND status = ?',
+            (job_id, worker_id, self.STATUS_RUNNING)
+        ).fetchone()
+        if row is None:
+            return False
+        
+        now = time.time()
+        if row['attempts'] >= row['max_attempts']:
+            status, available_at = self.STATUS_FAILED, now
+        else:
+            backoff = min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2 ** (row['attempts'] - 1))
+            status, available_at = self.STATUS_PENDING, now + backoff
+        
+        cursor = self._connection.execute(
+            'UPDATE jobs SET status = ?, error = ?, available_at = ?, lease_expires = NULL, updated_at = ? '
+            'WHERE id = ? AND worker = ? AND status = ?',
+            (status, error, available_at, now, job_id, worker_id, self.STATUS_RUNNING)
+        )
+        return cursor.rowcount == 1
+    
+    def process_next(
+        self,
+        worker_id: str,
+        handlers: Dict[str, Callable[[Dict[str, Any]], Any]]
+    ) -> Optional[int]:
+        
+        job = self.claim(worker_id, handlers.keys())
+        if job is None:
+            return None
+        
+        try:
+            with self._lease_renewal(job['id'], worker_id):
+                result = handlers[job['job_type']](job['payload'])
+            # Se serializa dentro del try: un resultado no JSON falla el trabajo sin tumbar al trabajador
+            serialized = json.dumps(result, ensure_ascii=False)
+        except Exception as e:
+            self.fail(job['id'], worker_id, f"{type(e).__name__}: {e}")
+        else:
+            self._store_result(job['id'], worker_id, serialized)
+        return job['id']
+    
+    def status(self, job_id: int) -> Dict[str, Any]:
+        
+        row = self._connection.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"Trabajo {job_id} no encontrado")
+        
+        return {
+            'id': row['id'],
+            'job_type': row['job_type'],
+            'status': row['status'],
+            'attempts': row['attempts'],
+            'max_attempts': row['max_attempts'],
+            'worker': row['worker'],
+            'error': row['error'],
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at']
+        }
+    
+    def result(self, job_id: int) -> Any:
+        
+        row = self._connection.execute(
+            'SELECT status, result, error FROM jobs WHERE id = ?', (job_id,)
+        ).fetchone()
+        if row is None:
+            raise ValueError(f"Trabajo {job_id} no encontrado")
+        
+        if row['status'] == self.STATUS_FAILED:
+            raise GradeCalculationError(f"El trabajo {job_id} falló: {row['error']}")
+        
+        if row['status'] != self.STATUS_SUCCEEDED:
+            raise GradeCalculationError(f"El trabajo {job_id} aún no termina ({row['status']})")
+        
+        return json.loads(row['result'])
+    
+    def wait(self, job_id: int, timeout: float = 30.0, poll_interval: float = 0.05) -> Dict[str, Any]:
+        
+        deadline = time.monotonic() + timeout
+        while True:
+            status = self.status(job_id)
+            if status['status'] in (self.STATUS_SUCCEEDED, self.STATUS_FAILED):
+                return status
+            if time.monotonic() >= deadline:
+                raise GradeCalculationError(f"Tiempo de espera agotado para el trabajo {job_id}")
+            time.sleep(poll_interval)
+    
+    def counts(self) -> Dict[str, int]:
+        
+        counts = {status: 0 for status in (
+            self.STATUS_PENDING, self.STATUS_RUNNING, self.STATUS_SUCCEEDED, self.STATUS_FAILED
+        )}
+        for row in self._connection.execute('SELECT status, COUNT(*) AS total FROM jobs GROUP BY status'):
+            counts[row['status']] = row['total']
+        return counts
+    
+    def close(self) -> None:
+        
+        self._connection.close()
+    
+    def __enter__(self) -> 'JobQueue':
+        
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        
+        self.close()
+    
+    def __str__(self) -> str:
+        return f"JobQueue(Path: {self._path}, Concurrency: {self._concurrency})"
+    
+    def __repr__(self) -> str:
+        return self.__str__()
+
+def _pool_worker(
+    path: str,
+    worker_id: str,
+    handlers: Dict[str, Callable[[Dict[str, Any]], Any]],
+    concurrency: Dict[str, int],
+    lease_seconds: float,
+    poll_interval: float,
+    niceness: int,
+    stop_event
+) -> None:
+    
+    # Menor prioridad de CPU: los cálculos interactivos no compiten con el trabajo por lotes
+    if niceness and hasattr(os, 'nice'):
+        os.nice(niceness)
+    
+    queue = JobQueue(path, concurrency, lease_seconds)
+    try:
+        while not stop_event.is_set():
+            if queue.process_next(worker_id, handlers) is None:
+                stop_event.wait(poll_interval)
+    finally:
+        queue.close()
+
+class WorkerPool:
+    
+    def __init__(
+        self,
+        path: str,
+        handlers: Optional[Dict[str, Callable[[Dict[str, Any]], Any]]] = None,
+        processes: int = 2,
+        concurrency: Optional[Dict[str, int]] = None,
+        lease_seconds: float = 30.0,
+        poll_interval: float = 0.1,
+        niceness: int = 10,
+        start_method: Optional[str] = None
+    ):
+        
+        if not isinstance(processes, int) or processes <= 0:
+            raise ValueError("La cantidad de procesos debe ser un entero positivo")
+        
+        self._path = path
+        self._handlers = dict(handlers if handlers is not None else DEFAULT_HANDLERS)
+        self._processes_count = processes
+        self._concurrency = dict(concurrency or {})
+        self._lease_seconds = lease_seconds
+        self._poll_interval = poll_interval
+        self._niceness = niceness
+        self._context = multiprocessing.get_context(start_method)
+        self._stop_event = self._context.Event()
+        self._processes: List[Any] = []
+        # Identifica a este conjunto: dos pools del mismo proceso no comparten IDs de trabajador
+        self._token = uuid.uuid4().hex[:8]
+        
+        # Se crea el esquema antes de arrancar los procesos
+        JobQueue(path, self._concurrency, lease_seconds).close()
+    
+    @property
+    def running(self) -> bool:
+        
+        return any(process.is_alive() for process in self._processes)
+    
+    def start(self) -> None:
+        
+        if self._processes:
+            raise GradeCalculationError("El conjunto de trabajadores ya fue iniciado")
+        
+        # stop() deja el evento activado: sin limpiarlo, un conjunto reiniciado terminaría al instante
+        self._stop_event.clear()
+        for number in range(self._processes_count):
+            worker_id = f"{os.getpid()}-{self._token}-{number}"
+            process = self._context.Process(
+                target=_pool_worker,
+                args=(self._path, worker_id, self._handlers, self._concurrency,
+                      self._lease_seconds, self._poll_interval, self._niceness, self._stop_event),
+                name=f"job-worker-{number}",
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+    
+    def stop(self, timeout: float = 10.0) -> None:
+        
+        self._stop_event.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes.clear()
+    
+    def __enter__(self) -> 'WorkerPool':
+        
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        
+        self.stop()
+    
+    def __str__(self) -> str:
+        return f"WorkerPool(Processes: {self._processes_count}, Running: {self.running})"
+    
+    def __repr__(self) -> str:
+        return self.__str__()
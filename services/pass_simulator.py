@@ -0,0 +1,165 @@
+import random
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from models import Student
+from .projection_engine import ProjectionEngine
+
+class PassSimulator:
+    
+    DISTRIBUTION_COURSE = 'course'
+    DISTRIBUTION_HISTORY = 'history'
+    DISTRIBUTION_UNIFORM = 'uniform'
+    
+    DISTRIBUTIONS = (DISTRIBUTION_COURSE, DISTRIBUTION_HISTORY, DISTRIBUTION_UNIFORM)
+    
+    def __init__(
+        self,
+        trials: int = 10000,
+        seed: int = 0,
+        remaining_evaluations: int = 1
+    ):
+        
+        if not isinstance(trials, int) or trials <= 0:
+            raise ValueError("El número de simulaciones debe ser un entero positivo")
+        
+        if not isinstance(seed, int):
+            raise ValueError("La semilla debe ser un entero (RNF03)")
+        
+        if not isinstance(remaining_evaluations, int) or remaining_evaluations <= 0:
+            raise ValueError("El número de evaluaciones pendientes debe ser un entero positivo")
+        
+        self._trials = trials
+        self._seed = seed
+        self._remaining_evaluations = remaining_evaluations
+    
+    @property
+    def trials(self) -> int:
+        
+        return self._trials
+    
+    @property
+    def seed(self) -> int:
+        
+        return self._seed
+    
+    def simulate(
+        self,
+        students: Iterable[Student],
+        distribution: str = DISTRIBUTION_COURSE,
+        extra_points: Optional[Dict[str, float]] = None,
+        risk_threshold: float = 0.5
+    ) -> Dict[str, Any]:
+        
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(
+                f"Distribución no soportada: {distribution}. Opciones: {', '.join(self.DISTRIBUTIONS)}"
+            )
+        
+        if not isinstance(risk_threshold, (int, float)) or not 0 <= risk_threshold <= 1:
+            raise ValueError("El umbral de riesgo debe estar entre 0 y 1")
+        
+        students = list(students)
+        # La proyección aplica nota base, puntos extra y tope de 20: aprobar equivale
+        # a que el promedio simulado de lo pendiente alcance la nota requerida
+        projection = ProjectionEngine.project_cohort(students, extra_points)
+        histories = [[e.score for e in student.evaluations] for student in students]
+        course_pool = [score for history in histories for score in history]
+        
+        # Semilla fija: los mismos datos producen la misma probabilidad (RNF03)
+        rng = random.Random(self._seed)
+        uniforms = [
+            [rng.random() for _ in range(self._remaining_evaluations)]
+            for _ in range(self._trials)
+        ]
+        
+        shared_samples = self._shared_samples(
+            uniforms,
+            course_pool if distribution != self.DISTRIBUTION_UNIFORM else None
+        )
+        index_tables: Dict[int, List[Tuple[Tuple[int, ...], int]]] = {}
+        
+        probabilities = array('d', bytes(8 * len(students)))
+        for i, (required, status) in enumerate(
+            zip(projection['required_score'], projection['status'])
+        ):
+            if status == ProjectionEngine.STATUS_SECURED:
+                probabilities[i] = 1.0
+                continue
+            
+            if status != ProjectionEngine.STATUS_REACHABLE:
+                continue
+            
+            history = histories[i]
+            if distribution == self.DISTRIBUTION_HISTORY and history:
+                table = index_tables.get(len(history))
+                if table is None:
+                    table = self._index_table(uniforms, len(history))
+                    index_tables[len(history)] = table
+                probabilities[i] = self._history_probability(history, table, required)
+            else:
+                passed = self._trials - bisect_left(shared_samples, required)
+                probabilities[i] = passed / self._trials
+        
+        return {
+            'student_id': projection['student_id'],
+            'pass_probability': probabilities,
+            'at_risk': [p < risk_threshold for p in probabilities],
+            'distribution': distribution,
+            'trials': self._trials,
+            'seed': self._seed
+        }
+    
+    def _shared_samples(
+        self,
+        uniforms: List[List[float]],
+        pool: Optional[List[float]]
+    ) -> List[float]:
+        
+        size = self._remaining_evaluations
+        if pool:
+            n = len(pool)
+            samples = [sum(pool[int(u * n)] for u in row) / size for row in uniforms]
+        else:
+            samples = [sum(u * 20.0 for u in row) / size for row in uniforms]
+        
+        # Ordenadas una vez: la probabilidad de cada estudiante se obtiene con bisect
+        samples.sort()
+        return samples
+    
+    @staticmethod
+    def _index_table(
+        uniforms: List[List[float]],
+        history_size: int
+    ) -> List[Tuple[Tuple[int, ...], int]]:
+        
+        # Números aleatorios comunes: los índices sorteados dependen solo del tamaño del
+        # historial, así que se cuentan una vez y se reutilizan para todos los estudiantes
+        counts = Counter(
+            tuple(int(u * history_size) for u in row)
+            for row in uniforms
+        )
+        return list(counts.items())
+    
+    def _history_probability(
+        self,
+        history: List[float],
+        table: List[Tuple[Tuple[int, ...], int]],
+        required: float
+    ) -> float:
+        
+        size = self._remaining_evaluations
+        passed = 0
+        for indexes, count in table:
+            if sum(history[j] for j in indexes) / size >= required:
+                passed += count
+        
+        return passed / self._trials
+    
+    def __str__(self) -> str:
+        return f"PassSimulator(Trials: {self._trials}, Seed: {self._seed})"
+    
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -0,0 +1,145 @@
+import math
+from array import array
+from typing import Dict, Any, Iterable, Optional, Sequence
+
+from models import Student
+from policies import AttendancePolicy
+
+class ProjectionEngine:
+    
+    APPROVAL_THRESHOLD = 10.5
+    MAX_SCORE = 20.0
+    
+    STATUS_SECURED = 'secured'
+    STATUS_REACHABLE = 'reachable'
+    STATUS_IMPOSSIBLE = 'impossible'
+    STATUS_NO_ATTENDANCE = 'no_attendance'
+    STATUS_INVALID_WEIGHTS = 'invalid_weights'
+    
+    @classmethod
+    def project_columns(
+        cls,
+        graded_points: Sequence[float],
+        graded_weight: Sequence[float],
+        has_attendance: Sequence[bool],
+        extra_points: Sequence[float],
+        teachers_agree: Optional[bool] = None,
+        target: float = APPROVAL_THRESHOLD
+    ) -> Dict[str, Any]:
+        
+        size = len(graded_points)
+        if not (len(graded_weight) == len(has_attendance) == len(extra_points) == size):
+            raise ValueError("Todas las columnas deben tener la misma longitud")
+        
+        if not isinstance(target, (int, float)) or target < 0 or target > cls.MAX_SCORE:
+            raise ValueError("La nota objetivo debe estar entre 0 y 20")
+        
+        if teachers_agree is None:
+            teachers_agree = AttendancePolicy.get_teachers_agreement()
+        
+        required = array('d', bytes(8 * size))
+        status = [cls.STATUS_REACHABLE] * size
+        max_score = cls.MAX_SCORE
+        
+        # Una sola pasada por columnas: nota_final = min(20, G + s * R / 100 + extra) >= objetivo
+        for i, (points, weight, attends, extra) in enumerate(
+            zip(graded_points, graded_weight, has_attendance, extra_points)
+        ):
+            if not attends:
+                required[i] = math.nan
+                status[i] = cls.STATUS_NO_ATTENDANCE
+                continue
+            
+            remaining = 100.0 - weight
+            if remaining < -0.01:
+                required[i] = math.nan
+                status[i] = cls.STATUS_INVALID_WEIGHTS
+                continue
+            
+            missing = target - points - (extra if teachers_agree else 0.0)
+            if missing <= 0:
+                status[i] = cls.STATUS_SECURED
+                continue
+            
+            if remaining <= 0.01:
+                required[i] = math.nan
+                status[i] = cls.STATUS_IMPOSSIBLE
+                continue
+            
+            # Se redondea hacia arriba a la centésima para que la nota mínima garantice aprobar
+            needed = math.ceil(round(missing * 100.0 / remaining * 100, 6)) / 100
+            if needed > max_score:
+                required[i] = math.nan
+                status[i] = cls.STATUS_IMPOSSIBLE
+            else:
+                required[i] = needed
+        
+        return {
+            'required_score': required,
+            'status': status
+        }
+    
+    @classmethod
+    def project_cohort(
+        cls,
+        students: Iterable[Student],
+        extra_points: Optional[Dict[str, float]] = None,
+        target: float = APPROVAL_THRESHOLD
+    ) -> Dict[str, Any]:
+        
+        extra_points = extra_points or {}
+        student_ids = []
+        graded_points = array('d')
+        graded_weight = array('d')
+        has_attendance = []
+        requested_extra = array('d')
+        
+        for student in students:
+            if not isinstance(student, Student):
+                raise ValueError("Debe proporcionar estudiantes válidos")
+            
+            points = 0.0
+            weight = 0.0
+            for evaluation in student.evaluations:
+                points += evaluation.calculate_weighted_score()
+                weight += evaluation.weight
+            
+            student_ids.append(student.student_id)
+            graded_points.append(points)
+            graded_weight.append(weight)
+            has_attendance.append(student.has_minimum_attendance)
+            requested_extra.append(extra_points.get(student.student_id, 0.0))
+        
+        projection = cls.project_columns(
+            graded_points,
+            graded_weight,
+            has_attendance,
+            requested_extra,
+            target=target
+        )
+        projection['student_id'] = student_ids
+        projection['remaining_weight'] = array('d', (max(0.0, 100.0 - w) for w in graded_weight))
+        
+        return projection
+    
+    @classmethod
+    def project_student(
+        cls,
+        student: Student,
+        extra_points: float = 0.0,
+        target: float = APPROVAL_THRESHOLD
+    ) -> Dict[str, Any]:
+        
+        projection = cls.project_cohort(
+            [student],
+            {student.student_id: extra_points},
+            target
+        )
+        required = projection['required_score'][0]
+        
+        return {
+            'student_id': student.student_id,
+            'remaining_weight': projection['remaining_weight'][0],
+            'required_score': None if math.isnan(required) else required,
+            'status': projection['status'][0]
+        }
@@ -0,0 +1,137 @@
+import math
+from bisect import bisect_left, insort
+from typing import Dict, Any, List, Optional, Tuple
+
+from models import Student
+from policies import AttendancePolicy
+from utils.exceptions import GradeCalculationError
+from .grade_calculator import GradeCalculator
+
+class RankingIndex:
+    
+    def __init__(self, calculator: GradeCalculator, course_id: str = ''):
+        
+        if not isinstance(calculator, GradeCalculator):
+            raise ValueError("Debe proporcionar una calculadora válida")
+        
+        self._calculator = calculator
+        self._course_id = course_id
+        # Claves (-nota_final, student_id): orden descendente por nota, empate por ID
+        self._keys: List[Tuple[float, str]] = []
+        self._grades: Dict[str, float] = {}
+        self._students: Dict[str, Student] = {}
+        self._extra_points: Dict[str, float] = {}
+        self._teachers_agree = AttendancePolicy.get_teachers_agreement()
+    
+    @property
+    def course_id(self) -> str:
+        
+        return self._course_id
+    
+    def track(self, student: Student, extra_points: float = 0.0) -> None:
+        
+        if not isinstance(student, Student):
+            raise ValueError("Debe proporcionar un estudiante válido")
+        
+        if student.student_id not in self._students:
+            student.subscribe(self.refresh)
+        
+        self._students[student.student_id] = student
+        self._extra_points[student.student_id] = extra_points
+        self.refresh(student)
+    
+    def untrack(self, student: Student) -> None:
+        
+        if self._students.pop(student.student_id, None) is None:
+            return
+        
+        student.unsubscribe(self.refresh)
+        self._extra_points.pop(student.student_id, None)
+        self._remove_key(student.student_id)
+    
+    def refresh(self, student: Student) -> None:
+        
+        student_id = student.student_id
+        self._remove_key(student_id)
+        
+        try:
+            grade = self._calculator.compute_grade(
+                student,
+                self._extra_points.get(student_id, 0.0)
+            )
+        except GradeCalculationError:
+            # Evaluaciones incompletas (pesos != 100%): el estudiante aún no se clasifica
+            return
+        
+        final_grade = grade['final_grade']
+        self._grades[student_id] = final_grade
+        insort(self._keys, (-final_grade, student_id))
+    
+    def _remove_key(self, student_id: str) -> None:
+        
+        previous = self._grades.pop(student_id, None)
+        if previous is None:
+            return
+        
+        position = bisect_left(self._keys, (-previous, student_id))
+        del self._keys[position]
+    
+    def _sync_policy(self) -> None:
+        
+        teachers_agree = AttendancePolicy.get_teachers_agreement()
+        if teachers_agree == self._teachers_agree:
+            return
+        
+        self._teachers_agree = teachers_agree
+        for student_id, extra_points in self._extra_points.items():
+            if extra_points > 0:
+                self.refresh(self._students[student_id])
+    
+    def rank(self, student_id: str) -> Optional[int]:
+        
+        self._sync_policy()
+        grade = self._grades.get(student_id)
+        if grade is None:
+            return None
+        
+        # Ranking de competición: los empates comparten posición
+        return bisect_left(self._keys, (-grade,)) + 1
+    
+    def top(self, k: int) -> List[Dict[str, Any]]:
+        
+        if not isinstance(k, int) or k < 0:
+            raise ValueError("k debe ser un entero no negativo")
+        
+        self._sync_policy()
+        return [
+            {
+                'rank': bisect_left(self._keys, (negative_grade,)) + 1,
+                'student_id': student_id,
+                'final_grade': -negative_grade
+            }
+            for negative_grade, student_id in self._keys[:k]
+        ]
+    
+    def percentile_rank(self, student_id: str) -> Optional[float]:
+        
+        self._sync_policy()
+        grade = self._grades.get(student_id)
+        if grade is None:
+            return None
+        
+        higher = bisect_left(self._keys, (-grade,))
+        not_lower = bisect_left(self._keys, (math.nextafter(-grade, math.inf),))
+        equal = not_lower - higher
+        lower = len(self._keys) - not_lower
+        
+        return round((lower + 0.5 * equal) / len(self._keys) * 100, 2)
+    
+    def __len__(self) -> int:
+        
+        return len(self._keys)
+    
+    def __str__(self) -> str:
+        return f"RankingIndex(Course: {self._course_id}, Ranked: {len(self._keys)})"
+    
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -0,0 +1,33 @@
+from typing import Dict, List, Tuple
+
+from models import Student
+
+class RegradeIndex:
+    
+    def __init__(self):
+        
+        # Sin nota guardada: una nota de otro momento mezclaría cambios de evaluaciones con los de la política
+        self._entries: Dict[str, Tuple[Student, float]] = {}
+    
+    def track(self, student: Student, extra_points: float) -> None:
+        
+        if extra_points > 0:
+            self._entries[student.student_id] = (student, extra_points)
+        else:
+            self._entries.pop(student.student_id, None)
+    
+    def untrack(self, student_id: str) -> None:
+        
+        self._entries.pop(student_id, None)
+    
+    def dependents(self) -> List[Tuple[Student, float]]:
+        
+        # Solo la nota de quien pidió puntos extra y cumple asistencia depende del acuerdo docente
+        return [
+            entry for entry in self._entries.values()
+            if entry[0].has_minimum_attendance
+        ]
+    
+    def __len__(self) -> int:
+        
+        return len(self._entries)
@@ -0,0 +1,410 @@
+import html
+import multiprocessing
+import os
+import time
+import zipfile
+from collections import deque
+from string import Formatter
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+from models import Student, Teacher, Evaluation
+from policies import AttendancePolicy, ExtraPointsPolicy, CompiledPolicy, GradingRules
+from .grade_calculator import GradeCalculator
+
+TEXT_TEMPLATE = '''
+======================================================================
+DETALLE COMPLETO DEL CÁLCULO
+======================================================================
+
+1. INFORMACIÓN DEL ESTUDIANTE:
+   ID: {student_info.id}
+   Nombre: {student_info.name}
+   Evaluaciones registradas: {student_info.evaluations_count}
+
+2. EVALUACIONES:
+{evaluations}
+3. CÁLCULO BASE:
+   Fórmula: {base_calculation.formula}
+   Peso total: {base_calculation.total_weight}%
+   Nota base: {base_calculation.base_grade}
+
+4. ASISTENCIA:
+   Cumple requisito: {labels.meets_requirement}
+   Estado: {attendance.message}
+   Impacto: {attendance.impact}
+
+5. PUNTOS EXTRA:
+   Solicitados: {extra_points.requested}
+   Aplicados: {extra_points.applied}
+   Docentes aprueban: {labels.teachers_agree}
+   Detalle: {extra_points.message}
+
+6. RESULTADO FINAL:
+   NOTA FINAL: {final_result.final_grade}
+   Umbral de aprobación: {final_result.approval_threshold}
+   Estado: {labels.status}
+{labels.capped}
+7. METADATA:
+   Calculado por: {metadata.calculated_by}
+   ID Docente: {metadata.teacher_id}
+   Tiempo de cálculo: {metadata.calculation_time_ms} ms
+   Fecha/Hora: {metadata.timestamp}
+
+======================================================================
+'''
+
+TEXT_EVALUATION_TEMPLATE = '''
+   Evaluación {number}: {name}
+   - Nota: {score}/20
+   - Peso: {weight}%
+   - Contribución: {contribution}
+'''
+
+HTML_TEMPLATE = '''<!DOCTYPE html>
+<html lang="es">
+<head><meta charset="utf-8"><title>Detalle del cálculo - {student_info.id}</title></head>
+<body>
+<h1>Detalle completo del cálculo</h1>
+<h2>1. Información del estudiante</h2>
+<p>ID: {student_info.id}<br>Nombre: {student_info.name}<br>Evaluaciones registradas: {student_info.evaluations_count}</p>
+<h2>2. Evaluaciones</h2>
+<table>
+<tr><th>#</th><th>Evaluación</th><th>Nota</th><th>Peso</th><th>Contribución</th></tr>
+{evaluations}</table>
+<h2>3. Cálculo base</h2>
+<p>Fórmula: {base_calculation.formula}<br>Peso total: {base_calculation.total_weight}%<br>Nota base: {base_calculation.base_grade}</p>
+<h2>4. Asistencia</h2>
+<p>Cumple requisito: {labels.meets_requirement}<br>Estado: {attendance.message}<br>Impacto: {attendance.impact}</p>
+<h2>5. Puntos extra</h2>
+<p>Solicitados: {extra_points.requested}<br>Aplicados: {extra_points.applied}<br>Docentes aprueban: {labels.teachers_agree}<br>Detalle: {extra_points.message}</p>
+<h2>6. Resultado final</h2>
+<p>Nota final: <strong>{final_result.final_grade}</strong><br>Umbral de aprobación: {final_result.approval_threshold}<br>Estado: {labels.status}<br>{labels.capped}</p>
+<h2>7. Metadata</h2>
+<p>Calculado por: {metadata.calculated_by}<br>ID Docente: {metadata.teacher_id}<br>Tiempo de cálculo: {metadata.calculation_time_ms} ms<br>Fecha/Hora: {metadata.timestamp}</p>
+</body>
+</html>
+'''
+
+HTML_EVALUATION_TEMPLATE = (
+    '<tr><td>{number}</td><td>{name}</td><td>{score}/20</td><td>{weight}%</td>'
+    '<td>{contribution}</td></tr>\n'
+)
+
+class ReportTemplate:
+    
+    def __init__(
+        self,
+        source: str,
+        escape: Optional[Callable[[str], str]] = None,
+        raw_fields: Iterable[str] = ()
+    ):
+        
+        if not isinstance(source, str):
+            raise ValueError("La plantilla debe ser un string")
+        
+        self._source = source
+        raw_fields = set(raw_fields)
+        # Se analiza una sola vez: renderizar es concatenar literales y valores ya resueltos
+        self._parts: List[Tuple[str, Optional[Callable[[Dict[str, Any]], str]]]] = []
+        for literal, field, format_spec, conversion in Formatter().parse(source):
+            if field is None:
+                self._parts.append((literal, None))
+                continue
+            if conversion:
+                raise ValueError(f"Conversión no soportada en el campo {field}")
+            self._parts.append((
+                literal,
+                self._compile_field(field, format_spec or '', escape if field not in raw_fields else None)
+            ))
+    
+    @staticmethod
+    def _compile_field(
+        field: str,
+        format_spec: str,
+        escape: Optional[Callable[[str], str]]
+    ) -> Callable[[Dict[str, Any]], str]:
+        
+        path = field.split('.')
+        
+        def resolve(context: Dict[str, Any]) -> str:
+            value = context
+            for key in path:
+                value = value[key]
+            text = format(value, format_spec)
+            return escape(text) if escape is not None else text
+        
+        return resolve
+    
+    def render(self, context: Dict[str, Any]) -> str:
+        
+        return ''.join(
+            literal + resolve(context) if resolve is not None else literal
+            for literal, resolve in self._parts
+        )
+
+class ReportRenderer:
+    
+    FORMAT_TEXT = 'text'
+    FORMAT_HTML = 'html'
+    
+    _TEMPLATES = {
+        FORMAT_TEXT: (TEXT_TEMPLATE, TEXT_EVALUATION_TEMPLATE, None, 'txt'),
+        FORMAT_HTML: (HTML_TEMPLATE, HTML_EVALUATION_TEMPLATE, html.escape, 'html')
+    }
+    
+    def __init__(
+        self,
+        calculator: GradeCalculator,
+        output_format: str = FORMAT_TEXT,
+        processes: Optional[int] = None,
+        chunk_size: int = 256,
+        max_in_flight: Optional[int] = None
+    ):
+        
+        if not isinstance(calculator, GradeCalculator):
+            raise ValueError("Debe proporcionar una calculadora válida")
+        
+        if output_format not in self._TEMPLATES:
+            raise ValueError(f"Formato no soportado: {output_format}")
+        
+        if processes is not None and (not isinstance(processes, int) or processes <= 0):
+            raise ValueError("La cantidad de procesos debe ser un entero positivo")
+        
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise ValueError("El tamaño de bloque debe ser un entero positivo")
+        
+        self._calculator = calculator
+        self._output_format = output_format
+        self._processes = processes or os.cpu_count() or 1
+        self._chunk_size = chunk_size
+        # Bloques pendientes acotados: la memoria no crece con el tamaño de la cohorte
+        self._max_in_flight = max_in_flight or self._processes * 2
+        self._body, self._row, self._extension = self.compile_templates(output_format)
+    
+    @property
+    def extension(self) -> str:
+        
+        return self._extension
+    
+    @classmethod
+    def compile_templates(cls, output_format: str) -> Tuple[ReportTemplate, ReportTemplate, str]:
+        
+        body, row, escape, extension = cls._TEMPLATES[output_format]
+        return (
+            ReportTemplate(body, escape, raw_fields=('evaluations',)),
+            ReportTemplate(row, escape),
+            extension
+        )
+    
+    @staticmethod
+    def render_detail(detail: Dict[str, Any], body: ReportTemplate, row: ReportTemplate) -> str:
+        
+        final_result = detail['final_result']
+        context = dict(detail)
+        context['evaluations'] = ''.join(row.render(e) for e in detail['evaluations_detail'])
+        context['labels'] = {
+            'meets_requirement': ' SÍ' if detail['attendance']['meets_requirement'] else ' NO',
+            'teachers_agree': ' SÍ' if detail['extra_points']['teachers_agree'] else ' NO',
+            'status': ' APROBADO' if final_result['passes_course'] else ' DESAPROBADO',
+            'capped': (
+                f"   NOTA: Nota limitada a {final_result['grade_cap']:g} (máximo permitido)\n"
+                if final_result['grade_capped'] else ''
+            )
+        }
+        return body.render(context)
+    
+    def render(self, student: Student, extra_points: float = 0.0) -> str:
+        
+        detail = self._calculator.get_calculation_detail(student, extra_points)
+        return self.render_detail(detail, self._body, self._row)
+    
+    def _worker_config(self) -> Tuple[Any, ...]:
+        
+        # Se envían las reglas sin compilar: CompiledRules usa closures y no se puede serializar
+        # para procesos iniciados con spawn o forkserver
+        rules = self._calculator.rules
+        return (
+            self._calculator.teacher.teacher_id,
+            self._calculator.teacher.name,
+            self._calculator.fixed_point_mode,
+            rules.rules if rules is not None else None,
+            AttendancePolicy.get_teachers_agreement(),
+            ExtraPointsPolicy.get_all_years_teachers(),
+            self._output_format
+        )
+    
+    def _chunks(
+        self,
+        students: Iterable[Student],
+        extra_points: Dict[str, float]
+    ) -> Iterator[List[Tuple[str, str, List[Tuple[str, float, float]], bool, float]]]:
+        
+        chunk = []
+        for student in students:
+            chunk.append((
+                student.student_id,
+                student.name,
+                [(e.name, e.score, e.weight) for e in student.evaluations],
+                student.has_minimum_attendance,
+                extra_points.get(student.student_id, 0.0)
+            ))
+            if len(chunk) >= self._chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    
+    def iter_reports(
+        self,
+        students: Iterable[Student],
+        extra_points: Optional[Dict[str, float]] = None
+    ) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+        
+        chunks = self._chunks(students, extra_points or {})
+        config = self._worker_config()
+        
+        if self._processes == 1:
+            _init_render_worker(*config)
+            for chunk in chunks:
+                yield from _render_chunk(chunk)
+            return
+        
+        with multiprocessing.Pool(self._processes, _init_render_worker, config) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.apply_async(_render_chunk, (chunk,)))
+                if len(pending) >= self._max_in_flight:
+                    yield from pending.popleft().get()
+            while pending:
+                yield from pending.popleft().get()
+    
+    def _report_name(self, student_id: str) -> Optional[str]:
+        
+        # El ID no está validado como nombre de archivo: "../x" o "a/b" escaparían del destino
+        name = f"{student_id}.{self._extension}"
+        if (student_id in ('.', '..') or '\x00' in name
+                or any(separator in name for separator in ('/', '\\', os.sep, os.altsep) if separator)):
+            return None
+        return name
+    
+    def render_to_directory(
+        self,
+        students: Iterable[Student],
+        directory: str,
+        extra_points: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Any]:
+        
+        os.makedirs(directory, exist_ok=True)
+        root = os.path.realpath(directory)
+        start_time = time.time()
+        rendered = 0
+        errors: Dict[str, str] = {}
+        
+        for student_id, report, error in self.iter_reports(students, extra_points):
+            if error is not None:
+                errors[student_id] = error
+                continue
+            name = self._report_name(student_id)
+            target = os.path.realpath(os.path.join(root, name)) if name is not None else None
+            if target is None or os.path.dirname(target) != root:
+                errors[student_id] = f"ID de estudiante no válido como nombre de archivo: {student_id!r}"
+                continue
+            with open(target, 'w', encoding='utf-8') as output:
+                output.write(report)
+            rendered += 1
+        
+        return {
+            'success': not errors,
+            'rendered': rendered,
+            'errors': errors,
+            'output': directory,
+            'elapsed_seconds': round(time.time() - start_time, 3)
+        }
+    
+    def render_to_archive(
+        self,
+        students: Iterable[Student],
+        path: str,
+        extra_points: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Any]:
+        
+        start_time = time.time()
+        rendered = 0
+        errors: Dict[str, str] = {}
+        
+        with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for student_id, report, error in self.iter_reports(students, extra_points):
+                if error is not None:
+                    errors[student_id] = error
+                    continue
+                name = self._report_name(student_id)
+                if name is None:
+                    errors[student_id] = f"ID de estudiante no válido como nombre de archivo: {student_id!r}"
+                    continue
+                archive.writestr(name, report)
+                rendered += 1
+        
+        return {
+            'success': not errors,
+            'rendered': rendered,
+            'errors': errors,
+            'output': path,
+            'elapsed_seconds': round(time.time() - start_time, 3)
+        }
+    
+    def __str__(self) -> str:
+        return (
+            f"ReportRenderer(Format: {self._output_format}, Processes: {self._processes}, "
+            f"Chunk: {self._chunk_size})"
+        )
+    
+    def __repr__(self) -> str:
+        return self.__str__()
+
+_worker_state: Dict[str, Any] = {}
+
+def _init_render_worker(
+    teacher_id: str,
+    teacher_name: str,
+    fixed_point_mode: bool,
+    rules: Optional[GradingRules],
+    teachers_agree: bool,
+    teachers_list: List[str],
+    output_format: str
+) -> None:
+    
+    AttendancePolicy.set_teachers_agreement(teachers_agree)
+    if teachers_list:
+        ExtraPointsPolicy.set_all_years_teachers(teachers_list)
+    
+    body, row, _ = ReportRenderer.compile_templates(output_format)
+    _worker_state.update(
+        calculator=GradeCalculator(
+            Teacher(teacher_id, teacher_name),
+            fixed_point_mode,
+            rules.compile() if rules is not None else None
+        ),
+        body=body,
+        row=row
+    )
+
+def _render_chunk(
+    chunk: List[Tuple[str, str, List[Tuple[str, float, float]], bool, float]]
+) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    
+    calculator = _worker_state['calculator']
+    body, row = _worker_state['body'], _worker_state['row']
+    # Con política explícita el detalle no se acumula en el historial del proceso
+    policy = CompiledPolicy.current()
+    
+    rendered = []
+    for student_id, name, evaluations, has_attendance, extra_points in chunk:
+        try:
+            student = Student(student_id, name)
+            student.add_evaluations([Evaluation(*e) for e in evaluations])
+            student.has_minimum_attendance = has_attendance
+            detail = calculator.get_calculation_detail(student, extra_points, policy)
+            rendered.append((student_id, ReportRenderer.render_detail(detail, body, row), None))
+        except Exception as e:
+            rendered.append((student_id, None, str(e)))
+    return rendered
@@ -0,0 +1,209 @@
+import math
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+from models import Student
+
+class RosterIndex:
+    
+    FILTER_MISSING_EVALUATIONS = 'missing_evaluations'
+    FILTER_NO_ATTENDANCE = 'no_attendance'
+    FILTERS = (FILTER_MISSING_EVALUATIONS, FILTER_NO_ATTENDANCE)
+    
+    def __init__(self):
+        
+        self._students: Dict[str, Student] = {}
+        # Índices ordenados: IDs y pares (palabra normalizada del nombre, ID) para búsqueda por prefijo
+        self._ids: List[str] = []
+        self._name_keys: List[Tuple[str, str]] = []
+        self._filters: Dict[str, Set[str]] = {name: set() for name in self.FILTERS}
+    
+    @staticmethod
+    def normalize(text: str) -> str:
+        
+        # Sin tildes ni mayúsculas: "gonzá" encuentra a "González"
+        decomposed = unicodedata.normalize('NFKD', text.casefold())
+        return ''.join(char for char in decomposed if not unicodedata.combining(char))
+    
+    @classmethod
+    def _name_tokens(cls, name: str) -> Set[str]:
+        
+        return set(cls.normalize(name).split())
+    
+    def track(self, student: Student) -> None:
+        
+        if not isinstance(student, Student):
+            raise ValueError("Debe proporcionar un estudiante válido")
+        
+        student_id = student.student_id
+        if student_id in self._students:
+            self.untrack(student_id)
+        
+        student.subscribe(self._on_change)
+        self._students[student_id] = student
+        insort(self._ids, student_id)
+        for token in self._name_tokens(student.name):
+            insort(self._name_keys, (token, student_id))
+        self._on_change(student)
+    
+    def track_all(self, students: Iterable[Student]) -> int:
+        
+        # Carga masiva: se agregan todos y se ordena una sola vez en lugar de un insort por estudiante
+        batch: Dict[str, Student] = {}
+        for student in students:
+            if not isinstance(student, Student):
+                raise ValueError("Debe proporcionar estudiantes válidos")
+            batch[student.student_id] = student
+        
+        # Los ya registrados se retiran antes de agregar, mientras los índices siguen ordenados
+        for student_id in batch:
+            self.untrack(student_id)
+        
+        for student_id, student in batch.items():
+            student.subscribe(self._on_change)
+            self._students[student_id] = student
+            self._ids.append(student_id)
+            self._name_keys.extend((token, student_id) for token in self._name_tokens(student.name))
+            self._on_change(student)
+        
+        self._ids.sort()
+        self._name_keys.sort()
+        return len(batch)
+    
+    def untrack(self, student_id: str) -> bool:
+        
+        student = self._students.pop(student_id, None)
+        if student is None:
+            return False
+        
+        student.unsubscribe(self._on_change)
+        del self._ids[bisect_left(self._ids, student_id)]
+        for token in self._name_tokens(student.name):
+            del self._name_keys[bisect_left(self._name_keys, (token, student_id))]
+        for members in self._filters.values():
+            members.discard(student_id)
+        return True
+    
+    def _on_change(self, student: Student) -> None:
+        
+        student_id = student.student_id
+        self._set_membership(
+            self.FILTER_MISSING_EVALUATIONS, student_id, student.get_evaluation_count() == 0
+        )
+        self._set_membership(
+            self.FILTER_NO_ATTENDANCE, student_id, not student.has_minimum_attendance
+        )
+    
+    def _set_membership(self, filter_name: str, student_id: str, member: bool) -> None:
+        
+        if member:
+            self._filters[filter_name].add(student_id)
+        else:
+            self._filters[filter_name].discard(student_id)
+    
+    def get(self, student_id: str) -> Optional[Student]:
+        
+        return self._students.get(student_id)
+    
+    @staticmethod
+    def _prefix_range(keys: List, prefix: Any, upper: Any) -> Tuple[int, int]:
+        
+        return bisect_left(keys, prefix), bisect_left(keys, upper)
+    
+    def _matching_ids(self, query: str) -> Set[str]:
+        
+        # Prefijo del ID o de cualquier palabra del nombre; cada palabra de la consulta debe coincidir
+        query = query.strip()
+        matches: Set[str] = set()
+        start, end = self._prefix_range(self._ids, query, query + '\U0010ffff')
+        matches.update(self._ids[start:end])
+        
+        words = self.normalize(query).split()
+        if not words:
+            return matches
+        
+        by_name: Optional[Set[str]] = None
+        for word in words:
+            start, end = self._prefix_range(self._name_keys, (word,), (word + '\U0010ffff',))
+            found = {student_id for _, student_id in self._name_keys[start:end]}
+            by_name = found if by_name is None else by_name & found
+            if not by_name:
+                break
+        return matches | (by_name or set())
+    
+    def _select(self, query: Optional[str], filter_name: Optional[str]) -> List[str]:
+        
+        if filter_name is not None and filter_name not in self._filters:
+            raise ValueError(f"Filtro desconocido: {filter_name}")
+        
+        if query is None or not query.strip():
+            if filter_name is None:
+                return self._ids
+            return sorted(self._filters[filter_name])
+        
+        matches = self._matching_ids(query)
+        if filter_name is not None:
+            matches &= self._filters[filter_name]
+        return sorted(matches)
+    
+    def search(
+        self,
+        query: str,
+        filter_name: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Student]:
+        
+        selected = self._select(query, filter_name)
+        if limit is not None:
+            selected = selected[:limit]
+        return [self._students[student_id] for student_id in selected]
+    
+    def page(
+        self,
+        page: int = 1,
+        page_size: int = 20,
+        query: Optional[str] = None,
+        filter_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        
+        if not isinstance(page, int) or page < 1:
+            raise ValueError("La página debe ser un entero positivo")
+        
+        if not isinstance(page_size, int) or page_size < 1:
+            raise ValueError("El tamaño de página debe ser un entero positivo")
+        
+        selected = self._select(query, filter_name)
+        total = len(selected)
+        pages = max(1, math.ceil(total / page_size))
+        start = (page - 1) * page_size
+        return {
+            'students': [self._students[student_id] for student_id in selected[start:start + page_size]],
+            'page': page,
+            'page_size': page_size,
+            'pages': pages,
+            'total': total,
+            'has_next': page < pages
+        }
+    
+    def count(self, filter_name: Optional[str] = None) -> int:
+        
+        if filter_name is None:
+            return len(self._students)
+        if filter_name not in self._filters:
+            raise ValueError(f"Filtro desconocido: {filter_name}")
+        return len(self._filters[filter_name])
+    
+    def __len__(self) -> int:
+        
+        return len(self._students)
+    
+    def __contains__(self, student_id: object) -> bool:
+        
+        return student_id in self._students
+    
+    def __str__(self) -> str:
+        return f"RosterIndex(Students: {len(self._students)})"
+    
+    def __repr__(self) -> str:
+        return self.__str__()
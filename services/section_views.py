@@ -0,0 +1,199 @@
+from typing import Dict, Any, List, Optional, Tuple
+
+from models import Student
+from policies import AttendancePolicy, CompiledPolicy
+from utils import fixed_point
+from utils.exceptions import GradeCalculationError
+from .grade_calculator import GradeCalculator
+
+# Aporte de un estudiante a su sección bajo cada estado del acuerdo docente:
+# (nota final en centésimas o None si no es calculable, aprueba)
+_Contribution = Tuple[Optional[int], bool]
+
+class _SectionAggregate:
+    
+    __slots__ = ('students', 'attending', 'graded', 'grade_sum', 'passed')
+    
+    def __init__(self):
+        
+        self.students = 0
+        self.attending = 0
+        # Índice 0: docentes en desacuerdo, índice 1: de acuerdo
+        self.graded = [0, 0]
+        self.grade_sum = [0, 0]
+        self.passed = [0, 0]
+    
+    def apply(
+        self,
+        has_attendance: bool,
+        contributions: Tuple[_Contribution, _Contribution],
+        sign: int
+    ) -> None:
+        
+        self.students += sign
+        self.attending += sign * has_attendance
+        for state, (final_grade, passes_course) in enumerate(contributions):
+            if final_grade is None:
+                continue
+            self.graded[state] += sign
+            self.grade_sum[state] += sign * final_grade
+            self.passed[state] += sign * passes_course
+    
+    def as_tuple(self) -> Tuple[int, ...]:
+        
+        return (self.students, self.attending, *self.graded, *self.grade_sum, *self.passed)
+
+class SectionViews:
+    
+    # Políticas fijas por estado: el aporte se calcula para ambos y un cambio de acuerdo es O(1)
+    _POLICIES = (CompiledPolicy(-1, False), CompiledPolicy(-1, True))
+    
+    def __init__(self, calculator: GradeCalculator):
+        
+        if not isinstance(calculator, GradeCalculator):
+            raise ValueError("Debe proporcionar una calculadora válida")
+        
+        self._calculator = calculator
+        self._sections: Dict[str, _SectionAggregate] = {}
+        self._students: Dict[str, Student] = {}
+        self._membership: Dict[str, str] = {}
+        self._extra_points: Dict[str, float] = {}
+        self._contributions: Dict[str, Tuple[bool, Tuple[_Contribution, _Contribution]]] = {}
+    
+    def _contribution(self, student: Student) -> Tuple[bool, Tuple[_Contribution, _Contribution]]:
+        
+        extra_points = self._extra_points.get(student.student_id, 0.0)
+        contributions = []
+        for policy in self._POLICIES:
+            try:
+                grade = self._calculator.compute_grade(student, extra_points, policy)
+                contributions.append((
+                    fixed_point.score_to_hundredths(grade['final_grade']),
+                    grade['passes_course']
+                ))
+            except GradeCalculationError:
+                contributions.append((None, False))
+        return student.has_minimum_attendance, (contributions[0], contributions[1])
+    
+    def track(self, student: Student, section_id: str, extra_points: float = 0.0) -> None:
+        
+        if not isinstance(student, Student):
+            raise ValueError("Debe proporcionar un estudiante válido")
+        
+        if not section_id or not isinstance(section_id, str):
+            raise ValueError("El ID de la sección debe ser un string no vacío")
+        
+        if not isinstance(extra_points, (int, float)) or extra_points < 0:
+            raise ValueError("Los puntos extra deben ser un número no negativo")
+        
+        if student.student_id in self._students:
+            self.untrack(self._students[student.student_id])
+        
+        student.subscribe(self._on_change)
+        self._students[student.student_id] = student
+        self._membership[student.student_id] = section_id
+        self._extra_points[student.student_id] = extra_points
+        
+        contribution = self._contribution(student)
+        self._contributions[student.student_id] = contribution
+        self._sections.setdefault(section_id, _SectionAggregate()).apply(*contribution, 1)
+    
+    def untrack(self, student: Student) -> None:
+        
+        student_id = student.student_id
+        if self._students.pop(student_id, None) is None:
+            return
+        
+        student.unsubscribe(self._on_change)
+        section_id = self._membership.pop(student_id)
+        self._extra_points.pop(student_id, None)
+        self._sections[section_id].apply(*self._contributions.pop(student_id), -1)
+    
+    def set_extra_points(self, student_id: str, extra_points: float) -> None:
+        
+        if student_id not in self._students:
+            raise ValueError(f"Estudiante {student_id} no registrado en las vistas")
+        
+        if not isinstance(extra_points, (int, float)) or extra_points < 0:
+            raise ValueError("Los puntos extra deben ser un número no negativo")
+        
+        self._extra_points[student_id] = extra_points
+        self._on_change(self._students[student_id])
+    
+    def _on_change(self, student: Student) -> None:
+        
+        # Se resta el aporte anterior y se suma el nuevo: el costo no depende del tamaño de la sección
+        section = self._sections[self._membership[student.student_id]]
+        section.apply(*self._contributions[student.student_id], -1)
+        contribution = self._contribution(student)
+        self._contributions[student.student_id] = contribution
+        section.apply(*contribution, 1)
+    
+    def view(self, section_id: str) -> Dict[str, Any]:
+        
+        section = self._sections.get(section_id)
+        if section is None:
+            raise ValueError(f"Sección {section_id} no registrada")
+        
+        state = int(AttendancePolicy.get_teachers_agreement())
+        graded = section.graded[state]
+        return {
+            'section_id': section_id,
+            'students': section.students,
+            'graded_students': graded,
+            'average_final_grade': (
+                round(section.grade_sum[state] / graded / fixed_point.SCORE_SCALE, 2)
+                if graded else None
+            ),
+            'pass_rate': round(section.passed[state] / graded, 4) if graded else 0.0,
+            'attendance_compliance': (
+                round(section.attending / section.students, 4) if section.students else 0.0
+            ),
+            'teachers_agree': bool(state)
+        }
+    
+    def views(self) -> List[Dict[str, Any]]:
+        
+        return [
+            self.view(section_id) for section_id in sorted(self._sections)
+            if self._sections[section_id].students
+        ]
+    
+    def rebuild(self) -> None:
+        
+        sections: Dict[str, _SectionAggregate] = {}
+        contributions = {}
+        for student_id, student in self._students.items():
+            contribution = self._contribution(student)
+            contributions[student_id] = contribution
+            sections.setdefault(self._membership[student_id], _SectionAggregate()).apply(*contribution, 1)
+        
+        self._sections = sections
+        self._contributions = contributions
+    
+    def verify(self) -> List[str]:
+        
+        # Recalcula desde cero sin tocar las vistas y devuelve las secciones que difieren
+        expected: Dict[str, _SectionAggregate] = {}
+        for student_id, student in self._students.items():
+            expected.setdefault(self._membership[student_id], _SectionAggregate()).apply(
+                *self._contribution(student), 1
+            )
+        
+        mismatched = []
+        for section_id in set(expected) | set(self._sections):
+            current = self._sections.get(section_id, _SectionAggregate()).as_tuple()
+            rebuilt = expected.get(section_id, _SectionAggregate()).as_tuple()
+            if current != rebuilt:
+                mismatched.append(section_id)
+        return sorted(mismatched)
+    
+    def __len__(self) -> int:
+        
+        return len(self._students)
+    
+    def __str__(self) -> str:
+        return f"SectionViews(Sections: {len(self._sections)}, Students: {len(self._students)})"
+    
+    def __repr__(self) -> str:
+        return self.__str__()
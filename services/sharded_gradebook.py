@@ -0,0 +1,512 @@
+import bisect
+import hashlib
+import json
+import multiprocessing
+import time
+from typing import Dict, Any, Iterable, List, Optional, TextIO, Tuple
+
+from models import Student, Teacher, Evaluation
+from policies import AttendancePolicy, ExtraPointsPolicy
+from utils import fixed_point
+from utils.exceptions import GradeCalculationError
+from .grade_calculator import GradeCalculator
+from .cohort_statistics import CohortStatistics
+
+class ConsistentHashRing:
+    
+    def __init__(self, virtual_nodes: int = 64):
+        
+        if not isinstance(virtual_nodes, int) or virtual_nodes <= 0:
+            raise ValueError("La cantidad de nodos virtuales debe ser un entero positivo")
+        
+        self._virtual_nodes = virtual_nodes
+        self._hashes: List[int] = []
+        self._owners: List[str] = []
+        self._nodes: List[str] = []
+    
+    @staticmethod
+    def _hash(key: str) -> int:
+        
+        # md5 solo como función de dispersión estable entre procesos (hash() usa semilla aleatoria)
+        return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+    
+    @property
+    def nodes(self) -> List[str]:
+        
+        return self._nodes.copy()
+    
+    def add_node(self, node: str) -> None:
+        
+        if node in self._nodes:
+            raise ValueError(f"El nodo {node} ya está en el anillo")
+        
+        self._nodes.append(node)
+        for replica in range(self._virtual_nodes):
+            point = self._hash(f"{node}#{replica}")
+            position = bisect.bisect_left(self._hashes, point)
+            self._hashes.insert(position, point)
+            self._owners.insert(position, node)
+    
+    def remove_node(self, node: str) -> None:
+        
+        if node not in self._nodes:
+            raise ValueError(f"El nodo {node} no está en el anillo")
+        
+        self._nodes.remove(node)
+        kept = [(point, owner) for point, owner in zip(self._hashes, self._owners) if owner != node]
+        self._hashes = [point for point, _ in kept]
+        self._owners = [owner for _, owner in kept]
+    
+    def node_for(self, key: str) -> str:
+        
+        if not self._hashes:
+            raise GradeCalculationError("El anillo no tiene nodos")
+        
+        position = bisect.bisect(self._hashes, self._hash(key))
+        return self._owners[position % len(self._owners)]
+    
+    def __len__(self) -> int:
+        
+        return len(self._nodes)
+
+def _shard_worker(connection, teacher_id: str, teacher_name: str) -> None:
+    
+    calculator = GradeCalculator(Teacher(teacher_id, teacher_name))
+    courses: Dict[str, Dict[str, Student]] = {}
+    
+    def register(course_rows: Dict[str, List[Tuple[str, str, list, Optional[bool]]]]) -> Dict[str, Any]:
+        
+        result = {'students_processed': 0, 'evaluations_added': 0, 'errors': {}}
+        for course_id, rows in course_rows.items():
+            students = courses.get(course_id, {})
+            pending = []
+            errors: Dict[str, List[str]] = {}
+            for student_id, name, evaluations, _ in rows:
+                known = students.get(student_id)
+                if known is None:
+                    pending.append((Student(student_id, name), list(evaluations)))
+                    continue
+                
+                # Estudiante ya registrado: sus evaluaciones se combinan por nombre (upsert) en una
+                # copia, que se valida completa en el lote; el original no cambia si el curso falla
+                try:
+                    merged = {e.name: e for e in known.evaluations}
+                    for evaluation in evaluations:
+                        evaluation = Evaluation(*evaluation)
+                        merged[evaluation.name] = evaluation
+                except (TypeError, ValueError) as e:
+                    errors[student_id] = [str(e)]
+                    continue
+                replacement = Student(known.student_id, known.name)
+                replacement.has_minimum_attendance = known.has_minimum_attendance
+                pending.append((replacement, list(merged.values())))
+            
+            # Todo o nada por curso, igual que register_evaluations_bulk
+            outcome = calculator.register_evaluations_bulk(pending) if not errors else None
+            if outcome is None or not outcome['success']:
+                result['errors'][course_id] = errors or outcome['errors']
+                continue
+            
+            course = courses.setdefault(course_id, {})
+            for (student, _), (_, _, _, has_attendance) in zip(pending, rows):
+                course[student.student_id] = student
+                if has_attendance is not None:
+                    student.has_minimum_attendance = has_attendance
+            result['students_processed'] += outcome['students_processed']
+            # Se cuentan las evaluaciones recibidas: las de un estudiante conocido van reunidas en su copia
+            result['evaluations_added'] += sum(len(evaluations) for _, _, evaluations, _ in rows)
+        
+        return result
+    
+    def set_attendance(course_id: str, attendance: Dict[str, bool]) -> int:
+        
+        course = courses.get(course_id, {})
+        updated = 0
+        for student_id, has_attendance in attendance.items():
+            if student_id in course:
+                course[student_id].has_minimum_attendance = has_attendance
+                updated += 1
+        return updated
+    
+    def grade_rows(course_id: str, extra_points: Dict[str, float]) -> List[Dict[str, Any]]:
+        
+        students = list(courses.get(course_id, {}).values())
+        batch = calculator.compute_grades_batch(students, extra_points)
+        rows = []
+        for student, final_grade, passes_course in zip(
+            students, batch['final_grade'], batch['passes_course']
+        ):
+            valid = student.student_id not in batch['errors']
+            rows.append({
+                'course_id': course_id,
+                'student_id': student.student_id,
+                'student_name': student.name,
+                'final_grade': fixed_point.hundredths_to_float(final_grade) if valid else None,
+                'passes_course': passes_course if valid else None,
+                'has_minimum_attendance': student.has_minimum_attendance
+            })
+        return rows
+    
+    def statistics(course_ids: Optional[List[str]], extra_points: Dict[str, float]) -> CohortStatistics:
+        
+        partial = CohortStatistics()
+        for course_id in (courses if course_ids is None else course_ids):
+            for row in grade_rows(course_id, extra_points):
+                if row['final_grade'] is not None:
+                    partial.add_grade(row['final_grade'], row['passes_course'])
+        return partial
+    
+    def export(course_ids: Optional[List[str]], extra_points: Dict[str, float]) -> List[Dict[str, Any]]:
+        
+        rows = []
+        for course_id in sorted(courses if course_ids is None else course_ids):
+            rows.extend(grade_rows(course_id, extra_points))
+        return rows
+    
+    def release(course_id: str) -> List[Tuple[str, str, list, bool]]:
+        
+        course = courses.pop(course_id, {})
+        return [
+            (
+                student.student_id,
+                student.name,
+                [(e.name, e.score, e.weight) for e in student.evaluations],
+                student.has_minimum_attendance
+            )
+            for student in course.values()
+        ]
+    
+    def set_policy(teachers_agree: bool, teachers_list: Optional[List[str]]) -> bool:
+        
+        AttendancePolicy.set_teachers_agreement(teachers_agree)
+        if teachers_list:
+            ExtraPointsPolicy.set_all_years_teachers(teachers_list)
+        return teachers_agree
+    
+    handlers = {
+        'register': register,
+        'set_attendance': set_attendance,
+        'statistics': statistics,
+        'export': export,
+        'release': release,
+        'courses': lambda: {course_id: len(course) for course_id, course in courses.items()},
+        'policy': set_policy
+    }
+    
+    while True:
+        try:
+            command, args = connection.recv()
+        except EOFError:
+            break
+        
+        if command == 'stop':
+            connection.send((True, None))
+            break
+        
+        try:
+            connection.send((True, handlers[command](*args)))
+        except Exception as e:
+            connection.send((False, f"{type(e).__name__}: {e}"))
+    
+    connection.close()
+
+class ShardedGradebook:
+    
+    def __init__(
+        self,
+        teacher: Teacher,
+        workers: int = 2,
+        virtual_nodes: int = 64,
+        start_method: Optional[str] = None,
+        reply_timeout: float = 60.0
+    ):
+        
+        if not isinstance(teacher, Teacher):
+            raise ValueError("Debe proporcionar un docente válido")
+        
+        if not isinstance(workers, int) or workers <= 0:
+            raise ValueError("La cantidad de procesos debe ser un entero positivo")
+        
+        if not isinstance(reply_timeout, (int, float)) or reply_timeout <= 0:
+            raise ValueError("El tiempo de espera de respuesta debe ser un número positivo")
+        
+        self._teacher = teacher
+        self._reply_timeout = reply_timeout
+        self._context = multiprocessing.get_context(start_method)
+        self._ring = ConsistentHashRing(virtual_nodes)
+        self._workers: Dict[str, Tuple[Any, Any]] = {}
+        self._next_worker = 0
+        self._closed = False
+        
+        for _ in range(workers):
+            self._start_worker()
+    
+    @property
+    def workers(self) -> List[str]:
+        
+        return self._ring.nodes
+    
+    def _start_worker(self) -> str:
+        
+        name = f"shard-{self._next_worker}"
+        self._next_worker += 1
+        
+        parent, child = self._context.Pipe()
+        process = self._context.Process(
+            target=_shard_worker,
+            args=(child, self._teacher.teacher_id, self._teacher.name),
+            name=name,
+            daemon=True
+        )
+        process.start()
+        child.close()
+        
+        self._workers[name] = (process, parent)
+        self._ring.add_node(name)
+        # Cada proceso tiene su propia política: se alinea con la vigente al arrancar
+        self._call(name, 'policy', AttendancePolicy.get_teachers_agreement(),
+                   ExtraPointsPolicy.get_all_years_teachers())
+        return name
+    
+    def shard_for(self, course_id: str) -> str:
+        
+        if not course_id or not isinstance(course_id, str):
+            raise ValueError("El ID del curso debe ser un string no vacío")
+        return self._ring.node_for(course_id)
+    
+    def _send(self, worker: str, command: str, *args: Any) -> None:
+        
+        if self._closed:
+            raise GradeCalculationError("El registro distribuido ya fue cerrado")
+        try:
+            self._workers[worker][1].send((command, args))
+        except OSError as e:
+            raise GradeCalculationError(f"Error en el proceso {worker}: el proceso terminó inesperadamente") from e
+    
+    def _read_reply(self, worker: str, deadline: float) -> Tuple[bool, Any]:
+        
+        # poll con plazo: un proceso caído o colgado no deja al coordinador esperando para siempre
+        connection = self._workers[worker][1]
+        try:
+            if connection.poll(max(0.0, deadline - time.monotonic())):
+                return connection.recv()
+        except (EOFError, OSError):
+            return False, "el proceso terminó inesperadamente"
+        return False, f"sin respuesta en {self._reply_timeout} s"
+    
+    def _receive(self, worker: str) -> Any:
+        
+        ok, payload = self._read_reply(worker, time.monotonic() + self._reply_timeout)
+        if not ok:
+            raise GradeCalculationError(f"Error en el proceso {worker}: {payload}")
+        return payload
+    
+    def _call(self, worker: str, command: str, *args: Any) -> Any:
+        
+        self._send(worker, command, *args)
+        return self._receive(worker)
+    
+    def _scatter(self, requests: Dict[str, Tuple[Any, ...]], command: str) -> Dict[str, Any]:
+        
+        # Se envía a todos antes de esperar respuestas: los procesos trabajan en paralelo
+        sent = []
+        try:
+            for worker, args in requests.items():
+                self._send(worker, command, *args)
+                sent.append(worker)
+        finally:
+            # Se leen todas las respuestas antes de informar un error: una respuesta sin leer
+            # quedaría en el pipe y el siguiente comando a ese proceso recibiría la equivocada
+            deadline = time.monotonic() + self._reply_timeout
+            replies = {worker: self._read_reply(worker, deadline) for worker in sent}
+        
+        for worker, (ok, payload) in replies.items():
+            if not ok:
+                raise GradeCalculationError(f"Error en el proceso {worker}: {payload}")
+        return {worker: payload for worker, (_, payload) in replies.items()}
+    
+    def _group_by_shard(self, course_ids: Iterable[str]) -> Dict[str, List[str]]:
+        
+        groups: Dict[str, List[str]] = {}
+        for course_id in course_ids:
+            groups.setdefault(self.shard_for(course_id), []).append(course_id)
+        return groups
+    
+    def register_courses(
+        self,
+        course_rows: Dict[str, Iterable[Tuple[str, str, list, Optional[bool]]]]
+    ) -> Dict[str, Any]:
+        
+        if not isinstance(course_rows, dict):
+            raise ValueError("Debe proporcionar un diccionario de cursos")
+        
+        requests: Dict[str, Tuple[Dict[str, list]]] = {}
+        for course_id, rows in course_rows.items():
+            payload = requests.setdefault(self.shard_for(course_id), ({},))[0]
+            payload[course_id] = [
+                (student_id, name, [tuple(e) for e in evaluations], has_attendance)
+                for student_id, name, evaluations, has_attendance in rows
+            ]
+        
+        replies = self._scatter(requests, 'register')
+        errors: Dict[str, Any] = {}
+        for reply in replies.values():
+            errors.update(reply['errors'])
+        
+        return {
+            'success': not errors,
+            'students_processed': sum(r['students_processed'] for r in replies.values()),
+            'evaluations_added': sum(r['evaluations_added'] for r in replies.values()),
+            'errors': errors
+        }
+    
+    def register_course(
+        self,
+        course_id: str,
+        rows: Iterable[Tuple[str, str, list, Optional[bool]]]
+    ) -> Dict[str, Any]:
+        
+        return self.register_courses({course_id: rows})
+    
+    def register_attendance(self, course_id: str, attendance: Dict[str, bool]) -> int:
+        
+        if not all(isinstance(value, bool) for value in attendance.values()):
+            raise ValueError("El estado de asistencia debe ser booleano")
+        return self._call(self.shard_for(course_id), 'set_attendance', course_id, dict(attendance))
+    
+    def register_extra_points_policy(
+        self,
+        teachers_agree: bool,
+        teachers_list: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        
+        if not isinstance(teachers_agree, bool):
+            raise ValueError("El acuerdo de docentes debe ser booleano")
+        
+        AttendancePolicy.set_teachers_agreement(teachers_agree)
+        if teachers_list:
+            ExtraPointsPolicy.set_all_years_teachers(teachers_list)
+        
+        self._scatter(
+            {worker: (teachers_agree, teachers_list) for worker in self._workers},
+            'policy'
+        )
+        return {
+            'success': True,
+            'teachers_agree': teachers_agree,
+            'workers_updated': len(self._workers)
+        }
+    
+    def courses(self) -> Dict[str, str]:
+        
+        placement = {}
+        for worker, counts in self._scatter({w: () for w in self._workers}, 'courses').items():
+            for course_id in counts:
+                placement[course_id] = worker
+        return placement
+    
+    def course_statistics(
+        self,
+        course_id: str,
+        extra_points: Optional[Dict[str, float]] = None
+    ) -> CohortStatistics:
+        
+        partial = self._call(self.shard_for(course_id), 'statistics', [course_id], extra_points or {})
+        return CohortStatistics.combine([partial], course_id)
+    
+    def statistics(
+        self,
+        course_ids: Optional[List[str]] = None,
+        extra_points: Optional[Dict[str, float]] = None
+    ) -> CohortStatistics:
+        
+        extra_points = extra_points or {}
+        if course_ids is None:
+            requests = {worker: (None, extra_points) for worker in self._workers}
+        else:
+            requests = {
+                worker: (courses, extra_points)
+                for worker, courses in self._group_by_shard(course_ids).items()
+            }
+        
+        # Los parciales de Welford se combinan sin volver a recorrer las notas
+        return CohortStatistics.combine(self._scatter(requests, 'statistics').values())
+    
+    def export(
+        self,
+        stream: TextIO,
+        course_ids: Optional[List[str]] = None,
+        extra_points: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Any]:
+        
+        extra_points = extra_points or {}
+        if course_ids is None:
+            requests = {worker: (None, extra_points) for worker in self._workers}
+        else:
+            requests = {
+                worker: (courses, extra_points)
+                for worker, courses in self._group_by_shard(course_ids).items()
+            }
+        
+        exported = 0
+        for rows in self._scatter(requests, 'export').values():
+            for row in rows:
+                stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+            exported += len(rows)
+        
+        return {'success': True, 'exported': exported, 'workers': len(requests)}
+    
+    def add_worker(self) -> Dict[str, Any]:
+        
+        placement = self.courses()
+        name = self._start_worker()
+        
+        # Con hashing consistente solo se mueven los cursos que ahora pertenecen al nuevo nodo
+        moved = []
+        for course_id, owner in placement.items():
+            if self._ring.node_for(course_id) != owner:
+                rows = self._call(owner, 'release', course_id)
+                reply = self._call(name, 'register', {course_id: rows})
+                if reply['errors']:
+                    # El curso vuelve a su dueño anterior antes de informar el fallo
+                    self._call(owner, 'register', {course_id: rows})
+                    raise GradeCalculationError(
+                        f"No se pudo mover el curso {course_id} a {name}: {reply['errors']}"
+                    )
+                moved.append(course_id)
+        
+        return {
+            'success': True,
+            'worker': name,
+            'courses_moved': moved,
+            'courses_total': len(placement)
+        }
+    
+    def close(self) -> None:
+        
+        if self._closed:
+            return
+        
+        for worker, (process, connection) in self._workers.items():
+            try:
+                connection.send(('stop', ()))
+                connection.recv()
+            except (EOFError, OSError):
+                pass
+            connection.close()
+            process.join(timeout=5)
+        self._closed = True
+    
+    def __enter__(self) -> 'ShardedGradebook':
+        
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        
+        self.close()
+    
+    def __str__(self) -> str:
+        return f"ShardedGradebook(Workers: {len(self._workers)}, Closed: {self._closed})"
+    
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -0,0 +1,165 @@
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from models import Student, Teacher, Evaluation
+from services import GradeCalculator, CohortGenerator
+from policies import AttendancePolicy
+from test_sistema import TestRunner
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "memory_baselines.json")
+DEFAULT_TOLERANCE = 0.25
+ABSOLUTE_SLACK = 64
+# Picos absolutos de unos pocos KB: un porcentaje de 1 KB no cubre la variación del intérprete
+PEAK_SLACK = 4096
+PYTHON_VERSION = f"{sys.version_info.major}.{sys.version_info.minor}"
+COHORT_SIZES = (1000, 5000, 20000)
+SAMPLE_SIZE = 2000
+UPDATE_BASELINES = "--actualizar" in sys.argv
+_measurements = {}
+def load_all_baselines():
+    
+    if not os.path.exists(BASELINES_PATH):
+        return {}
+    with open(BASELINES_PATH, "r", encoding="utf-8") as source:
+        return json.load(source)["versions"]
+def load_baselines():
+    
+    # Los tamaños de objetos cambian entre versiones de Python: solo se compara contra la propia
+    return load_all_baselines().get(PYTHON_VERSION, {})
+def save_baselines(metrics):
+    
+    versions = load_all_baselines()
+    baselines = versions.get(PYTHON_VERSION, {})
+    for name, value in metrics.items():
+        entry = dict(baselines.get(name, {"tolerance": DEFAULT_TOLERANCE}))
+        if name.startswith("peak_grading_bytes_"):
+            entry.setdefault("slack", PEAK_SLACK)
+        entry["value"] = round(value, 1)
+        baselines[name] = entry
+    versions[PYTHON_VERSION] = dict(sorted(baselines.items()))
+    payload = {"versions": dict(sorted(versions.items()))}
+    with open(BASELINES_PATH, "w", encoding="utf-8") as output:
+        json.dump(payload, output, indent=2, ensure_ascii=False)
+        output.write("\n")
+def check_metric(name, value):
+    
+    # Se falla solo si se supera la línea base más su tolerancia; bajar de la base no es regresión
+    _measurements[name] = value
+    baseline = load_baselines().get(name)
+    if baseline is None or UPDATE_BASELINES:
+        print(f" {name}: {value:,.1f} bytes (sin comparar, sin línea base para Python {PYTHON_VERSION})")
+        return
+    # Margen absoluto mínimo para métricas cercanas a cero, donde un porcentaje no alcanza
+    slack = baseline.get("slack", ABSOLUTE_SLACK)
+    limit = max(baseline["value"] * (1 + baseline["tolerance"]), baseline["value"] + slack)
+    print(f" {name}: {value:,.1f} bytes (base {baseline['value']:,.1f}, límite {limit:,.1f})")
+    assert value <= limit, (
+        f"Regresión de memoria en {name}: {value:,.1f} bytes supera el límite de {limit:,.1f} "
+        f"(base {baseline['value']:,.1f} + {baseline['tolerance']:.0%})"
+    )
+def measure(action):
+    
+    # Devuelve (resultado, bytes retenidos, pico) de la acción; el resultado se mantiene vivo
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        # reset_peak existe desde Python 3.9; antes el pico ya parte de cero al iniciar el rastreo
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        result = action()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, current - start, peak - start
+def build_students(count, seed=0):
+    
+    return CohortGenerator(seed=seed).students(count)
+def test_memoria_por_estudiante():
+    
+    students, retained, _ = measure(
+        lambda: [Student(f"2021{i:07d}", "Estudiante de Prueba") for i in range(SAMPLE_SIZE)]
+    )
+    assert len(students) == SAMPLE_SIZE
+    check_metric("bytes_per_student", retained / SAMPLE_SIZE)
+def test_memoria_por_evaluacion():
+    
+    students = [Student(f"2021{i:07d}", "Estudiante de Prueba") for i in range(SAMPLE_SIZE)]
+    def register():
+        for student in students:
+            student.add_evaluations([
+                Evaluation("Parcial", 14.0, 30.0),
+                Evaluation("Final", 12.5, 40.0),
+                Evaluation("Prácticas", 16.0, 30.0)
+            ])
+    _, retained, _ = measure(register)
+    check_metric("bytes_per_evaluation", retained / (SAMPLE_SIZE * 3))
+    # La copia defensiva de Student.evaluations es transitoria: no debe quedar retenida
+    total, retained, _ = measure(lambda: sum(len(student.evaluations) for student in students))
+    assert total == SAMPLE_SIZE * 3
+    check_metric("evaluations_copy_retained_per_student", max(retained, 0) / SAMPLE_SIZE)
+def test_memoria_por_historial():
+    
+    AttendancePolicy.set_teachers_agreement(True)
+    students, extra_points = build_students(SAMPLE_SIZE)
+    calculator = GradeCalculator(Teacher("T001", "Dr. Test"))
+    def grade():
+        for student in students:
+            calculator.calculate_final_grade(student, extra_points.get(student.student_id, 0.0))
+    _, retained, _ = measure(grade)
+    assert len(calculator.get_calculation_history()) == SAMPLE_SIZE
+    check_metric("bytes_per_history_entry", retained / SAMPLE_SIZE)
+    calculator.clear_history()
+def test_memoria_registro_masivo():
+    
+    for size in COHORT_SIZES:
+        records = list(CohortGenerator(seed=size).iter_records(size))
+        calculator = GradeCalculator(Teacher("T001", "Dr. Test"))
+        def register():
+            students = [Student(record.student_id, record.name) for record in records]
+            result = calculator.register_evaluations_bulk(
+                (student, list(record.evaluations)) for student, record in zip(students, records)
+            )
+            return students, result
+        (students, result), _, peak = measure(register)
+        assert result['success'] and len(students) == size
+        check_metric(f"peak_bulk_registration_per_student_{size}", peak / size)
+def test_memoria_calculo_masivo():
+    
+    AttendancePolicy.set_teachers_agreement(True)
+    for size in COHORT_SIZES:
+        students, extra_points = build_students(size, seed=size)
+        calculator = GradeCalculator(Teacher("T001", "Dr. Test"))
+        # El núcleo por lotes en enteros solo se usa en modo punto fijo
+        batch_calculator = GradeCalculator(Teacher("T001", "Dr. Test"), fixed_point_mode=True)
+        batch, _, peak = measure(lambda: batch_calculator.compute_grades_batch(students, extra_points))
+        assert len(batch['student_id']) == size and not batch['errors']
+        check_metric(f"peak_batch_grading_per_student_{size}", peak / size)
+        # Cálculo individual sin historial: el pico es absoluto y no debe crecer con la cohorte
+        def grade():
+            for student in students:
+                calculator.compute_grade(student, extra_points.get(student.student_id, 0.0))
+        _, _, peak = measure(grade)
+        check_metric(f"peak_grading_bytes_{size}", peak)
+def main():
+    
+    print("\n" + "=" * 70)
+    print(" " * 15 + "CS-GRADECALCULATOR - MEMORIA")
+    print(" " * 10 + "Regresiones de memoria con tracemalloc")
+    print("=" * 70)
+    runner = TestRunner()
+    runner.run_test("Bytes por estudiante", test_memoria_por_estudiante)
+    runner.run_test("Bytes por evaluación", test_memoria_por_evaluacion)
+    runner.run_test("Bytes por entrada de historial", test_memoria_por_historial)
+    runner.run_test("Pico en registro masivo", test_memoria_registro_masivo)
+    runner.run_test("Pico en cálculo masivo", test_memoria_calculo_masivo)
+    runner.print_summary()
+    if UPDATE_BASELINES:
+        save_baselines(_measurements)
+        print(f"\n Líneas base actualizadas en {BASELINES_PATH}")
+        return True
+    return runner.tests_failed == 0
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
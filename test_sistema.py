@@ -1,12 +1,35 @@
 import sys
 import time
 from models import Student, Teacher, Evaluation
-from services import GradeCalculator
-from policies import AttendancePolicy, ExtraPointsPolicy
+from services import (
+    GradeCalculator,
+    CohortStatistics,
+    RankingIndex,
+    ProjectionEngine,
+    PassSimulator,
+    AttendanceTracker,
+    GradebookJournal,
+    GradeChangeFeed,
+    DeltaExporter,
+    Gradebook,
+    ShardedGradebook,
+    JobQueue,
+    WorkerPool,
+    ReportRenderer,
+    ColumnarWriter,
+    ColumnarReader,
+    HistoryArchive,
+    SectionViews,
+    GradeCache,
+    CohortGenerator,
+    RosterIndex
+)
+from policies import AttendancePolicy, ExtraPointsPolicy, CompiledPolicy, GradingRules
 from utils.exceptions import (
     GradeCalculationError,
     MaxEvaluationsExceededError,
-    InvalidWeightError
+    InvalidWeightError,
+    InvalidGradingRuleError
 )
 class TestRunner:
     
@@ -267,6 +290,1013 @@ def test_nota_maxima_20():
     assert result['final_grade'] == 20.0
     assert result['grade_capped'] == True
     print(" Nota máxima: Limitada correctamente a 20")
+def test_regrade_incremental_politica():
+    
+    teacher = Teacher("T001", "Dr. Test")
+    calculator = GradeCalculator(teacher)
+    calculator.register_extra_points_policy(True)
+    con_extra = Student("202110001", "Con Extra")
+    sin_extra = Student("202110002", "Sin Extra")
+    sin_asistencia = Student("202110003", "Sin Asistencia")
+    for student, attendance in ((con_extra, True), (sin_extra, True), (sin_asistencia, False)):
+        calculator.register_evaluations(student, [Evaluation("Parcial", 10.0, 100.0)])
+        calculator.register_attendance(student, attendance)
+    calculator.calculate_final_grade(con_extra, extra_points=1.0)
+    calculator.calculate_final_grade(sin_extra)
+    calculator.calculate_final_grade(sin_asistencia, extra_points=1.0)
+    history_size = len(calculator.get_calculation_history())
+    calculator.upsert_evaluations(con_extra, [Evaluation("Parcial", 12.0, 100.0)])
+    result = calculator.register_extra_points_policy(False)
+    assert len(calculator.get_calculation_history()) == history_size
+    assert result['regraded_changes'] == [{
+        'student_id': "202110001",
+        'old_final_grade': 13.0,
+        'new_final_grade': 12.0,
+        'old_passes_course': True,
+        'new_passes_course': True
+    }]
+    result = calculator.register_extra_points_policy(False)
+    assert result['regraded_changes'] == []
+    calculator.register_extra_points_policy(True)
+    print(" Regrade incremental: solo se recalculan los dependientes de la política")
+def test_estadisticas_cohorte():
+    
+    teacher = Teacher("T001", "Dr. Test")
+    calculator = GradeCalculator(teacher)
+    worker_a = CohortStatistics("CS101")
+    worker_b = CohortStatistics("CS101")
+    scores = [8.0, 11.0, 14.0, 17.0]
+    for i, score in enumerate(scores):
+        student = Student(f"20211000{i}", "Test Student")
+        calculator.register_evaluations(student, [Evaluation("Final", score, 100.0)])
+        calculator.register_attendance(student, True)
+        result = calculator.calculate_final_grade(student)
+        (worker_a if i % 2 == 0 else worker_b).add(result)
+    stats = CohortStatistics.combine([worker_a, worker_b], "CS101")
+    summary = stats.summary()
+    assert summary['count'] == 4
+    assert summary['mean'] == 12.5
+    assert summary['variance'] == 15.0
+    assert summary['pass_rate'] == 0.75
+    assert stats.percentile(50) == 11.0
+    assert stats.percentile(100) == 17.0
+    assert sum(b['count'] for b in summary['histogram']) == 4
+    print(" Estadísticas de cohorte: agregados combinables en una pasada")
+def test_ranking_incremental():
+    
+    teacher = Teacher("T001", "Dr. Test")
+    calculator = GradeCalculator(teacher)
+    ranking = RankingIndex(calculator, "CS101")
+    students = []
+    for i, score in enumerate([12.0, 18.0, 15.0, 15.0]):
+        student = Student(f"20211000{i}", "Test Student")
+        calculator.register_evaluations(student, [Evaluation("Parcial", score, 60.0)])
+        ranking.track(student)
+        students.append(student)
+    assert len(ranking) == 0
+    for student in students:
+        student.add_evaluation(Evaluation("Final", 15.0, 40.0))
+        calculator.register_attendance(student, True)
+    assert len(ranking) == 4
+    assert [entry['student_id'] for entry in ranking.top(2)] == ["202110001", "202110002"]
+    assert ranking.rank("202110002") == ranking.rank("202110003") == 2
+    assert ranking.rank("202110000") == 4
+    assert ranking.percentile_rank("202110000") == 12.5
+    assert len(calculator.get_calculation_history()) == 0
+    print(" Ranking: se actualiza con cada evaluación sin reordenar la cohorte")
+def test_proyeccion_nota_requerida():
+    
+    AttendancePolicy.set_teachers_agreement(True)
+    casos = [
+        ("202110001", 8.0, True, 0.0),
+        ("202110002", 0.0, True, 0.0),
+        ("202110003", 20.0, True, 1.0),
+        ("202110004", 10.0, False, 0.0),
+        ("202110005", 8.0, True, 1.0)
+    ]
+    students = []
+    extra_points = {}
+    for student_id, score, attendance, extra in casos:
+        student = Student(student_id, "Test Student")
+        student.add_evaluation(Evaluation("Parcial", score, 50.0))
+        student.has_minimum_attendance = attendance
+        extra_points[student_id] = extra
+        students.append(student)
+    projection = ProjectionEngine.project_cohort(students, extra_points)
+    assert projection['status'] == ['reachable', 'impossible', 'secured', 'no_attendance', 'reachable']
+    assert projection['required_score'][0] == 13.0
+    assert projection['required_score'][4] == 11.0
+    assert projection['remaining_weight'][0] == 50.0
+    single = ProjectionEngine.project_student(students[1])
+    assert single['required_score'] is None and single['status'] == 'impossible'
+    print(" Proyección: nota mínima requerida calculada para toda la cohorte")
+def test_simulacion_probabilidad_aprobar():
+    
+    AttendancePolicy.set_teachers_agreement(True)
+    students = []
+    for i, scores in enumerate([(18.0, 17.0), (4.0, 6.0), (11.0, 10.0), (20.0, 20.0)]):
+        student = Student(f"20211000{i}", "Test Student")
+        for j, score in enumerate(scores):
+            student.add_evaluation(Evaluation(f"Eval {j + 1}", score, 25.0))
+        student.has_minimum_attendance = i != 3
+        students.append(student)
+    simulator = PassSimulator(trials=2000, seed=42)
+    for distribution in PassSimulator.DISTRIBUTIONS:
+        result = simulator.simulate(students, distribution)
+        again = PassSimulator(trials=2000, seed=42).simulate(students, distribution)
+        assert list(result['pass_probability']) == list(again['pass_probability'])
+        assert result['pass_probability'][0] > result['pass_probability'][1]
+        assert result['pass_probability'][3] == 0.0
+        assert result['at_risk'][1] and result['at_risk'][3]
+    history = simulator.simulate(students, PassSimulator.DISTRIBUTION_HISTORY)
+    assert history['pass_probability'][0] == 1.0
+    assert history['pass_probability'][1] == 0.0
+    print(" Simulación: probabilidad de aprobar reproducible con semilla (RNF03)")
+def test_modo_punto_fijo():
+    
+    AttendancePolicy.set_teachers_agreement(True)
+    teacher = Teacher("T001", "Dr. Test")
+    calculator = GradeCalculator(teacher, fixed_point_mode=True)
+    student = Student("202110001", "Test Student")
+    calculator.register_evaluations(student, [
+        Evaluation("Parcial 1", 15.35, 33.33),
+        Evaluation("Parcial 2", 12.0, 33.33),
+        Evaluation("Final", 19.99, 33.34)
+    ])
+    calculator.register_attendance(student, True)
+    evaluation = student.evaluations[0]
+    assert evaluation.score_hundredths == 1535
+    assert evaluation.weight_basis_points == 3333
+    result = calculator.calculate_final_grade(student, extra_points=1.0)
+    assert result['base_grade'] == 15.78
+    assert result['final_grade'] == 16.78
+    batch = calculator.compute_grades_batch([student], {"202110001": 1.0})
+    assert list(batch['final_grade']) == [1678]
+    assert batch['passes_course'] == [True]
+    incompleto = Student("202110002", "Test Student")
+    incompleto.add_evaluation(Evaluation("Parcial", 15.0, 99.99))
+    try:
+        calculator.calculate_final_grade(incompleto)
+        assert False, "Debería lanzar InvalidWeightError"
+    except GradeCalculationError as e:
+        assert "99.99" in str(e)
+    assert "202110002" in calculator.compute_grades_batch([incompleto])['errors']
+    capped = ExtraPointsPolicy.calculate_extra_points_fixed(1950, 100, True)
+    assert capped['final_grade'] == 2000 and capped['capped']
+    tercios = Student("202110003", "Test Student")
+    tercios.add_evaluations([Evaluation(f"Parte {i}", 15.0, 33.333) for i in range(3)])
+    tercios.has_minimum_attendance = True
+    limite = Student("202110004", "Test Student")
+    limite.add_evaluations([Evaluation("Parcial", 10.49, 50.0), Evaluation("Final", 10.52, 50.0)])
+    limite.has_minimum_attendance = True
+    alto = Student("202110005", "Test Student")
+    alto.add_evaluation(Evaluation("Final", 18.0, 100.0))
+    alto.has_minimum_attendance = True
+    cohort = [student, incompleto, tercios, limite, alto]
+    for batch_calculator in (
+        calculator,
+        GradeCalculator(teacher),
+        GradeCalculator(teacher, rules=GradingRules.parse("threshold 10.5\ncap 15").compile())
+    ):
+        batch = batch_calculator.compute_grades_batch(cohort, {"202110001": 1.0})
+        for position, member in enumerate(cohort):
+            extra = 1.0 if member.student_id == "202110001" else 0.0
+            try:
+                scalar = batch_calculator.compute_grade(member, extra)
+            except GradeCalculationError:
+                assert member.student_id in batch['errors']
+                continue
+            assert member.student_id not in batch['errors']
+            assert batch['final_grade'][position] == round(scalar['final_grade'] * batch['scale'])
+            assert batch['passes_course'][position] == scalar['passes_course']
+    print(" Punto fijo: sumas enteras exactas y validación de pesos exacta")
+def test_politica_compilada():
+    
+    import json
+    AttendancePolicy.set_teachers_agreement(True)
+    compiled = CompiledPolicy.current()
+    assert CompiledPolicy.current() is compiled
+    assert compiled.apply_extra_points(19.0, 2.0) == (2.0, 20.0, True)
+    assert AttendancePolicy.check_minimum_attendance(True) == compiled.attendance_check(True)
+    public_check = AttendancePolicy.check_minimum_attendance(False)
+    assert type(public_check) is dict and public_check is not AttendancePolicy.check_minimum_attendance(False)
+    public_check['message'] = "modificado"
+    json.dumps(public_check)
+    assert compiled.attendance_check(False)['message'] != "modificado"
+    assert compiled.attendance_check(True) is AttendancePolicy.MEETS_REQUIREMENT
+    calculator = GradeCalculator(Teacher("T001", "Dr. Test"))
+    registered = calculator.register_attendance(Student("202110001", "Test Student"), False)
+    assert registered['message'] == AttendancePolicy.FAILS_REQUIREMENT['message']
+    AttendancePolicy.set_teachers_agreement(False)
+    recompiled = CompiledPolicy.current()
+    assert recompiled is not compiled
+    assert recompiled.version == compiled.version + 1
+    assert recompiled.apply_extra_points(15.0, 2.0) == (0.0, 15.0, False)
+    AttendancePolicy.set_teachers_agreement(True)
+    for base, extra in ((10.0, 0.5), (19.5, 1.0), (0.0, 0.0)):
+        expected = ExtraPointsPolicy.calculate_extra_points(base, extra, True)
+        applied, final_grade, capped = CompiledPolicy.current().apply_extra_points(base, extra)
+        assert (applied, final_grade, capped) == (
+            expected['extra_points_applied'], expected['final_grade'], expected['capped']
+        )
+    print(" Política compilada: tabla de decisión reutilizada hasta que cambia la política")
+def test_reglas_declarativas():
+    
+    AttendancePolicy.set_teachers_agreement(True)
+    teacher = Teacher("T001", "Dr. Test")
+    student = Student("202110001", "Test Student")
+    for name, score in (("Parcial 1", 6.0), ("Parcial 2", 14.0), ("Final", 16.0), ("Labs", 18.0)):
+        student.add_evaluation(Evaluation(name, score, 25.0))
+    student.has_minimum_attendance = True
+    default = GradeCalculator(teacher, rules=GradingRules.for_course("CS101"))
+    hard_coded = GradeCalculator(teacher)
+    expected = hard_coded.compute_grade(student, 1.5)
+    result = default.compute_grade(student, 1.5)
+    assert all(result[key] == expected[key] for key in expected)
+    rules = GradingRules.register_course("MA201", """
+        # Variante de otra facultad
+        threshold 11
+        cap 18
+        drop_lowest 1
+        minimum "Final" 12
+        require attendance
+        extra_points when teachers_agree and attendance
+    """)
+    assert GradingRules.for_course("MA201") is rules
+    result = GradeCalculator(teacher, rules=rules).compute_grade(student, 3.0)
+    assert result['base_grade'] == 16.0
+    assert result['final_grade'] == 18.0 and result['grade_capped']
+    assert result['passes_course']
+    strict = GradingRules.parse("minimum * 10\nextra_points never").compile()
+    result = strict.evaluate(student.evaluations, True, 2.0)
+    assert result['extra_points_applied'] == 0.0
+    assert result['failed_rules'] == ["minimum Parcial 1 10.0"] and not result['passes_course']
+    columns = rules.evaluate_columns(
+        [6.0, 14.0, 16.0, 18.0, 15.0], [25.0, 25.0, 25.0, 25.0, 90.0], [0, 4, 5],
+        [True, True], [0.0, 0.0],
+        names=["Parcial 1", "Parcial 2", "Final", "Labs", "Final"]
+    )
+    assert list(columns['final_grade'])[0] == 16.0 and columns['passes_course'] == [True, False]
+    assert 1 in columns['errors']
+    high = Student("202110002", "High Student")
+    high.add_evaluations([Evaluation(name, 18.0, 25.0) for name in ("A", "B", "C", "D")])
+    high.has_minimum_attendance = True
+    for text, agree in (("cap 15\nextra_points never", True), ("cap 15\nextra_points when teachers_agree", False)):
+        result = GradingRules.parse(text).compile().evaluate(high.evaluations, True, 1.0, agree)
+        assert result['extra_points_applied'] == 0.0
+        assert result['final_grade'] == 15.0 and result['grade_capped']
+    never = GradeCalculator(teacher, rules=GradingRules.parse("threshold 12\nextra_points never").compile())
+    detail = never.get_calculation_detail(high, 2.0)
+    assert detail['extra_points']['applied'] == 0.0 and "NO aplicados" in detail['extra_points']['message']
+    assert detail['final_result']['final_grade'] == 18.0
+    assert detail['final_result']['approval_threshold'] == 12.0
+    try:
+        GradingRules.parse("threshold 10.5\nbonus 2")
+        assert False, "Debería lanzar InvalidGradingRuleError"
+    except InvalidGradingRuleError as e:
+        assert "Línea 2" in str(e)
+    print(" Reglas declarativas: variantes por curso compiladas a evaluadores")
+def test_asistencia_bitset():
+    
+    import io
+    import tempfile
+    tracker = AttendanceTracker(session_count=20)
+    assert tracker.bytes_per_student == 3
+    log = io.StringIO("student_id,session\n" + "".join(
+        f"202110001,{session}\n" for session in range(14)
+    ) + "202110002,0\n202110002,0\n202110002,5\n")
+    assert tracker.ingest_csv(log) == 17
+    tracker.ingest((("202110003", session) for session in range(20)))
+    assert tracker.attended_sessions("202110001") == 14
+    assert tracker.attended_sessions("202110002") == 2
+    assert tracker.percentage("202110001") == 70.0
+    assert tracker.minimum_sessions() == 14
+    students = {
+        student_id: Student(student_id, "Test Student")
+        for student_id in ("202110001", "202110002", "202110003", "202110004")
+    }
+    students["202110004"].has_minimum_attendance = True
+    result = tracker.apply_to(students)
+    assert result['students_compliant'] == 2
+    assert result['students_updated'] == 3
+    assert [s.has_minimum_attendance for s in students.values()] == [True, False, True, False]
+    with tempfile.TemporaryDirectory() as directory:
+        journal = GradebookJournal(directory)
+        journal.recover()
+        calculator = GradeCalculator(Teacher("T001", "Dr. Test"), journal=journal)
+        students["202110002"].has_minimum_attendance = True
+        assert tracker.apply_to(students, calculator=calculator)['students_updated'] == 1
+        assert journal.sequence == 1 and not students["202110002"].has_minimum_attendance
+        journal.close()
+    for invalid in ((("202110001", 20),), (("202110001", "3"),), (("", 3),)):
+        try:
+            tracker.ingest(invalid)
+            assert False, "Debería lanzar ValueError"
+        except ValueError:
+            pass
+    try:
+        tracker.record("202110001", 20)
+        assert False, "Debería lanzar ValueError"
+    except ValueError:
+        pass
+    print(" Asistencia: bitset por sesión y actualización masiva del requisito")
+def test_registro_masivo_transaccional():
+    
+    teacher = Teacher("T001", "Dr. Test")
+    calculator = GradeCalculator(teacher)
+    valido = Student("202110001", "Test Student")
+    parcial = Student("202110002", "Test Student")
+    parcial.add_evaluation(Evaluation("Parcial", 12.0, 40.0))
+    invalido = Student("202110003", "Test Student")
+    lote = [
+        (valido, [("Parcial", 15.0, 50.0), Evaluation("Final", 16.0, 50.0)]),
+        (parcial, [("Final", 14.0, 60.0)]),
+        (invalido, [("Parcial", 25.0, 50.0), ("Final", 14.0, 40.0)])
+    ]
+    result = calculator.register_evaluations_bulk(lote)
+    assert result['success'] == False
+    assert list(result['errors']) == ["202110003"]
+    assert len(result['errors']["202110003"]) == 1
+    assert valido.get_evaluation_count() == 0
+    assert parcial.get_evaluation_count() == 1
+    result = calculator.register_evaluations_bulk(lote[:2])
+    assert result['success'] == True
+    assert result['students_processed'] == 2
+    assert result['evaluations_added'] == 3
+    assert parcial.get_evaluation_count() == 2
+    result = calculator.register_evaluations_bulk({invalido: [(f"Eval {i}", 10.0, 9.0) for i in range(11)]})
+    assert "máximo es 10" in result['errors']["202110003"][0]
+    print(" Registro masivo: todo o nada con errores por estudiante")
+def test_upsert_evaluaciones():
+    
+    teacher = Teacher("T001", "Dr. Test")
+    calculator = GradeCalculator(teacher)
+    ranking = RankingIndex(calculator)
+    student = Student("202110001", "Test Student")
+    calculator.register_evaluations(student, [
+        Evaluation("Parcial", 10.0, 50.0),
+        Evaluation("Final", 12.0, 50.0)
+    ])
+    calculator.register_attendance(student, True)
+    ranking.track(student)
+    correccion = [Evaluation("Parcial", 14.0, 50.0), Evaluation("Final", 12.0, 50.0)]
+    for _ in range(2):
+        result = calculator.upsert_evaluations(student, correccion)
+        assert result['evaluations_updated'] == 2 and result['evaluations_inserted'] == 0
+    assert student.get_evaluation_count() == 2
+    assert student.get_evaluation("Parcial").score == 14.0
+    assert ranking.top(1)[0]['final_grade'] == 13.0
+    result = calculator.delete_evaluations(student, ["Parcial", "Inexistente"])
+    assert result['evaluations_deleted'] == 1 and not result['success']
+    assert student.get_evaluation("Parcial") is None
+    assert student.get_evaluation("Final").score == 12.0
+    assert len(ranking) == 0
+    assert student.upsert_evaluation(Evaluation("Parcial", 16.0, 50.0)) == True
+    assert ranking.top(1)[0]['final_grade'] == 14.0
+    print(" Upsert: reimportar correcciones no duplica evaluaciones")
+def test_registro_eventos_recuperacion():
+    
+    import os
+    import tempfile
+    teacher = Teacher("T001", "Dr. Test")
+    with tempfile.TemporaryDirectory() as directory:
+        journal = GradebookJournal(directory, group_size=2, snapshot_interval=1000)
+        assert journal.recover() == {}
+        calculator = GradeCalculator(teacher, journal=journal)
+        student = Student("202110001", "Test Student")
+        calculator.register_evaluations(student, [Evaluation("Parcial", 12.0, 50.0)])
+        calculator.register_attendance(student, True)
+        journal.snapshot()
+        calculator.upsert_evaluations(student, [
+            Evaluation("Parcial", 14.0, 50.0),
+            Evaluation("Final", 16.0, 50.0)
+        ])
+        calculator.register_evaluations_bulk([(Student("202110002", "Otro"), [("Final", 11.0, 100.0)])])
+        calculator.register_extra_points_policy(False)
+        assert journal.pending_events == 1
+        journal.close()
+        AttendancePolicy.set_teachers_agreement(True)
+        with open(f"{directory}/{GradebookJournal.EVENTS_FILE}", "a", encoding="utf-8") as log:
+            log.write('{"seq": 99, "type": "attendance_regis')
+        recovered_journal = GradebookJournal(directory)
+        students = recovered_journal.recover()
+        assert recovered_journal.sequence == 5
+        assert sorted(students) == ["202110001", "202110002"]
+        recovered = students["202110001"]
+        assert recovered.has_minimum_attendance
+        assert [(e.name, e.score) for e in recovered.evaluations] == [("Parcial", 14.0), ("Final", 16.0)]
+        assert AttendancePolicy.get_teachers_agreement() == False
+        GradeCalculator(teacher, journal=recovered_journal).register_attendance(recovered, False)
+        recovered_journal.close()
+        assert GradebookJournal(directory).recover()["202110001"].has_minimum_attendance == False
+    with tempfile.TemporaryDirectory() as directory:
+        idle = GradebookJournal(directory, group_size=64, flush_interval=0.05)
+        idle.recover()
+        student = Student("202110003", "Test Student")
+        student.has_minimum_attendance = True
+        idle.record_attendance(student)
+        assert idle.pending_events == 1
+        deadline = time.monotonic() + 2.0
+        while idle.pending_events and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert idle.pending_events == 0
+        assert "202110003" in GradebookJournal(directory).recover()
+        student.has_minimum_attendance = False
+        idle.record_attendance(student, sync=True)
+        assert idle.pending_events == 0
+        assert GradebookJournal(directory).recover()["202110003"].has_minimum_attendance == False
+        idle.close()
+    with tempfile.TemporaryDirectory() as directory:
+        pending = GradebookJournal(directory)
+        student = Student("202110004", "Test Student")
+        try:
+            GradeCalculator(teacher, journal=pending).register_evaluations(student, [Evaluation("Final", 12.0, 100.0)])
+            assert False, "Debería lanzar GradeCalculationError"
+        except GradeCalculationError:
+            pass
+        assert student.get_evaluation_count() == 0
+        compacted = GradebookJournal(directory, group_size=64, flush_interval=0.05, snapshot_interval=1)
+        compacted.recover()
+        calculator = GradeCalculator(teacher, journal=compacted)
+        calculator.register_evaluations(student, [Evaluation("Final", 12.0, 100.0)])
+        deadline = time.monotonic() + 2.0
+        while compacted.pending_events and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert compacted.pending_events == 0
+        assert not os.path.exists(os.path.join(directory, GradebookJournal.SNAPSHOT_FILE))
+        compacted.flush()
+        assert os.path.getsize(os.path.join(directory, GradebookJournal.EVENTS_FILE)) == 0
+        calculator.register_attendance(student, True)
+        compacted.close()
+        restored = GradebookJournal(directory).recover()["202110004"]
+        assert restored.get_evaluation_count() == 1 and restored.has_minimum_attendance
+    AttendancePolicy.set_teachers_agreement(True)
+    print(" Registro de eventos: snapshot + cola del log restauran el estado")
+def test_feed_cambios_nota():
+    
+    AttendancePolicy.set_teachers_agreement(True)
+    now = [0.0]
+    teacher = Teacher("T001", "Dr. Test")
+    calculator = GradeCalculator(teacher)
+    feed = GradeChangeFeed(calculator, debounce_seconds=1.0, clock=lambda: now[0])
+    student = Student("202110001", "Test Student")
+    calculator.register_attendance(student, True)
+    feed.track(student, extra_points=1.0)
+    subscription = feed.subscribe(max_queue=2)
+    calculator.register_evaluations(student, [Evaluation("Parcial", 10.0, 50.0)])
+    calculator.register_evaluations(student, [Evaluation("Final", 12.0, 50.0)])
+    calculator.upsert_evaluations(student, [Evaluation("Final", 14.0, 50.0)])
+    assert subscription.get() == []
+    now[0] = 2.0
+    events = subscription.get()
+    assert len(events) == 1
+    assert events[0]['old_final_grade'] is None and events[0]['new_final_grade'] == 13.0
+    checkpoint = subscription.checkpoint
+    calculator.register_extra_points_policy(False)
+    calculator.register_extra_points_policy(True)
+    calculator.register_extra_points_policy(False)
+    assert feed.flush() == 0
+    now[0] = 4.0
+    assert feed.flush() == 1
+    resumed = feed.subscribe(checkpoint=checkpoint)
+    event = resumed.get()[0]
+    assert (event['old_final_grade'], event['new_final_grade']) == (13.0, 12.0)
+    assert subscription.get()[0]['seq'] == event['seq']
+    for score in (15.0, 16.0, 17.0):
+        calculator.upsert_evaluations(student, [Evaluation("Final", score, 50.0)])
+        feed.flush(force=True)
+    assert len(subscription) == 2 and subscription.lagged
+    AttendancePolicy.set_teachers_agreement(True)
+    print(" Feed de cambios: eventos agrupados, colas acotadas y reanudación")
+def test_exportacion_delta():
+    
+    import io
+    import json
+    import os
+    import tempfile
+    AttendancePolicy.set_teachers_agreement(True)
+    teacher = Teacher("T001", "Dr. Test")
+    calculator = GradeCalculator(teacher)
+    exporter = DeltaExporter(calculator)
+    students = []
+    for i in range(3):
+        student = Student(f"20211000{i}", "Test Student")
+        calculator.register_evaluations(student, [Evaluation("Final", 12.0 + i, 100.0)])
+        calculator.register_attendance(student, True)
+        exporter.track(student)
+        students.append(student)
+    stream = io.StringIO()
+    result = exporter.export(stream)
+    assert result['exported'] == 3
+    token = result['token']
+    assert exporter.export(io.StringIO(), token)['exported'] == 0
+    calculator.upsert_evaluations(students[2], [Evaluation("Final", 9.0, 100.0)])
+    exporter.set_extra_points("202110000", 1.0)
+    exporter.set_extra_points("202110000", 1.0)
+    stream = io.StringIO()
+    result = exporter.export(stream, token)
+    rows = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [row['student_id'] for row in rows] == ["202110002", "202110000"]
+    assert rows[0]['final_grade'] == 9.0 and rows[0]['passes_course'] == False
+    assert rows[1]['final_grade'] == 13.0
+    calculator.register_extra_points_policy(False)
+    stream = io.StringIO()
+    assert exporter.export(stream, result['token'], DeltaExporter.FORMAT_CSV)['exported'] == 1
+    assert stream.getvalue().splitlines()[1].startswith("202110000,Test Student,12.0")
+    assert exporter.export(io.StringIO(), "otra-instancia:5")['exported'] == 3
+    AttendancePolicy.set_teachers_agreement(True)
+    with tempfile.TemporaryDirectory() as directory:
+        state_path = os.path.join(directory, "delta_state.json")
+        durable = DeltaExporter(calculator, state_path=state_path)
+        for student in students:
+            durable.track(student, extra_points=0.5)
+        token = durable.export(io.StringIO())['token']
+        calculator.upsert_evaluations(students[1], [Evaluation("Final", 17.0, 100.0)])
+        restarted = DeltaExporter(calculator, state_path=state_path)
+        for student in students:
+            restarted.track(student, extra_points=0.5)
+        stream = io.StringIO()
+        result = restarted.export(stream, token)
+        assert result['exported'] == 1 and json.loads(stream.getvalue())['student_id'] == "202110001"
+        reopened = DeltaExporter(calculator, state_path=state_path)
+        modified = os.path.getmtime(state_path)
+        assert reopened.token == result['token'] and os.path.getmtime(state_path) == modified
+        assert reopened.checkpoint() == result['token']
+        assert calculator.configuration_fingerprint == GradeCalculator(teacher).configuration_fingerprint
+    print(" Exportación delta: solo se exportan los estudiantes con cambios")
+def test_instantaneas_copy_on_write():
+    
+    AttendancePolicy.set_teachers_agreement(True)
+    teacher = Teacher("T001", "Dr. Test")
+    calculator = GradeCalculator(teacher)
+    gradebook = Gradebook(calculator)
+    student = Student("202110001", "Test Student")
+    other = Student("202110002", "Other Student")
+    calculator.register_evaluations(student, [Evaluation("Parcial", 12.0, 50.0), Evaluation("Final", 14.0, 50.0)])
+    calculator.register_attendance(student, True)
+    calculator.register_evaluations(other, [Evaluation("Final", 8.0, 100.0)])
+    gradebook.track_all([student, other])
+    before = gradebook.snapshot()
+    assert before.version == 1 and len(before) == 2
+    with gradebook.transaction() as writer:
+        writer.upsert_evaluations(student, [Evaluation("Final", 18.0, 50.0)])
+        writer.register_extra_points_policy(False)
+        assert gradebook.snapshot() is before
+        assert before.compute_grade("202110001", 1.0)['final_grade'] == 14.0
+    after = gradebook.snapshot()
+    assert after.version == 2 and not after.teachers_agree
+    assert after.records["202110002"] is before.records["202110002"]
+    assert before.compute_grade("202110001", 1.0)['final_grade'] == 14.0
+    assert after.compute_grade("202110001", 1.0)['final_grade'] == 15.0
+    detail = before.get_calculation_detail("202110001", 1.0)
+    assert detail['extra_points']['applied'] == 1.0 and detail['metadata']['snapshot_version'] == 1
+    assert len(calculator.get_calculation_history()) == 0
+    stats = before.statistics()
+    assert stats.count == 2 and stats.pass_rate == 0.5
+    copy = after.get_student("202110001")
+    copy.has_minimum_attendance = False
+    assert after.compute_grade("202110001")['passes_course'] == True
+    calculator.register_attendance(other, True)
+    assert gradebook.snapshot().version == 3 and gradebook.snapshot() is gradebook.snapshot()
+    import threading
+    changed = threading.Event()
+    def outside_writer():
+        other.has_minimum_attendance = False
+        changed.set()
+    with gradebook.transaction():
+        writer = threading.Thread(target=outside_writer)
+        writer.start()
+        assert not changed.wait(0.1)
+    writer.join()
+    assert changed.is_set() and gradebook.snapshot().version == 4
+    AttendancePolicy.set_teachers_agreement(True)
+    print(" Instantáneas: lecturas estables mientras se registran cambios")
+def test_registro_distribuido():
+    
+    import io
+    AttendancePolicy.set_teachers_agreement(True)
+    teacher = Teacher("T001", "Dr. Test")
+    courses = {
+        f"CURSO{c}": [
+            (f"2021{c:02d}{i:03d}", "Test Student", [("Parcial", 10.0 + c % 5, 50.0), ("Final", 12.0, 50.0)], True)
+            for i in range(5)
+        ]
+        for c in range(12)
+    }
+    with ShardedGradebook(teacher, workers=2) as sharded:
+        result = sharded.register_courses(courses)
+        assert result['success'] and result['students_processed'] == 60
+        invalid = sharded.register_course("CURSO0", [("202199999", "Bad", [("Final", 12.0, 60.0)], True)])
+        assert not invalid['success'] and "CURSO0" in invalid['errors']
+        stats = sharded.statistics()
+        assert stats.count == 60 and stats.pass_rate == 1.0
+        assert sharded.course_statistics("CURSO3").mean == 12.5
+        placement = sharded.courses()
+        assert len(placement) == 12 and set(placement.values()) == set(sharded.workers)
+        moved = sharded.add_worker()
+        after = sharded.courses()
+        assert sorted(moved['courses_moved']) == sorted(c for c in placement if placement[c] != after[c])
+        assert all(after[c] == moved['worker'] for c in moved['courses_moved'])
+        assert sharded.statistics().mean == stats.mean
+        assert sharded.register_attendance("CURSO1", {"202101000": False}) == 1
+        stream = io.StringIO()
+        assert sharded.export(stream, ["CURSO1"])['exported'] == 5
+        assert '"passes_course": false' in stream.getvalue()
+        by_shard = {}
+        for c in range(100):
+            by_shard.setdefault(sharded.shard_for(f"NUEVO{c}"), f"NUEVO{c}")
+        failing, healthy = list(by_shard.values())[:2]
+        try:
+            sharded.register_courses({
+                failing: [("", "Bad", [("Final", 12.0, 100.0)], True)],
+                healthy: [("202188888", "Test Student", [("Final", 12.0, 100.0)], True)]
+            })
+            assert False, "Debería lanzar GradeCalculationError"
+        except GradeCalculationError:
+            pass
+        assert set(sharded.courses()) == set(after) | {healthy}
+        assert sharded.statistics().count == 61
+        corrected = sharded.register_course("CURSO3", [("202103000", "Test Student", [("Final", 20.0, 50.0)], None)])
+        assert corrected['success'] and corrected['evaluations_added'] == 1
+        assert sharded.course_statistics("CURSO3").count == 5
+        assert sharded.course_statistics("CURSO3").mean == 13.3
+    with ShardedGradebook(teacher, workers=1, reply_timeout=0.5) as fragile:
+        process, _ = fragile._workers[fragile.workers[0]]
+        process.terminate()
+        process.join()
+        try:
+            fragile.courses()
+            assert False, "Debería lanzar GradeCalculationError"
+        except GradeCalculationError:
+            pass
+    print(" Registro distribuido: consultas por dispersión y reubicación de cursos")
+def test_cola_trabajos():
+    
+    import os
+    import tempfile
+    import time
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "jobs.db")
+    students = [
+        {"student_id": f"20211000{i}", "name": "Test Student", "evaluations": [["Final", 10.0 + i, 100.0]],
+         "has_minimum_attendance": True}
+        for i in range(3)
+    ]
+    with JobQueue(path, concurrency={"export": 1}, lease_seconds=0.2) as queue:
+        first = queue.enqueue("export", {"teacher": ["T001", "Dr. Test"], "students": students,
+                                         "path": os.path.join(directory, "a.csv")})
+        second = queue.enqueue("export", {"teacher": ["T001", "Dr. Test"], "students": students,
+                                          "path": os.path.join(directory, "b.csv")})
+        claimed = queue.claim("w1")
+        assert claimed['id'] == first and queue.claim("w2") is None
+        time.sleep(0.25)
+        redelivered = queue.claim("w2")
+        assert redelivered['id'] == first and redelivered['attempt'] == 2
+        assert not queue.complete(first, "w1", {})
+        assert queue.complete(first, "w2", {"rows": 3})
+        assert queue.result(first) == {"rows": 3}
+        calls = []
+        def flaky(payload):
+            calls.append(payload)
+            raise RuntimeError("fallo temporal")
+        flaky_id = queue.enqueue("flaky", {}, max_attempts=2)
+        assert queue.process_next("w1", {"flaky": flaky}) == flaky_id
+        assert queue.status(flaky_id)['status'] == JobQueue.STATUS_PENDING
+        assert queue.process_next("w1", {"flaky": flaky}) is None
+        time.sleep(JobQueue.BACKOFF_BASE)
+        queue.process_next("w1", {"flaky": flaky})
+        assert len(calls) == 2 and queue.status(flaky_id)['status'] == JobQueue.STATUS_FAILED
+        try:
+            queue.result(flaky_id)
+            assert False, "Debería fallar"
+        except GradeCalculationError:
+            pass
+        regrade = queue.enqueue("regrade", {"teacher": ["T001", "Dr. Test"], "students": students})
+        with WorkerPool(path, processes=2, poll_interval=0.02):
+            assert queue.wait(regrade)['status'] == JobQueue.STATUS_SUCCEEDED
+            assert queue.wait(second)['status'] == JobQueue.STATUS_SUCCEEDED
+        assert queue.result(regrade)['grades']["202110002"] == 12.0
+        assert queue.result(second)['rows'] == 3
+        stolen = []
+        def slow(payload):
+            with JobQueue(path, lease_seconds=0.2) as other:
+                time.sleep(0.5)
+                stolen.append(other.claim("w2", ["slow"]))
+            return {}
+        slow_id = queue.enqueue("slow", {})
+        assert queue.process_next("w1", {"slow": slow}) == slow_id
+        assert stolen == [None] and queue.status(slow_id)['attempts'] == 1
+        assert queue.status(slow_id)['status'] == JobQueue.STATUS_SUCCEEDED
+        unserializable = queue.enqueue("opaque", {}, max_attempts=1)
+        assert queue.process_next("w1", {"opaque": lambda payload: {"value": object()}}) == unserializable
+        assert queue.status(unserializable)['status'] == JobQueue.STATUS_FAILED
+        assert "TypeError" in queue.status(unserializable)['error']
+        pool = WorkerPool(path, processes=1, poll_interval=0.02)
+        assert pool._token != WorkerPool(path, processes=1)._token
+        pool.start()
+        pool.stop()
+        restarted = queue.enqueue("regrade", {"teacher": ["T001", "Dr. Test"], "students": students})
+        pool.start()
+        try:
+            assert pool.running and queue.wait(restarted)['status'] == JobQueue.STATUS_SUCCEEDED
+        finally:
+            pool.stop()
+    print(" Cola de trabajos: reintentos, arriendos y límites de concurrencia")
+def test_reportes_paralelos():
+    
+    import os
+    import pickle
+    import tempfile
+    import zipfile
+    AttendancePolicy.set_teachers_agreement(True)
+    teacher = Teacher("T001", "Dr. Test")
+    calculator = GradeCalculator(teacher)
+    students = []
+    for i in range(7):
+        student = Student(f"20211000{i}", "Test <Student>")
+        calculator.register_evaluations(student, [Evaluation("Final", 10.0 + i, 100.0)])
+        calculator.register_attendance(student, True)
+        students.append(student)
+    students.append(Student("202119999", "Sin Evaluaciones"))
+    directory = tempfile.mkdtemp()
+    renderer = ReportRenderer(calculator, processes=2, chunk_size=3, max_in_flight=1)
+    result = renderer.render_to_directory(students, directory, {"202110000": 1.0})
+    assert result['rendered'] == 7 and list(result['errors']) == ["202119999"]
+    with open(os.path.join(directory, "202110000.txt"), encoding='utf-8') as report:
+        text = report.read()
+    assert "NOTA FINAL: 11.0" in text and "Evaluación 1: Final" in text
+    assert renderer.render(students[1]).count("DESAPROBADO") == 0
+    assert len(calculator.get_calculation_history()) == 1
+    html_renderer = ReportRenderer(calculator, ReportRenderer.FORMAT_HTML, processes=1)
+    archive_path = os.path.join(directory, "reportes.zip")
+    assert html_renderer.render_to_archive(students[:3], archive_path)['rendered'] == 3
+    with zipfile.ZipFile(archive_path) as archive:
+        assert sorted(archive.namelist()) == ["202110000.html", "202110001.html", "202110002.html"]
+        page = archive.read("202110002.html").decode('utf-8')
+    assert "Test &lt;Student&gt;" in page and "<strong>12.0</strong>" in page
+    capped = GradeCalculator(teacher, rules=GradingRules.parse("cap 15\nextra_points always").compile())
+    rules_renderer = ReportRenderer(capped, processes=2)
+    pickle.dumps(rules_renderer._worker_config())
+    reports = list(rules_renderer.iter_reports(students[6:7], {"202110006": 1.0}))
+    assert reports[0][2] is None and "Nota limitada a 15 (máximo permitido)" in reports[0][1]
+    escaping = Student("../fuera", "Test Student")
+    calculator.register_evaluations(escaping, [Evaluation("Final", 12.0, 100.0)])
+    reports = os.path.join(directory, "reportes")
+    result = renderer.render_to_directory([escaping, students[0]], reports)
+    assert result['rendered'] == 1 and list(result['errors']) == ["../fuera"]
+    assert not os.path.exists(os.path.join(directory, "fuera.txt"))
+    assert html_renderer.render_to_archive([escaping], archive_path)['errors']
+    print(" Reportes RF05: generación paralela en archivos y archivo comprimido")
+def test_exportacion_columnar():
+    
+    import os
+    import tempfile
+    AttendancePolicy.set_teachers_agreement(True)
+    teacher = Teacher("T001", "Dr. Test")
+    calculator = GradeCalculator(teacher)
+    results = []
+    for i in range(10):
+        student = Student(f"20211000{i}", "Test Student")
+        calculator.register_evaluations(student, [Evaluation("Final", 10.0 + i + 0.35, 100.0)])
+        calculator.register_attendance(student, i % 2 == 0)
+        results.append(calculator.calculate_final_grade(student, 1.0 if i == 9 else 0.0))
+    directory = tempfile.mkdtemp()
+    for compression in (ColumnarWriter.COMPRESSION_NONE, ColumnarWriter.COMPRESSION_ZLIB):
+        path = os.path.join(directory, f"notas-{compression}.grdc")
+        with ColumnarWriter(path, block_rows=4, compression=compression) as writer:
+            writer.extend(results[:5])
+            writer.append(results[5])
+            writer.extend(results[6:])
+        reader = ColumnarReader(path)
+        assert reader.rows == 10 and "final_grade" in reader.columns
+        column = reader.column("final_grade")
+        assert column.format == 'i' and column[3] == 1335 and len(column) == 10
+        column.release()
+        assert reader.column_values("final_grade") == [r['final_grade'] for r in results]
+        assert reader.column_values("student_id")[9] == "202110009"
+        rows = list(reader.iter_rows())
+        assert rows[9]['extra_points_applied'] == 0.0 and rows[8]['passes_course'] == True
+        assert rows[1]['has_minimum_attendance'] == False
+        reader.close()
+    try:
+        ColumnarReader(os.path.join(directory, "notas-None.grdc.tmp"))
+        assert False, "Debería fallar"
+    except (ValueError, OSError):
+        pass
+    print(" Exportación columnar: columnas tipadas y lectura directa por columna")
+def test_archivo_historial():
+    
+    import os
+    import tempfile
+    AttendancePolicy.set_teachers_agreement(True)
+    directory = tempfile.mkdtemp()
+    teacher = Teacher("T001", "Dr. Test")
+    archive = HistoryArchive(directory, chunk_records=4, compression=HistoryArchive.COMPRESSION_LZMA)
+    calculator = GradeCalculator(teacher, history_archive=archive, history_limit=5)
+    students = []
+    for i in range(3):
+        student = Student(f"20211000{i}", "Test Student")
+        calculator.register_evaluations(student, [Evaluation("Final", 10.0 + i, 100.0)])
+        calculator.register_attendance(student, True)
+        students.append(student)
+    for extra_points in (0.0, 1.0, 2.0, 3.0):
+        for student in students:
+            calculator.calculate_final_grade(student, extra_points)
+    assert len(calculator.get_calculation_history()) == 2 and len(archive) == 10
+    assert calculator.archive_history() == 2 and len(archive) == 12
+    assert archive.chunk_count == 5
+    reopened = HistoryArchive(directory)
+    assert reopened.compression == HistoryArchive.COMPRESSION_ZLIB and len(reopened) == 12
+    history = reopened.query(student_id="202110001")
+    assert [record['final_grade'] for record in history] == [11.0, 12.0, 13.0, 14.0]
+    assert reopened.latest("202110002")['final_grade'] == 15.0
+    assert reopened.latest("202119999") is None
+    first = history[0]['timestamp']
+    assert len(reopened.query(end=first)) >= 1
+    assert len(reopened.query(student_id="202110000", limit=2)) == 2
+    with open(os.path.join(directory, HistoryArchive.DATA_FILE), 'ab') as data:
+        data.write(b'bloque interrumpido')
+    recovered = HistoryArchive(directory)
+    assert len(recovered) == 12 and recovered.query(student_id="202110000")[3]['extra_points_applied'] == 3.0
+    empty = HistoryArchive(tempfile.mkdtemp())
+    standalone = GradeCalculator(teacher)
+    standalone.calculate_final_grade(students[0], 0.0)
+    assert standalone.archive_history(empty) == 1 and len(empty) == 1
+    other = HistoryArchive(tempfile.mkdtemp())
+    calculator.calculate_final_grade(students[0], 0.0)
+    assert calculator.archive_history(other) == 1 and len(other) == 1 and len(archive) == 12
+    print(" Archivo histórico: bloques comprimidos con índice por estudiante y fecha")
+def test_vistas_por_seccion():
+    
+    AttendancePolicy.set_teachers_agreement(True)
+    teacher = Teacher("T001", "Dr. Test")
+    calculator = GradeCalculator(teacher)
+    views = SectionViews(calculator)
+    students = []
+    for i, score in enumerate((10.0, 12.0, 16.0)):
+        student = Student(f"20211000{i}", "Test Student")
+        calculator.register_evaluations(student, [Evaluation("Final", score, 100.0)])
+        calculator.register_attendance(student, True)
+        views.track(student, "A" if i < 2 else "B", extra_points=1.0 if i == 0 else 0.0)
+        students.append(student)
+    pending = Student("202110009", "Test Student")
+    views.track(pending, "B")
+    section_a = views.view("A")
+    assert section_a['average_final_grade'] == 11.5 and section_a['pass_rate'] == 1.0
+    calculator.register_extra_points_policy(False)
+    section_a = views.view("A")
+    assert section_a['average_final_grade'] == 11.0 and section_a['pass_rate'] == 0.5
+    calculator.register_attendance(students[1], False)
+    assert views.view("A")['attendance_compliance'] == 0.5 and views.view("A")['pass_rate'] == 0.0
+    calculator.register_evaluations(pending, [Evaluation("Final", 8.0, 100.0)])
+    section_b = views.view("B")
+    assert section_b['graded_students'] == 2 and section_b['average_final_grade'] == 12.0
+    views.track(students[2], "A")
+    assert views.view("B")['students'] == 1 and views.view("A")['students'] == 3
+    assert [view['section_id'] for view in views.views()] == ["A", "B"]
+    assert views.verify() == []
+    views._sections["A"].passed[0] += 1
+    assert views.verify() == ["A"]
+    views.rebuild()
+    assert views.verify() == []
+    AttendancePolicy.set_teachers_agreement(True)
+    print(" Vistas por sección: agregados mantenidos en cada cambio")
+def test_cache_compartido():
+    
+    import gc
+    import os
+    import tempfile
+    import weakref
+    AttendancePolicy.set_teachers_agreement(True)
+    path = os.path.join(tempfile.mkdtemp(), "grade_cache.json")
+    cache = GradeCache(max_entries=3)
+    first = GradeCalculator(Teacher("T001", "Dr. Test"), cache=cache)
+    second = GradeCalculator(Teacher("T002", "Dra. Test"), cache=cache)
+    student = Student("202110001", "Test Student")
+    first.register_evaluations(student, [Evaluation("Parcial", 14.0, 40.0), Evaluation("Final", 16.0, 60.0)])
+    first.register_attendance(student, True)
+    result = first.compute_grade(student, 1.0)
+    assert second.compute_grade(student, 1.0) == result
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+    result['final_grade'] = 0.0
+    assert second.compute_grade(student, 1.0)['final_grade'] == 16.2
+    detail = second.get_calculation_detail(student, 1.0)
+    assert second.get_calculation_detail(student, 1.0)['metadata']['teacher_id'] == "T002"
+    assert first.get_calculation_detail(student, 1.0)['final_result'] == detail['final_result']
+    calculator_without_cache = GradeCalculator(Teacher("T003", "Test"))
+    reference = calculator_without_cache.get_calculation_detail(student, 1.0)
+    reference.pop('metadata'), detail.pop('metadata')
+    assert reference == detail
+    first.register_extra_points_policy(False)
+    assert first.compute_grade(student, 1.0)['final_grade'] == 15.2
+    first.upsert_evaluations(student, [Evaluation("Parcial", 20.0, 40.0)])
+    assert first.compute_grade(student, 1.0)['final_grade'] == 17.6
+    assert len(cache) == 3 and cache.stats()['evictions'] > 0
+    rules = GradeCalculator(Teacher("T004", "Test"), rules=GradingRules().compile(), cache=cache)
+    assert rules.compute_grade(student, 1.0)['failed_rules'] == []
+    assert cache.save(path) == 3
+    restarted = GradeCache(path=path)
+    assert len(restarted) == 3
+    warm = GradeCalculator(Teacher("T001", "Dr. Test"), cache=restarted)
+    assert warm.compute_grade(student, 1.0)['final_grade'] == 17.6
+    assert restarted.stats()['hits'] == 1
+    class NewerLogicCache(GradeCache):
+        LOGIC_VERSION = GradeCache.LOGIC_VERSION + 1
+    assert NewerLogicCache().load(path) == 0
+    assert NewerLogicCache.make_key("grade", "c", "s", True, 1.0) != GradeCache.make_key("grade", "c", "s", True, 1.0)
+    with open(path, 'r+', encoding='utf-8') as stored:
+        stored.seek(os.path.getsize(path) - 10)
+        stored.write("0000000000")
+    assert GradeCache().load(path) == 0
+    timed_path = os.path.join(tempfile.mkdtemp(), "timed_cache.json")
+    timed = GradeCache(path=timed_path, save_interval=0.05)
+    timed.put("clave", {"final_grade": 12.0})
+    assert not os.path.exists(timed_path)
+    deadline = time.monotonic() + 2.0
+    while not os.path.exists(timed_path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert GradeCache().load(timed_path) == 1
+    released = weakref.ref(GradeCache(path=os.path.join(tempfile.mkdtemp(), "released.json")))
+    gc.collect()
+    assert released() is None
+    AttendancePolicy.set_teachers_agreement(True)
+    print(" Caché compartido: resultados reutilizados entre calculadoras y reinicios")
+def test_generador_cohortes():
+    
+    import csv
+    import io
+    from utils import fixed_point
+    generator = CohortGenerator(seed=42)
+    records = list(generator.iter_records(5000))
+    assert records == list(CohortGenerator(seed=42).iter_records(5000))
+    assert records != list(CohortGenerator(seed=43).iter_records(5000))
+    assert list(generator.iter_records(10, start=4090)) == records[4090:4100]
+    assert len({record.student_id for record in records}) == 5000
+    for record in records:
+        assert 0 < len(record.evaluations) <= 10
+        assert abs(sum(weight for _, _, weight in record.evaluations) - 100.0) < 0.01
+        assert all(0 <= score <= 20 for _, score, _ in record.evaluations)
+    attendance_rate = sum(record.has_minimum_attendance for record in records) / len(records)
+    assert 0.85 < attendance_rate < 0.91
+    columns = generator.columns(300, start=4000)
+    assert columns['student_id'] == [record.student_id for record in records[4000:4300]]
+    base_grades, total_weights = fixed_point.batch_weighted_sums(
+        columns['scores'], columns['weights'], columns['offsets']
+    )
+    assert set(total_weights) == {fixed_point.FULL_WEIGHT}
+    students, extra_points = generator.students(300, start=4000)
+    fixed_calculator = GradeCalculator(Teacher("T001", "Dr. Test"), fixed_point_mode=True)
+    batch = fixed_calculator.compute_grades_batch(students, extra_points)
+    assert list(batch['base_grade']) == list(base_grades) and not batch['errors']
+    assert extra_points == {
+        record.student_id: record.extra_points for record in records[4000:4300] if record.extra_points
+    }
+    stream = io.StringIO()
+    assert generator.write_csv(stream, 50) == 50
+    rows = list(csv.DictReader(io.StringIO(stream.getvalue())))
+    assert len(rows) == sum(len(record.evaluations) for record in records[:50])
+    assert float(rows[0]['score']) == records[0].evaluations[0][1]
+    try:
+        CohortGenerator(schemes=[[("Final", 9000)]])
+        assert False, "Debería rechazar esquemas que no suman 100%"
+    except ValueError:
+        pass
+    print(" Generador de cohortes: determinista, válido y consistente entre salidas")
+def test_indice_de_estudiantes():
+    
+    teacher = Teacher("T001", "Dr. Test")
+    calculator = GradeCalculator(teacher)
+    students, _ = CohortGenerator(seed=3).students(5000)
+    roster = RosterIndex()
+    assert roster.track_all(students) == 5000
+    first_page = roster.page(1, 20)
+    assert first_page['total'] == 5000 and first_page['pages'] == 250 and first_page['has_next']
+    assert [s.student_id for s in first_page['students']] == sorted(s.student_id for s in students)[:20]
+    assert roster.page(250, 20)['has_next'] is False
+    assert all(s.student_id.startswith("2021000001") for s in roster.search("2021000001"))
+    assert len(roster.search("2021000001")) == 10
+    maria = Student("202199999", "María González Pérez")
+    roster.track(maria)
+    assert roster.search("gonza perez") == [maria]
+    assert roster.search("MARIA gonz") == [maria]
+    assert roster.get("202199999") is maria and "202199999" in roster
+    assert roster.count(RosterIndex.FILTER_MISSING_EVALUATIONS) == 1
+    no_attendance = roster.count(RosterIndex.FILTER_NO_ATTENDANCE)
+    assert no_attendance == sum(not s.has_minimum_attendance for s in students) + 1
+    calculator.register_evaluations(maria, [Evaluation("Final", 15.0, 100.0)])
+    calculator.register_attendance(maria, True)
+    assert roster.count(RosterIndex.FILTER_MISSING_EVALUATIONS) == 0
+    assert roster.count(RosterIndex.FILTER_NO_ATTENDANCE) == no_attendance - 1
+    filtered = roster.page(1, 50, query="sofia", filter_name=RosterIndex.FILTER_NO_ATTENDANCE)
+    assert all(not s.has_minimum_attendance and "Sofía" in s.name for s in filtered['students'])
+    assert roster.untrack("202199999") and roster.search("gonza perez") == []
+    assert len(roster) == 5000
+    try:
+        roster.page(1, 20, filter_name="desconocido")
+        assert False, "Debería rechazar filtros desconocidos"
+    except ValueError:
+        pass
+    print(" Índice de estudiantes: búsqueda por prefijo, filtros y paginación")
 def main():
     
     print("\n" + "=" * 70)
@@ -288,6 +1318,30 @@ def main():
     runner.run_test("Caso: Sin asistencia mínima", test_caso_sin_asistencia)
     runner.run_test("Validación: Pesos suman 100%", test_validacion_pesos)
     runner.run_test("Validación: Nota máxima 20", test_nota_maxima_20)
+    runner.run_test("Regrade incremental por política", test_regrade_incremental_politica)
+    runner.run_test("Estadísticas de cohorte en streaming", test_estadisticas_cohorte)
+    runner.run_test("Ranking incremental y top-k", test_ranking_incremental)
+    runner.run_test("Proyección de nota requerida", test_proyeccion_nota_requerida)
+    runner.run_test("Simulación Monte Carlo de aprobación", test_simulacion_probabilidad_aprobar)
+    runner.run_test("Modo de aritmética de punto fijo", test_modo_punto_fijo)
+    runner.run_test("Política compilada", test_politica_compilada)
+    runner.run_test("Reglas de calificación declarativas", test_reglas_declarativas)
+    runner.run_test("Asistencia desde registros de sesión", test_asistencia_bitset)
+    runner.run_test("Registro masivo transaccional", test_registro_masivo_transaccional)
+    runner.run_test("Upsert y borrado de evaluaciones por nombre", test_upsert_evaluaciones)
+    runner.run_test("Registro de eventos y recuperación", test_registro_eventos_recuperacion)
+    runner.run_test("Feed de cambios de nota", test_feed_cambios_nota)
+    runner.run_test("Exportación delta desde checkpoint", test_exportacion_delta)
+    runner.run_test("Instantáneas copy-on-write del registro", test_instantaneas_copy_on_write)
+    runner.run_test("Registro distribuido por cursos", test_registro_distribuido)
+    runner.run_test("Cola persistente de trabajos", test_cola_trabajos)
+    runner.run_test("Reportes RF05 en paralelo", test_reportes_paralelos)
+    runner.run_test("Exportación columnar binaria", test_exportacion_columnar)
+    runner.run_test("Archivo histórico comprimido", test_archivo_historial)
+    runner.run_test("Vistas materializadas por sección", test_vistas_por_seccion)
+    runner.run_test("Caché compartido persistente", test_cache_compartido)
+    runner.run_test("Generador sintético de cohortes", test_generador_cohortes)
+    runner.run_test("Índice de estudiantes paginado", test_indice_de_estudiantes)
     runner.print_summary()
     return runner.tests_failed == 0
 if __name__ == "__main__":
@@ -5,7 +5,8 @@ from .exceptions import (
     InvalidWeightError,
     AttendanceRequirementError,
     CalculationTimeoutError,
-    InvalidStudentDataError
+    InvalidStudentDataError,
+    InvalidGradingRuleError
 )
 
 __all__ = [
@@ -15,5 +16,6 @@ __all__ = [
     'InvalidWeightError',
     'AttendanceRequirementError',
     'CalculationTimeoutError',
-    'InvalidStudentDataError'
+    'InvalidStudentDataError',
+    'InvalidGradingRuleError'
 ]
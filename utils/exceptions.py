@@ -25,3 +25,7 @@ class CalculationTimeoutError(GradeCalculationError):
 class InvalidStudentDataError(GradeCalculationError):
     
     pass
+
+class InvalidGradingRuleError(GradeCalculationError):
+    
+    pass
@@ -0,0 +1,95 @@
+from array import array
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Iterable, Sequence, Tuple
+
+# Modo de punto fijo: notas en centésimas de punto y pesos en puntos básicos.
+# Regla de redondeo: las sumas ponderadas se acumulan como enteros exactos y se
+# redondean una sola vez al final, a la centésima, con mitad hacia arriba.
+SCORE_SCALE = 100
+WEIGHT_SCALE = 100
+FULL_WEIGHT = 100 * WEIGHT_SCALE
+MAX_SCORE = 20 * SCORE_SCALE
+APPROVAL_THRESHOLD = 1050
+ARRAY_TYPECODE = 'q'
+
+def _to_fixed(value: float, scale: int) -> int:
+    
+    if not isinstance(value, (int, float)):
+        raise ValueError("El valor debe ser un número")
+    
+    # Atajo: si el producto en flotante ya es un entero (salvo error de representación),
+    # coincide con el redondeo decimal exacto y se evita construir un Decimal
+    product = value * scale
+    nearest = round(product)
+    if abs(product - nearest) < 1e-9 and abs(value) < 1e6:
+        return int(nearest)
+    
+    # str() conserva el decimal que escribió el usuario (15.35 y no 15.3499999...)
+    scaled = Decimal(str(value)) * scale
+    return int(scaled.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+def score_to_hundredths(score: float) -> int:
+    
+    return _to_fixed(score, SCORE_SCALE)
+
+def weight_to_basis_points(weight: float) -> int:
+    
+    return _to_fixed(weight, WEIGHT_SCALE)
+
+def hundredths_to_float(value: int) -> float:
+    
+    return value / SCORE_SCALE
+
+def round_half_up_div(numerator: int, denominator: int) -> int:
+    
+    if numerator < 0 or denominator <= 0:
+        raise ValueError("La división de punto fijo requiere valores no negativos")
+    
+    return (2 * numerator + denominator) // (2 * denominator)
+
+def weighted_sum_hundredths(
+    scores: Iterable[int],
+    weights: Iterable[int]
+) -> int:
+    
+    total = 0
+    for score, weight in zip(scores, weights):
+        total += score * weight
+    
+    return round_half_up_div(total, FULL_WEIGHT)
+
+def pack_evaluations(
+    evaluation_sets: Iterable[Sequence]
+) -> Tuple[array, array, array]:
+    
+    scores = array(ARRAY_TYPECODE)
+    weights = array(ARRAY_TYPECODE)
+    offsets = array(ARRAY_TYPECODE, [0])
+    
+    for evaluations in evaluation_sets:
+        for evaluation in evaluations:
+            scores.append(evaluation.score_hundredths)
+            weights.append(evaluation.weight_basis_points)
+        offsets.append(len(scores))
+    
+    return scores, weights, offsets
+
+def batch_weighted_sums(
+    scores: array,
+    weights: array,
+    offsets: array
+) -> Tuple[array, array]:
+    
+    base_grades = array(ARRAY_TYPECODE)
+    total_weights = array(ARRAY_TYPECODE)
+    
+    for start, end in zip(offsets, offsets[1:]):
+        total = 0
+        weight_total = 0
+        for i in range(start, end):
+            total += scores[i] * weights[i]
+            weight_total += weights[i]
+        base_grades.append((2 * total + FULL_WEIGHT) // (2 * FULL_WEIGHT))
+        total_weights.append(weight_total)
+    
+    return base_grades, total_weights